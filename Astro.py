@@ -1,13 +1,22 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import requests
 from datetime import datetime, timedelta
-import time
+import io
 import json
+import os
+
+# Datenkern ohne Streamlit (auch als CLI: python astro_core.py)
+from astro_core import (
+    LIVE_WEATHER_TTL, LIVE_DAILY_QUOTA, LIVE_QUOTA_SHARE,
+    FORECAST_FIXTURE, FORECAST_HOURS, FORECAST_TTL, FORECAST_QUOTA_SHARE,
+    SEARCH_COLUMNS, MONTH_NAMES,
+    METRICS_PORT, METRICS_HOST,
+    CONTINENT_COUNTRIES, OTHER_CONTINENT, COUNTRY_CONTINENT,
+    get_metrics, timed, start_metrics_server, clear_memo_caches,
+    get_climate_store, get_data_service, get_api_quota, get_live_weather, get_forecast_cache,
+    table_fingerprint, write_export, memory_report, best_per_region
+)
 
 # Seitenkonfiguration
 st.set_page_config(
@@ -16,577 +25,93 @@ st.set_page_config(
     layout="wide"
 )
 
-# Erweiterte API-Klasse mit mehreren Datenquellen
-class MultiSourceWeatherAPI:
-    """
-    Klasse für mehrere API-Datenquellen
-    """
-    
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({'User-Agent': 'Astrotourism-App/1.0'})
-    
-    @staticmethod
-    @st.cache_data(ttl=24*3600)  # 24h Cache
-    def get_nasa_power_data(lat, lon, location_name):
-        """NASA POWER API - Klimadaten"""
-        base_url = "https://power.larc.nasa.gov/api/temporal/climatology/point"
-        
-        params = {
-            'parameters': 'CLOUD_AMT_DAY,CLOUD_AMT_NIGHT,RH2M,T2M,WS10M',
-            'community': 'RE',
-            'longitude': lon,
-            'latitude': lat,
-            'start': 2015,
-            'end': 2023,
-            'format': 'JSON'
-        }
-        
-        try:
-            response = requests.get(base_url, params=params, timeout=15)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                if 'properties' in data and 'parameter' in data['properties']:
-                    params_data = data['properties']['parameter']
-                    
-                    cloud_night = params_data.get('CLOUD_AMT_NIGHT', {})
-                    humidity = params_data.get('RH2M', {})
-                    temperature = params_data.get('T2M', {})
-                    wind_speed = params_data.get('WS10M', {})
-                    
-                    if cloud_night:
-                        monthly_clouds = list(cloud_night.values())
-                        avg_cloud_cover = sum(monthly_clouds) / len(monthly_clouds)
-                        
-                        # Optimierte Berechnung für Astronomie
-                        clear_threshold = 25  # < 25% Bewölkung = gut für Astronomie
-                        clear_probability = max(0, (clear_threshold - avg_cloud_cover) / clear_threshold)
-                        
-                        # Saisonale Variation berücksichtigen
-                        min_clouds = min(monthly_clouds)
-                        max_clouds = max(monthly_clouds)
-                        seasonal_factor = 1 - ((max_clouds - min_clouds) / 100) * 0.3
-                        
-                        clear_nights = int(365 * clear_probability * seasonal_factor)
-                        clear_nights = max(min(clear_nights, 350), 30)  # Between 30-350
-                        
-                        avg_humidity = sum(humidity.values()) / len(humidity) if humidity else 50
-                        avg_temp = sum(temperature.values()) / len(temperature) if temperature else 15
-                        avg_wind = sum(wind_speed.values()) / len(wind_speed) if wind_speed else 5
-                        
-                        return {
-                            'success': True,
-                            'clear_nights': clear_nights,
-                            'cloud_cover': round(avg_cloud_cover, 1),
-                            'humidity': round(avg_humidity, 1),
-                            'temperature': round(avg_temp - 273.15, 1),  # K to C
-                            'wind_speed': round(avg_wind, 1),
-                            'data_source': 'NASA POWER',
-                            'status': '🛰️ NASA'
-                        }
-                        
-        except Exception as e:
-            st.warning(f"NASA API Fehler für {location_name}: {str(e)[:50]}...")
-        
-        return {'success': False}
-    
-    @staticmethod
-    @st.cache_data(ttl=6*3600)  # 6h Cache für Wetter
-    def get_openweather_data(lat, lon, api_key=None):
-        """OpenWeatherMap API - Aktuelles Wetter (optional)"""
-        if not api_key:
-            return {'success': False, 'reason': 'No API key'}
-        
-        base_url = "http://api.openweathermap.org/data/2.5/weather"
-        params = {
-            'lat': lat,
-            'lon': lon,
-            'appid': api_key,
-            'units': 'metric'
-        }
-        
-        try:
-            response = requests.get(base_url, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    'success': True,
-                    'current_clouds': data['clouds']['all'],
-                    'current_humidity': data['main']['humidity'],
-                    'current_temp': data['main']['temp'],
-                    'visibility': data.get('visibility', 10000),
-                    'data_source': 'OpenWeather',
-                    'status': '🌤️ Live'
-                }
-        except Exception:
-            pass
-        
-        return {'success': False}
-    
-    @staticmethod
-    def get_enhanced_geographic_estimation(lat, lon, altitude, climate_zone=None):
-        """Erweiterte geografische Schätzung"""
-        abs_lat = abs(lat)
-        
-        # Basis nach detaillierten Klimazonen
-        if climate_zone == 'desert':
-            base_clear = 310
-        elif climate_zone == 'polar':
-            base_clear = 120
-        elif climate_zone == 'mediterranean':
-            base_clear = 240
-        elif climate_zone == 'continental':
-            base_clear = 200
-        elif climate_zone == 'oceanic':
-            base_clear = 160
-        elif climate_zone == 'tropical':
-            base_clear = 180
-        else:
-            # Automatische Klimazone-Bestimmung
-            if altitude > 3000:
-                base_clear = 290  # Alpine
-            elif abs_lat < 23.5 and altitude < 500:
-                base_clear = 170  # Tropical lowlands
-            elif abs_lat < 23.5 and altitude > 1000:
-                base_clear = 250  # Tropical highlands
-            elif 23.5 <= abs_lat <= 35 and altitude < 500:
-                base_clear = 200  # Subtropical lowlands
-            elif 23.5 <= abs_lat <= 35 and altitude > 500:
-                base_clear = 270  # Subtropical highlands
-            elif 35 <= abs_lat <= 50:
-                base_clear = 180  # Temperate
-            elif 50 <= abs_lat <= 66.5:
-                base_clear = 140  # Subarctic
-            else:
-                base_clear = 100  # Arctic
-        
-        # Höhen-Modifikationen
-        if altitude > 4000:
-            base_clear += 50
-        elif altitude > 3000:
-            base_clear += 40
-        elif altitude > 2000:
-            base_clear += 25
-        elif altitude > 1000:
-            base_clear += 15
-        elif altitude > 500:
-            base_clear += 8
-        
-        # Kontinentalitäts-Effekt
-        continentality = abs(lon)
-        if continentality > 140:  # Sehr kontinental
-            base_clear += 30
-        elif continentality > 100:  # Kontinental
-            base_clear += 20
-        elif continentality > 60:  # Leicht kontinental
-            base_clear += 10
-        
-        # Spezielle geografische Faktoren
-        # Wüstengürtel (15-35°N/S)
-        if 15 <= abs_lat <= 35 and altitude > 200:
-            base_clear += 25
-        
-        # Monsun-Gebiete (reduzieren)
-        if (70 <= lon <= 140 and 10 <= lat <= 40) or (-20 <= lat <= 20 and lon > 90):
-            base_clear -= 30
-        
-        # Westküsten-Effekt (marine layer)
-        if ((lat > 30 and -130 <= lon <= -110) or  # US West Coast
-            (lat > 30 and -20 <= lon <= 10) or     # Europe West Coast
-            (-40 <= lat <= -30 and -80 <= lon <= -60)):  # Chile Coast
-            base_clear -= 20
-        
-        return max(min(base_clear, 350), 50)
-
-# Ausgewogene Standort-Datenbank mit exakten Listen
-@st.cache_data(ttl=24*3600)
-def load_comprehensive_locations():
-    """Erweiterte Datenbank mit 100 sorgfältig ausgewählten Standorten weltweit"""
-    
-    # Exakt 100 Standorte - alle Listen haben die gleiche Länge
-    locations = {
-        'Name': [
-            # CHILE (8 Standorte)
-            'Atacama-Wüste', 'ALMA Observatory', 'Paranal Observatory', 'La Silla Observatory',
-            'Las Campanas Observatory', 'Cerro Tololo Observatory', 'Elqui Valley', 'Valle de la Luna',
-            
-            # USA (25 Standorte)
-            'Mauna Kea Hawaii', 'Death Valley California', 'Joshua Tree California', 'Bryce Canyon Utah',
-            'Capitol Reef Utah', 'Arches Utah', 'Great Basin Nevada', 'Grand Canyon Arizona',
-            'Big Bend Texas', 'McDonald Observatory Texas', 'Cherry Springs Pennsylvania',
-            'Shenandoah Virginia', 'Acadia Maine', 'Yellowstone Wyoming', 'Grand Teton Wyoming',
-            'Badlands South Dakota', 'Glacier Montana', 'Denali Alaska', 'Fairbanks Alaska',
-            'Palomar Observatory California', 'Mount Wilson California', 'Lowell Observatory Arizona',
-            'Very Large Array New Mexico', 'Black Canyon Colorado', 'Great Sand Dunes Colorado',
-            
-            # KANADA (8 Standorte)
-            'Jasper Nationalpark', 'Mont-Mégantic Quebec', 'Algonquin Ontario', 'Killarney Ontario',
-            'Point Pelee Ontario', 'Cypress Hills Alberta', 'Wood Buffalo Alberta', 'Kejimkujik Nova Scotia',
-            
-            # EUROPA (25 Standorte)
-            # Spanien (8)
-            'Roque de los Muchachos La Palma', 'Teide Observatorium Teneriffa', 'Calar Alto Andalusien',
-            'Montsec Katalonien', 'Picos de Europa', 'Sierra Nevada', 'Extremadura', 'Fuerteventura',
-            # Deutschland (5)
-            'Zugspitze Bayern', 'Wasserkuppe Rhön', 'Westhavelland Brandenburg', 'Eifel Nationalpark', 'Feldberg Schwarzwald',
-            # Frankreich (4)
-            'Pic du Midi Observatorium', 'Mont-Blanc Chamonix', 'Cévennes Nationalpark', 'Vosges du Nord',
-            # Andere Europa (8)
-            'Alqueva Portugal', 'Brecon Beacons Wales', 'Galloway Forest Schottland', 'Kerry Dark Sky Reserve Irland',
-            'Jungfraujoch Schweiz', 'Hohe Tauern Österreich', 'Zselic Starry Sky Park Ungarn', 'Møn Dänemark',
-            
-            # OZEANIEN (10 Standorte)
-            'Aoraki Mackenzie Neuseeland', 'Great Barrier Island Neuseeland', 'Lake Tekapo Neuseeland',
-            'Uluru Australien', 'Flinders Ranges Australien', 'Warrumbungle Australien',
-            'Nullarbor Plain Australien', 'Gibson Desert Australien', 'Kimberley Australien', 'Tasmania Dark Sky Australien',
-            
-            # AFRIKA (12 Standorte)
-            'NamibRand Namibia', 'Kalahari Botswana', 'Karoo Südafrika', 'Drakensberg Südafrika',
-            'Sahara Marokko', 'Atlas Mountains Marokko', 'Sahara Algerien', 'Hoggar Mountains Algerien',
-            'Ethiopian Highlands Äthiopien', 'Simien Mountains Äthiopien', 'Air Mountains Niger', 'Tibesti Chad',
-            
-            # ASIEN (12 Standorte)
-            'Ladakh Indien', 'Spiti Valley Indien', 'Changthang Plateau Indien', 'Thar Desert Indien',
-            'Everest Base Camp Nepal', 'Annapurna Region Nepal', 'Mustang Nepal',
-            'Tibet Plateau China', 'Gobi Desert Mongolei', 'Pamir Tadschikistan',
-            'Karakorum Pakistan', 'Taklamakan Desert China'
-        ],
-        
-        'Land': [
-            # Chile (8)
-            'Chile', 'Chile', 'Chile', 'Chile', 'Chile', 'Chile', 'Chile', 'Chile',
-            
-            # USA (25)
-            'USA', 'USA', 'USA', 'USA', 'USA', 'USA', 'USA', 'USA', 'USA', 'USA',
-            'USA', 'USA', 'USA', 'USA', 'USA', 'USA', 'USA', 'USA', 'USA', 'USA',
-            'USA', 'USA', 'USA', 'USA', 'USA',
-            
-            # Kanada (8)
-            'Kanada', 'Kanada', 'Kanada', 'Kanada', 'Kanada', 'Kanada', 'Kanada', 'Kanada',
-            
-            # Europa (25)
-            # Spanien (8)
-            'Spanien', 'Spanien', 'Spanien', 'Spanien', 'Spanien', 'Spanien', 'Spanien', 'Spanien',
-            # Deutschland (5)
-            'Deutschland', 'Deutschland', 'Deutschland', 'Deutschland', 'Deutschland',
-            # Frankreich (4)
-            'Frankreich', 'Frankreich', 'Frankreich', 'Frankreich',
-            # Andere Europa (8)
-            'Portugal', 'Wales', 'Schottland', 'Irland', 'Schweiz', 'Österreich', 'Ungarn', 'Dänemark',
-            
-            # Ozeanien (10)
-            'Neuseeland', 'Neuseeland', 'Neuseeland', 'Australien', 'Australien', 'Australien',
-            'Australien', 'Australien', 'Australien', 'Australien',
-            
-            # Afrika (12)
-            'Namibia', 'Botswana', 'Südafrika', 'Südafrika', 'Marokko', 'Marokko',
-            'Algerien', 'Algerien', 'Äthiopien', 'Äthiopien', 'Niger', 'Chad',
-            
-            # Asien (12)
-            'Indien', 'Indien', 'Indien', 'Indien', 'Nepal', 'Nepal', 'Nepal',
-            'Tibet/China', 'Mongolei', 'Tadschikistan', 'Pakistan', 'China'
-        ],
-        
-        
-        'Latitude': [
-            # Chile (8)
-            -24.6282, -24.0258, -24.6275, -29.2563, -29.0158, -30.1697, -29.9081, -22.9083,
-            
-            # USA (25)
-            19.8207, 36.5054, 33.8792, 37.5930, 38.2972, 38.7331, 39.2856, 36.0544,
-            29.1275, 30.6792, 41.6628, 38.2972, 44.3500, 44.9778, 43.7904,
-            43.8554, 48.7596, 63.0695, 64.8378, 33.3533, 34.2256, 35.2119,
-            34.0784, 38.5762, 37.7326,
-            
-            # Kanada (8)
-            52.8737, 45.4532, 45.5017, 46.0126, 42.2619, 49.6000, 59.1253, 44.4000,
-            
-            # Europa (25)
-            # Spanien (8)
-            28.7606, 28.3000, 37.2200, 41.5900, 43.1500, 37.0900, 39.4500, 28.3500,
-            # Deutschland (5)
-            47.4211, 50.4986, 52.6833, 50.3833, 47.8742,
-            # Frankreich (4)
-            42.9369, 45.8326, 44.2619, 48.9333,
-            # Andere Europa (8)
-            38.2433, 51.8838, 55.0000, 52.1392, 46.5472, 47.0000, 46.2283, 54.9833,
-            
-            # Ozeanien (10)
-            -44.0061, -36.1833, -44.0000, -25.3444, -32.1283, -31.2833, -32.5000, -24.5000, -17.0000, -42.0000,
-            
-            # Afrika (12)
-            -25.0000, -22.0000, -32.2928, -29.1319, 31.7917, 31.0500, 23.0000, 23.2667, 9.1450, 13.2667, 18.5000, 20.0000,
-            
-            # Asien (12)
-            34.1526, 32.2432, 33.7000, 27.0000, 28.0000, 28.5000, 29.3000, 30.0000, 43.0000, 38.5000, 36.0000, 39.0000
-        ],
-        
-        'Longitude': [
-            # Chile (8)
-            -70.4034, -67.7558, -70.4033, -70.7369, -70.6919, -70.8150, -70.8217, -68.2650,
-            
-            # USA (25)
-            -155.4681, -117.0794, -116.4194, -112.1660, -111.2615, -109.5925, -114.2669, -112.1401,
-            -103.2420, -104.0228, -77.8261, -78.4569, -68.2733, -110.5422, -110.8020,
-            -101.9777, -113.7870, -153.0000, -147.7164, -116.8658, -118.0575, -111.6647,
-            -106.8200, -107.7211, -105.5943,
-            
-            # Kanada (8)
-            -117.9542, -71.1513, -78.3947, -81.4017, -82.5156, -109.0000, -112.0000, -65.0000,
-            
-            # Europa (25)
-            # Spanien (8)
-            -17.8847, -16.6400, -2.5400, 1.1167, -5.0000, -3.1800, -6.5000, -14.0000,
-            # Deutschland (5)
-            10.9850, 9.9406, 12.4167, 6.4167, 8.1058,
-            # Frankreich (4)
-            0.1426, 6.8652, 3.8167, 7.1167,
-            # Andere Europa (8)
-            -7.5000, -3.4360, -4.0000, -9.9267, 7.9853, 13.0000, 18.2167, 12.4500,
-            
-            # Ozeanien (10)
-            170.1409, 175.0833, 170.0000, 131.0369, 138.6283, 149.0167, 129.0000, 127.0000, 128.0000, 147.0000,
-            
-            # Afrika (12)
-            16.0000, 24.0000, 20.0000, 29.4189, -7.0926, -8.0000, 5.0000, 5.5667, 40.4897, 38.2667, 8.0000, 18.0000,
-            
-            # Asien (12)
-            77.5771, 78.0647, 78.0000, 72.0000, 86.9250, 84.0000, 83.8000, 88.0000, 103.0000, 71.0000, 76.0000, 84.0000
-        ],
-        
-        'Höhe_m': [
-            # Chile (8)
-            2400, 5000, 2635, 2400, 2380, 2200, 1500, 2300,
-            
-            # USA (25)
-            4200, 1669, 1230, 2400, 1800, 1500, 2000, 2100, 1200, 2075, 670, 1100, 158, 2400, 2300,
-            1000, 1040, 650, 134, 1706, 1742, 2210, 2100, 2700, 2200,
-            
-            # Kanada (8)
-            1200, 1114, 400, 500, 200, 1000, 200, 50,
-            
-            # Europa (25)
-            # Spanien (8)
-            2396, 2000, 1200, 1000, 1800, 2000, 500, 600,
-            # Deutschland (5)
-            2962, 950, 75, 600, 1493,
-            # Frankreich (4)
-            2877, 4809, 800, 600,
-            # Andere Europa (8)
-            152, 520, 350, 344, 3454, 3798, 400, 50,
-            
-            # Ozeanien (10)
-            1031, 200, 1000, 348, 800, 600, 150, 400, 400, 1000,
-            
-            # Afrika (12)
-            1200, 1000, 1200, 2000, 1165, 2000, 800, 1800, 2500, 3000, 1500, 1500,
-            
-            # Asien (12)
-            3500, 4000, 4200, 400, 5000, 4200, 3800, 4500, 1500, 3800, 4000, 800
-        ],
-        
-        'Bortle_Skala': [
-            # Chile (8)
-            1, 1, 1, 1, 1, 1, 1, 1,
-            
-            # USA (25)
-            1, 1, 2, 2, 2, 2, 1, 2, 1, 1, 2, 3, 3, 2, 2, 2, 2, 1, 2, 2, 2, 2, 1, 2, 2,
-            
-            # Kanada (8)
-            2, 2, 3, 2, 3, 1, 1, 3,
-            
-            # Europa (25)
-            # Spanien (8)
-            2, 2, 2, 2, 3, 3, 3, 2,
-            # Deutschland (5)
-            2, 3, 2, 3, 2,
-            # Frankreich (4)
-            2, 2, 3, 3,
-            # Andere Europa (8)
-            2, 3, 2, 3, 1, 2, 2, 2,
-            
-            # Ozeanien (10)
-            1, 2, 2, 1, 1, 2, 1, 1, 1, 2,
-            
-            # Afrika (12)
-            1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
-            
-            # Asien (12)
-            1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1
-        ],
-        
-        'Klimazone': [
-            # Chile (8)
-            'desert', 'desert', 'desert', 'desert', 'desert', 'desert', 'desert', 'desert',
-            
-            # USA (25)
-            'oceanic', 'desert', 'desert', 'desert', 'desert', 'desert', 'desert', 'desert',
-            'desert', 'desert', 'continental', 'continental', 'oceanic', 'continental', 'continental',
-            'continental', 'continental', 'polar', 'polar', 'mediterranean', 'mediterranean', 'continental',
-            'continental', 'continental', 'desert',
-            
-            # Kanada (8)
-            'continental', 'continental', 'continental', 'continental', 'continental', 'continental', 'continental', 'oceanic',
-            
-            # Europa (25)
-            # Spanien (8)
-            'oceanic', 'oceanic', 'mediterranean', 'continental', 'continental', 'mediterranean', 'mediterranean', 'oceanic',
-            # Deutschland (5)
-            'continental', 'continental', 'continental', 'continental', 'continental',
-            # Frankreich (4)
-            'continental', 'continental', 'continental', 'continental',
-            # Andere Europa (8)
-            'mediterranean', 'oceanic', 'oceanic', 'oceanic', 'continental', 'continental', 'continental', 'oceanic',
-            
-            # Ozeanien (10)
-            'oceanic', 'oceanic', 'oceanic', 'desert', 'mediterranean', 'oceanic', 'desert', 'desert', 'tropical', 'oceanic',
-            
-            # Afrika (12)
-            'desert', 'desert', 'desert', 'continental', 'desert', 'continental', 'desert', 'desert', 'continental', 'continental', 'desert', 'desert',
-            
-            # Asien (12)
-            'desert', 'desert', 'desert', 'desert', 'continental', 'continental', 'continental', 'continental', 'continental', 'continental', 'continental', 'desert'
-        ]
-    }
-    
-    return pd.DataFrame(locations)
+# Inkrementelles Laden: Karte sofort zeigen, NASA-Daten blockweise nachladen
+INCREMENTAL_LOADING = os.environ.get('ASTRO_INCREMENTAL_LOADING', '1') != '0'
+INCREMENTAL_REFRESH_SECONDS = 1.0                    # Prüfintervall der Oberfläche
 
-# API-Integration mit mehreren Quellen
-@st.cache_data(ttl=8*3600)  # 8h Cache
-def enhance_location_data(df):
-    """Erweitere Daten mit mehreren APIs"""
-    api = MultiSourceWeatherAPI()
-    enhanced_data = []
-    
-    # Progress tracking
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
-    # Optional: OpenWeatherMap API Key (von User)
-    openweather_key = st.session_state.get('openweather_key', None)
+# Live-Wetter und Vorhersage (Prüfintervall, Zeiträume)
+LIVE_STATUS_REFRESH_SECONDS = 2.0   # Prüfintervall der Oberfläche
+FORECAST_WINDOWS = {'🌙 Heute Nacht': 24, '📆 Nächste 72 h': 72}
+
+# Export (nur auf Anfrage erzeugt, pro Filterstand zwischengespeichert)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'JSON': ('json', 'application/json'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'Excel (XLSX)': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+}
+EXPORT_CACHE_SIZE = 8        # Zwischengespeicherte Exportdateien
+
+# Karten-Detailstufen (serverseitige Gitter-Aggregation großer Kataloge)
+MAP_MARKER_LIMIT = 2000                      # Darüber werden Standorte zusammengefasst
+MAP_CLUSTER_LIMIT = 1500                     # Höchstzahl der Cluster-Punkte
+MAP_CLUSTER_CELLS = (0.5, 1, 2, 5, 10, 20)   # Zellgrößen in Grad, fein bis grob
+
+# Diagramm-Cache (serialisierte Plotly-Figuren pro Filterstand und Theme)
+FIGURE_CACHE_SIZE = 64
+
+# Reiseplaner
+TRIP_DEFAULT_NIGHTS = 10    # Voreingestellte Reisedauer
+TRIP_RESULT_ROWS = 20       # Angezeigte Standorte
+TRIP_HEATMAP_SITES = 15     # Standorte in der Nacht-für-Nacht-Ansicht
+
+
+@st.cache_data(max_entries=EXPORT_CACHE_SIZE, show_spinner=False)
+def build_export(_df, fingerprint, file_format):
+    """Exportdatei als Bytes (einmal pro Fingerabdruck und Format erzeugt)"""
+    buffer = io.BytesIO()
+    write_export(_df, file_format, buffer)
+    return buffer.getvalue()
+
+def map_cluster_cells(df, cell_deg):
+    """Gitterzelle jedes Standorts (Zeilen/Spalten in cell_deg-Grad-Schritten)"""
+    rows = np.floor((df['Latitude'].to_numpy(dtype=float) + 90) / cell_deg).astype(np.int64)
+    cols = np.floor((df['Longitude'].to_numpy(dtype=float) + 180) / cell_deg).astype(np.int64)
+    return rows * (int(np.ceil(360 / cell_deg)) + 1) + cols
+
+def choose_cluster_cell(df, limit=MAP_CLUSTER_LIMIT):
+    """Feinste Zellgröße, bei der höchstens limit Cluster entstehen"""
+    for cell_deg in MAP_CLUSTER_CELLS:
+        if len(np.unique(map_cluster_cells(df, cell_deg))) <= limit:
+            return cell_deg
+    return MAP_CLUSTER_CELLS[-1]
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def aggregate_map_points(_df, fingerprint, cell_deg):
+    """Ein Kartenpunkt pro Gitterzelle: Anzahl, Ø-Score und bester Standort"""
+    if len(_df) == 0:
+        return pd.DataFrame(columns=['Latitude', 'Longitude', 'Anzahl', 'Bester_Score', 'Ø_Score', 'Bester_Standort', 'Land'])
     
-    for idx, row in df.iterrows():
-        progress = (idx + 1) / len(df)
-        progress_bar.progress(progress)
-        status_text.text(f'🔄 {row["Name"]} ({idx+1}/{len(df)})')
-        
-        # NASA POWER API (Priorität 1)
-        nasa_result = api.get_nasa_power_data(
-            row['Latitude'], row['Longitude'], row['Name']
-        )
-        
-        # OpenWeatherMap (Priorität 2, optional)
-        openweather_result = {'success': False}
-        if openweather_key:
-            openweather_result = api.get_openweather_data(
-                row['Latitude'], row['Longitude'], openweather_key
-            )
-        
-        # Daten zusammenführen
-        if nasa_result['success']:
-            # NASA-Daten als Hauptquelle
-            clear_nights = nasa_result['clear_nights']
-            humidity = nasa_result['humidity']
-            temperature = nasa_result['temperature']
-            wind_speed = nasa_result.get('wind_speed', 5)
-            data_source = 'NASA POWER'
-            status = '🛰️ NASA'
-            
-            # OpenWeather-Daten für aktuelle Bedingungen hinzufügen
-            if openweather_result['success']:
-                current_conditions = f"Live: {openweather_result['current_clouds']}% Bewölkung"
-                status = '🛰️ NASA + 🌤️ Live'
-            else:
-                current_conditions = "Keine Live-Daten"
-                
-        elif openweather_result['success']:
-            # Nur OpenWeather verfügbar
-            clear_nights = api.get_enhanced_geographic_estimation(
-                row['Latitude'], row['Longitude'], 
-                row['Höhe_m'], row.get('Klimazone', None)
-            )
-            humidity = openweather_result['current_humidity']
-            temperature = openweather_result['current_temp']
-            wind_speed = 5
-            data_source = 'OpenWeather + Geographic'
-            status = '🌤️ Live + 🌍 Geo'
-            current_conditions = f"Live: {openweather_result['current_clouds']}% Bewölkung"
-            
-        else:
-            # Fallback: Erweiterte geografische Schätzung
-            clear_nights = api.get_enhanced_geographic_estimation(
-                row['Latitude'], row['Longitude'], 
-                row['Höhe_m'], row.get('Klimazone', None)
-            )
-            
-            # Temperatur-Schätzung (verbessert)
-            base_temp = 15  # Basis
-            altitude_effect = -row['Höhe_m'] / 150  # -6.5°C per 1000m
-            latitude_effect = -abs(row['Latitude']) / 4  # Breitengrad-Effekt
-            temperature = base_temp + altitude_effect + latitude_effect
-            
-            # Luftfeuchtigkeit nach Klimazone
-            climate_humidity = {
-                'desert': 20, 'mediterranean': 60, 'oceanic': 75,
-                'continental': 55, 'tropical': 80, 'polar': 70
-            }
-            humidity = climate_humidity.get(row.get('Klimazone', 'continental'), 50)
-            
-            wind_speed = 5
-            data_source = 'Enhanced Geographic'
-            status = '🌍 Erweiterte Schätzung'
-            current_conditions = "Geschätzt"
-        
-        # Standort-Typ basierend auf Name ableiten
-        name_lower = row['Name'].lower()
-        if any(word in name_lower for word in ['observatory', 'observatorium', 'telescope']):
-            location_type = 'Observatorium'
-        elif any(word in name_lower for word in ['desert', 'wüste', 'sahara', 'atacama', 'gobi']):
-            location_type = 'Wüste'
-        elif any(word in name_lower for word in ['national', 'park', 'preserve', 'reserve']):
-            location_type = 'Dark Sky Reserve'
-        elif any(word in name_lower for word in ['mountain', 'peak', 'berg', 'mont', 'alpen', 'himalaya']):
-            location_type = 'Hochgebirge'
-        elif any(word in name_lower for word in ['island', 'insel']):
-            location_type = 'Insel'
-        else:
-            location_type = 'Naturgebiet'
-        
-        enhanced_row = {
-            **row.to_dict(),
-            'Klare_Nächte_Jahr': clear_nights,
-            'Luftfeuchtigkeit_%': round(humidity, 1),
-            'Temperatur_°C': round(temperature, 1),
-            'Wind_kmh': round(wind_speed, 1),
-            'Datenquelle': data_source,
-            'Status': status,
-            'Typ': location_type,
-            'Aktuelle_Bedingungen': current_conditions,
-            'Qualitätsscore': calculate_quality_score(clear_nights, row['Bortle_Skala'], row['Höhe_m'])
-        }
-        
-        enhanced_data.append(enhanced_row)
-        
-        # Rate limiting
-        time.sleep(0.05)  # 50ms Pause
+    cells, inverse = np.unique(map_cluster_cells(_df, cell_deg), return_inverse=True)
+    count = np.bincount(inverse)
+    score = _df['Qualitätsscore'].to_numpy(dtype=float)
     
-    progress_bar.empty()
-    status_text.empty()
+    # Bester Standort je Zelle: nach Zelle, dann absteigendem Score sortieren, ersten nehmen
+    order = np.lexsort((-score, inverse))
+    best = order[np.r_[0, np.flatnonzero(np.diff(inverse[order])) + 1]]
     
-    return pd.DataFrame(enhanced_data)
+    return pd.DataFrame({
+        'Latitude': np.bincount(inverse, weights=_df['Latitude'].to_numpy(dtype=float)) / count,
+        'Longitude': np.bincount(inverse, weights=_df['Longitude'].to_numpy(dtype=float)) / count,
+        'Anzahl': count,
+        'Bester_Score': score[best],
+        'Ø_Score': np.round(np.bincount(inverse, weights=score) / count, 1),
+        'Bester_Standort': _df['Name'].to_numpy()[best],
+        'Land': _df['Land'].to_numpy()[best]
+    })
 
-def calculate_quality_score(clear_nights, bortle, altitude):
-    """Berechne Qualitätsscore für Astrotourismus (0-100)"""
-    # Gewichtung: 50% klare Nächte, 30% Bortle, 20% Höhe
-    nights_score = min(clear_nights / 350 * 100, 100)
-    bortle_score = (4 - bortle) / 3 * 100  # Niedriger Bortle = besser
-    altitude_score = min(altitude / 4000 * 100, 100)
-    
-    total_score = (nights_score * 0.5 + bortle_score * 0.3 + altitude_score * 0.2)
-    return round(total_score, 1)
+@st.cache_resource(show_spinner=False)
+def plotly_express():
+    """plotly.express erst beim ersten neu gebauten Diagramm laden (nicht beim Start)"""
+    import plotly.express as px
+    return px
+
+@st.cache_data(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+@timed('figure')
+def figure_json(name, fingerprint, plot_template, map_style, _build):
+    """Plotly-Figur als JSON, einmal pro (Diagramm, Filterstand, Template, Kartenstil) erzeugt"""
+    get_metrics().inc('astro_cache_misses_total', cache='figure')
+    return _build().to_json()
 
 # Hauptanwendung
 st.title("🌟 Ultimative Astrotourismus Weltkarte")
@@ -609,44 +134,56 @@ if openweather_key:
 else:
     st.sidebar.info("ℹ️ Nur NASA-Daten ohne Live-Updates")
 
-# Daten laden
-if 'mega_data_loaded' not in st.session_state:
-    st.session_state.mega_data_loaded = False
+# Daten laden (prozessweit geteilt: eine Anreicherung für alle Sessions)
+try:
+    data_service = get_data_service()
+except (OSError, ValueError) as e:
+    st.error(f"❌ Standort-Katalog konnte nicht geladen werden: {e}")
+    st.stop()
+enhanced_df, st.session_state.data_version = data_service.snapshot()
 
-if not st.session_state.mega_data_loaded:
-    with st.container():
-        st.info("🚀 Lade umfassende Astrotourismus-Datenbank mit NASA POWER API...")
-        
-        # Basis-Daten laden
-        base_df = load_comprehensive_locations()
-        st.write(f"📍 {len(base_df)} Standorte geladen")
-        
-        # API-Enhancement
-        enhanced_df = enhance_location_data(base_df)
-        
-        st.session_state.enhanced_df = enhanced_df
-        st.session_state.mega_data_loaded = True
-        st.success(f"✅ {len(enhanced_df)} Standorte mit API-Daten erweitert!")
+# Optionaler Prometheus-Endpunkt (einmal pro Prozess)
+if METRICS_PORT:
+    try:
+        start_metrics_server(METRICS_PORT)
+    except OSError as e:
+        st.sidebar.warning(f"⚠️ Metrik-Endpunkt auf Port {METRICS_PORT} nicht verfügbar: {e}")
+
+@st.fragment(run_every=INCREMENTAL_REFRESH_SECONDS)
+def show_loading_progress():
+    """Fortschritt der Anreicherung; neue Ergebnisse lösen einen App-Rerun aus"""
+    progress = data_service.progress()
+    if progress is not None:
+        done, total = progress
+        if data_service.is_partial():
+            text = f"🛰️ NASA-Daten werden nachgeladen: {done}/{total} Standorte"
+        else:
+            text = f"🔄 Hintergrund-Aktualisierung: {done}/{total} Standorte"
+        st.progress(done / total, text=text)
+    
+    if data_service.version_key() != st.session_state.get('data_version'):
         st.rerun()
-else:
-    enhanced_df = st.session_state.enhanced_df
+
+if data_service.progress() is not None:
+    show_loading_progress()
+    
+    if not INCREMENTAL_LOADING and data_service.is_partial():
+        st.info("🚀 Lade umfassende Astrotourismus-Datenbank mit NASA POWER API...")
+        st.stop()
 
 # Sidebar Statistiken
 st.sidebar.markdown("---")
 st.sidebar.subheader("📊 Datenbank-Übersicht")
 
-nasa_count = len(enhanced_df[enhanced_df['Datenquelle'].str.contains('NASA')])
+filter_engine = data_service.filter_engine(enhanced_df)
+
+nasa_count = sum(count for source, count in filter_engine.counts['Datenquelle'].items() if 'NASA' in source)
 geo_count = len(enhanced_df) - nasa_count
 
-# Angepasste Kontinente-Zählung für 100 Standorte
-continents = {
-    'Europa': len(enhanced_df[enhanced_df['Land'].isin(['Deutschland', 'Frankreich', 'Spanien', 'Portugal', 'Wales', 'Schottland', 'Irland', 'Schweiz', 'Österreich', 'Ungarn', 'Dänemark'])]),
-    'Nordamerika': len(enhanced_df[enhanced_df['Land'].isin(['USA', 'Kanada'])]),
-    'Südamerika': len(enhanced_df[enhanced_df['Land'] == 'Chile']),
-    'Asien': len(enhanced_df[enhanced_df['Land'].isin(['Indien', 'Nepal', 'Tibet/China', 'China', 'Pakistan', 'Tadschikistan', 'Mongolei'])]),
-    'Afrika': len(enhanced_df[enhanced_df['Land'].isin(['Namibia', 'Südafrika', 'Botswana', 'Marokko', 'Algerien', 'Äthiopien', 'Chad', 'Niger'])]),
-    'Ozeanien': len(enhanced_df[enhanced_df['Land'].isin(['Australien', 'Neuseeland'])])
-}
+# Kontinente-Zählung aus der beim Laden abgeleiteten Spalte 'Kontinent'
+continents = {continent: filter_engine.count('Kontinent', continent) for continent in CONTINENT_COUNTRIES}
+if filter_engine.count('Kontinent', OTHER_CONTINENT):
+    continents[OTHER_CONTINENT] = filter_engine.count('Kontinent', OTHER_CONTINENT)
 
 st.sidebar.metric("🌍 Gesamt-Standorte", len(enhanced_df), f"Premium-Auswahl")
 st.sidebar.metric("🛰️ NASA-Daten", nasa_count, f"{nasa_count/len(enhanced_df)*100:.0f}%")
@@ -675,8 +212,7 @@ bortle_filter = st.sidebar.slider(
 )
 
 # Klare Nächte Filter
-clear_nights_min = int(enhanced_df['Klare_Nächte_Jahr'].min())
-clear_nights_max = int(enhanced_df['Klare_Nächte_Jahr'].max())
+clear_nights_min, clear_nights_max = (int(value) for value in filter_engine.value_range('Klare_Nächte_Jahr'))
 clear_nights_filter = st.sidebar.slider(
     "🌙 Min. klare Nächte/Jahr",
     min_value=clear_nights_min,
@@ -693,18 +229,10 @@ continent_filter = st.sidebar.multiselect(
 
 # Länder Filter basierend auf Kontinenten
 if continent_filter:
-    continent_countries = {
-        'Europa': ['Deutschland', 'Frankreich', 'Spanien', 'Portugal', 'Wales', 'Schottland', 'Irland', 'Schweiz', 'Österreich', 'Ungarn', 'Dänemark'],
-        'Nordamerika': ['USA', 'Kanada'],
-        'Südamerika': ['Chile'],
-        'Asien': ['Indien', 'Nepal', 'Tibet/China', 'China', 'Pakistan', 'Tadschikistan', 'Mongolei'],
-        'Afrika': ['Namibia', 'Südafrika', 'Botswana', 'Marokko', 'Algerien', 'Äthiopien', 'Chad', 'Niger'],
-        'Ozeanien': ['Australien', 'Neuseeland']
-    }
-    
-    available_countries = []
-    for continent in continent_filter:
-        available_countries.extend(continent_countries.get(continent, []))
+    available_countries = [
+        country for country in filter_engine.counts['Land']
+        if COUNTRY_CONTINENT.get(country, OTHER_CONTINENT) in continent_filter
+    ]
     
     country_filter = st.sidebar.multiselect(
         "🏴 Länder",
@@ -717,81 +245,193 @@ else:
 # Standort-Typ Filter
 type_filter = st.sidebar.multiselect(
     "🏛️ Standort-Typ",
-    options=sorted(enhanced_df['Typ'].unique()),
-    default=sorted(enhanced_df['Typ'].unique())
+    options=sorted(filter_engine.counts['Typ']),
+    default=sorted(filter_engine.counts['Typ'])
 )
 
 # Datenquellen Filter
 source_filter = st.sidebar.multiselect(
     "📡 Datenquellen",
-    options=sorted(enhanced_df['Datenquelle'].unique()),
-    default=sorted(enhanced_df['Datenquelle'].unique())
+    options=sorted(filter_engine.counts['Datenquelle']),
+    default=sorted(filter_engine.counts['Datenquelle'])
+)
+
+# Daten filtern (memoisiert pro Filter-Tupel)
+filtered_df = filter_engine.filter(
+    ranges=(
+        ('Qualitätsscore', quality_filter, None),
+        ('Klare_Nächte_Jahr', clear_nights_filter, None)
+    ),
+    values=(
+        ('Bortle_Skala', [value for value in filter_engine.counts['Bortle_Skala'] if value <= bortle_filter]),
+        ('Land', country_filter or None),
+        ('Typ', type_filter),
+        ('Datenquelle', source_filter)
+    )
+)
+
+# Live-Wetter und Vorhersage: beste gefilterte Standorte zuerst, Live-Daten als Überlagerung der Tabelle
+live_weather = get_live_weather(openweather_key) if openweather_key else None
+forecast_cache = get_forecast_cache(openweather_key or None) if openweather_key or FORECAST_FIXTURE else None
+weather_services = [service for service in (live_weather, forecast_cache) if service is not None]
+
+def with_live_weather(df):
+    """Live-Status und -Bedingungen ergänzen (ohne API-Key unverändert)"""
+    return live_weather.overlay(df) if live_weather is not None else df
+
+def weather_versions():
+    return tuple(service.version for service in weather_services)
+
+if weather_services:
+    st.session_state.weather_priority = filtered_df['Qualitätsscore'].sort_values(ascending=False, kind='stable').index
+    for service in weather_services:
+        service.request(st.session_state.weather_priority)
+    st.session_state.weather_versions = weather_versions()
+    filtered_df = with_live_weather(filtered_df)
+
+# Darstellung (gilt für alle Diagramme, Karten-Style basierend auf Tageszeit)
+st.sidebar.markdown("---")
+current_hour = datetime.now().hour
+default_dark = 20 <= current_hour or current_hour <= 6
+
+dark_mode = st.sidebar.toggle("🌙 Dark Mode", value=default_dark)
+map_style = "carto-darkmatter" if dark_mode else "open-street-map"
+plot_template = "plotly_dark" if dark_mode else "plotly"
+
+@st.fragment(run_every=LIVE_STATUS_REFRESH_SECONDS)
+def show_weather_status():
+    """Status von Live-Wetter und Vorhersage; fällige Zellen nachladen, neue Ergebnisse lösen einen App-Rerun aus"""
+    for service in weather_services:
+        service.request(st.session_state.weather_priority)
+    if live_weather is not None:
+        st.caption(f"🌤️ Live-Daten für {live_weather.fresh_sites()} Standorte")
+    if forecast_cache is not None:
+        st.caption(f"⛅ Vorhersage für {forecast_cache.covered_sites()} Standorte")
+    if openweather_key:
+        quota = get_api_quota(openweather_key)
+        st.caption(f"📡 {quota.calls_today()}/{quota.limit} OpenWeather-Abrufe heute (UTC)")
+    if weather_versions() != st.session_state.get('weather_versions'):
+        st.rerun()
+
+if weather_services:
+    with st.sidebar:
+        show_weather_status()
+
+# Schlüssel des Filterstands für zwischengespeicherte Diagramme
+view_fingerprint = table_fingerprint(filtered_df, (st.session_state.data_version, st.session_state.get('weather_versions')))
+
+def show_figure(name, build):
+    """Diagramm aus dem Figuren-Cache anzeigen (build wird nur bei neuem Schlüssel aufgerufen)"""
+    get_metrics().inc('astro_cache_requests_total', cache='figure')
+    spec = figure_json(name, view_fingerprint, plot_template, map_style, build)
+    # Als Figure zurückbauen: Streamlits dict-Pfad lehnt Figuren ohne Traces ab (leere Filter)
+    import plotly.io as pio
+    st.plotly_chart(pio.from_json(spec), use_container_width=True)
+
+# Ansichten: nur die gewählte wird berechnet (st.tabs würde alle aufbauen)
+active_view = st.radio(
+    "Ansicht",
+    options=[
+        "🗺️ Mega-Weltkarte", "🏆 Top-Standorte", "📊 Detaillierte Analyse",
+        "🧭 Reiseplaner", "🔍 Standort-Suche", "⚙️ Daten-Management"
+    ],
+    horizontal=True,
+    label_visibility="collapsed",
+    key="active_view"
 )
 
-# Daten filtern
-filtered_df = enhanced_df[
-    (enhanced_df['Qualitätsscore'] >= quality_filter) &
-    (enhanced_df['Bortle_Skala'] <= bortle_filter) &
-    (enhanced_df['Klare_Nächte_Jahr'] >= clear_nights_filter) &
-    (enhanced_df['Land'].isin(country_filter) if country_filter else True) &
-    (enhanced_df['Typ'].isin(type_filter)) &
-    (enhanced_df['Datenquelle'].isin(source_filter))
-]
-
-# Tabs für verschiedene Ansichten
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
-    "🗺️ Mega-Weltkarte", "🏆 Top-Standorte", "📊 Detaillierte Analyse", 
-    "🔍 Standort-Suche", "⚙️ Daten-Management"
-])
-
-with tab1:
+if active_view == "🗺️ Mega-Weltkarte":
     st.subheader(f"🌍 Astrotourismus Mega-Weltkarte ({len(filtered_df)} Standorte)")
     
-    # Karten-Style basierend auf Tageszeit
-    current_hour = datetime.now().hour
-    default_dark = 20 <= current_hour or current_hour <= 6
-    
-    dark_mode = st.toggle("🌙 Dark Mode", value=default_dark)
-    map_style = "carto-darkmatter" if dark_mode else "open-street-map"
-    plot_template = "plotly_dark" if dark_mode else "plotly"
-    
-    # Hauptkarte
-    fig_mega = px.scatter_mapbox(
-        filtered_df,
-        lat='Latitude',
-        lon='Longitude',
-        hover_name='Name',
-        hover_data={
-            'Land': True,
-            'Qualitätsscore': True,
-            'Klare_Nächte_Jahr': True,
-            'Bortle_Skala': True,
-            'Höhe_m': True,
-            'Status': True,
-            'Aktuelle_Bedingungen': True,
-            'Latitude': ':.4f',
-            'Longitude': ':.4f'
-        },
-        color='Qualitätsscore',
-        color_continuous_scale='Viridis',
-        size='Klare_Nächte_Jahr',
-        size_max=25,
-        zoom=1.5,
-        height=700,
-        title=f"🌟 Ultimative Astrotourismus-Weltkarte | {len(filtered_df)} Premium-Standorte"
+    # Detailstufe: einzelne Marker nur bis MAP_MARKER_LIMIT, sonst serverseitige Cluster
+    map_mode = st.radio(
+        "🔎 Darstellung",
+        options=["Automatisch", "Cluster", "Einzelne Standorte"],
+        horizontal=True,
+        help=f"Automatisch: einzelne Standorte bis {MAP_MARKER_LIMIT}, darüber Cluster pro Gitterzelle"
     )
+    show_clusters = map_mode == "Cluster" or (map_mode == "Automatisch" and len(filtered_df) > MAP_MARKER_LIMIT)
     
-    fig_mega.update_layout(
-        mapbox_style=map_style,
-        margin={"r":0,"t":50,"l":0,"b":0},
-        template=plot_template
-    )
+    if show_clusters:
+        cell_choice = st.select_slider(
+            "Zellgröße",
+            options=['Auto'] + list(MAP_CLUSTER_CELLS),
+            format_func=lambda cell: cell if cell == 'Auto' else f"{cell}°"
+        )
+        cell_deg = choose_cluster_cell(filtered_df) if cell_choice == 'Auto' else cell_choice
+        map_points = aggregate_map_points(
+            filtered_df, table_fingerprint(filtered_df, st.session_state.data_version), cell_deg
+        )
+        st.caption(f"📍 {len(map_points)} Cluster à {cell_deg}° für {len(filtered_df)} Standorte")
+        
+        map_name = f"map-cluster-{cell_deg}"
+        build_map = lambda: plotly_express().scatter_mapbox(
+            map_points,
+            lat='Latitude',
+            lon='Longitude',
+            hover_name='Bester_Standort',
+            hover_data={
+                'Land': True,
+                'Anzahl': True,
+                'Bester_Score': True,
+                'Ø_Score': True,
+                'Latitude': ':.2f',
+                'Longitude': ':.2f'
+            },
+            color='Bester_Score',
+            color_continuous_scale='Viridis',
+            size='Anzahl',
+            size_max=30,
+            zoom=1.5,
+            height=700,
+            title=f"🌟 Ultimative Astrotourismus-Weltkarte | {len(filtered_df)} Standorte in {len(map_points)} Clustern"
+        )
+    else:
+        map_df = filtered_df
+        if len(filtered_df) > MAP_MARKER_LIMIT:
+            map_df = filtered_df.nlargest(MAP_MARKER_LIMIT, 'Qualitätsscore')
+            st.caption(f"📍 Die besten {MAP_MARKER_LIMIT} von {len(filtered_df)} Standorten")
+        
+        map_name = "map-markers"
+        build_map = lambda: plotly_express().scatter_mapbox(
+            map_df,
+            lat='Latitude',
+            lon='Longitude',
+            hover_name='Name',
+            hover_data={
+                'Land': True,
+                'Qualitätsscore': True,
+                'Klare_Nächte_Jahr': True,
+                'Bortle_Skala': True,
+                'Höhe_m': True,
+                'Status': True,
+                'Aktuelle_Bedingungen': True,
+                'Latitude': ':.4f',
+                'Longitude': ':.4f'
+            },
+            color='Qualitätsscore',
+            color_continuous_scale='Viridis',
+            size='Klare_Nächte_Jahr',
+            size_max=25,
+            zoom=1.5,
+            height=700,
+            title=f"🌟 Ultimative Astrotourismus-Weltkarte | {len(filtered_df)} Premium-Standorte"
+        )
     
-    fig_mega.update_coloraxes(
-        colorbar_title="Qualitätsscore<br>(0-100)"
-    )
+    def build_mega_map():
+        fig_mega = build_map()
+        fig_mega.update_layout(
+            mapbox_style=map_style,
+            margin={"r":0,"t":50,"l":0,"b":0},
+            template=plot_template
+        )
+        
+        fig_mega.update_coloraxes(
+            colorbar_title="Qualitätsscore<br>(0-100)"
+        )
+        return fig_mega
     
-    st.plotly_chart(fig_mega, use_container_width=True)
+    show_figure(map_name, build_mega_map)
     
     # Legende und Statistiken
     col1, col2, col3 = st.columns(3)
@@ -799,9 +439,9 @@ with tab1:
     with col1:
         st.markdown("""
         **🎯 Kartenlegende:**
-        - 🔵 **Größe**: Klare Nächte/Jahr
-        - 🌈 **Farbe**: Qualitätsscore (gelb=top)
-        - 📊 **Score**: 50% Nächte + 30% Bortle + 20% Höhe
+        - 🔵 **Größe**: Klare Nächte/Jahr (Cluster: Anzahl Standorte)
+        - 🌈 **Farbe**: Qualitätsscore (Cluster: bester Score, gelb=top)
+        - 📊 **Score**: 40% Nächte + 25% Bortle + 15% Höhe + 20% mondfreie Dunkelheit
         """)
     
     with col2:
@@ -817,27 +457,30 @@ with tab1:
             st.metric("🏆 Top-Standort", best_site['Name'])
             st.metric("🌟 Score", f"{best_site['Qualitätsscore']}", f"{best_site['Land']}")
 
-with tab2:
+elif active_view == "🏆 Top-Standorte":
     st.subheader("🏆 Top-Standorte für Astrotourismus")
     
     # Top 20 nach Qualitätsscore
     top_sites = filtered_df.nlargest(20, 'Qualitätsscore')
     
     # Interaktive Top-Liste
-    fig_top = px.bar(
-        top_sites,
-        x='Qualitätsscore',
-        y='Name',
-        color='Datenquelle',
-        title="🥇 Top 20 Astrotourismus-Standorte nach Qualitätsscore",
-        orientation='h',
-        height=800,
-        template=plot_template,
-        hover_data=['Klare_Nächte_Jahr', 'Bortle_Skala', 'Höhe_m']
-    )
+    def build_top_chart():
+        fig_top = plotly_express().bar(
+            top_sites,
+            x='Qualitätsscore',
+            y='Name',
+            color='Datenquelle',
+            title="🥇 Top 20 Astrotourismus-Standorte nach Qualitätsscore",
+            orientation='h',
+            height=800,
+            template=plot_template,
+            hover_data=['Klare_Nächte_Jahr', 'Bortle_Skala', 'Höhe_m']
+        )
+        
+        fig_top.update_layout(yaxis={'categoryorder':'total ascending'})
+        return fig_top
     
-    fig_top.update_layout(yaxis={'categoryorder':'total ascending'})
-    st.plotly_chart(fig_top, use_container_width=True)
+    show_figure('top20', build_top_chart)
     
     # Detaillierte Top-10 Tabelle
     st.subheader("📋 Top 10 im Detail")
@@ -864,6 +507,11 @@ with tab2:
                 st.metric("Datenquelle", site['Status'])
                 st.metric("Standort-Typ", site['Typ'])
             
+            st.markdown(
+                f"**🌑 Dunkelheit:** Ø {site['Dunkelstunden']:.1f} h pro Nacht, davon mondfrei {site['Mondfreie_Stunden']:.1f} h, "
+                f"Milchstraßenzentrum {site['Milchstraße_Stunden']:.1f} h sichtbar"
+            )
+            
             # GPS und Maps
             st.markdown(f"**📍 GPS:** {site['Latitude']:.4f}°, {site['Longitude']:.4f}°")
             gmaps_url = f"https://maps.google.com/maps?q={site['Latitude']},{site['Longitude']}"
@@ -872,7 +520,7 @@ with tab2:
             if site['Aktuelle_Bedingungen'] != 'Geschätzt':
                 st.info(f"🌤️ {site['Aktuelle_Bedingungen']}")
 
-with tab3:
+elif active_view == "📊 Detaillierte Analyse":
     st.subheader("📊 Umfassende Datenanalyse")
     
     # Multi-Analyse Dashboard
@@ -880,29 +528,27 @@ with tab3:
     
     with col1:
         # Qualitätsscore Verteilung
-        fig_quality = px.histogram(
+        show_figure('quality-histogram', lambda: plotly_express().histogram(
             filtered_df,
             x='Qualitätsscore',
             nbins=20,
             title='🏆 Verteilung Qualitätsscore',
             template=plot_template,
             color_discrete_sequence=['#ff6b6b']
-        )
-        st.plotly_chart(fig_quality, use_container_width=True)
+        ))
         
         # Datenquellen Pie Chart
-        fig_sources = px.pie(
+        show_figure('sources-pie', lambda: plotly_express().pie(
             filtered_df,
             names='Datenquelle',
             title='📡 Datenquellen-Verteilung',
             template=plot_template,
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        st.plotly_chart(fig_sources, use_container_width=True)
+            color_discrete_sequence=plotly_express().colors.qualitative.Set3
+        ))
     
     with col2:
         # 3D Scatter: Höhe vs Klare Nächte vs Bortle
-        fig_3d = px.scatter_3d(
+        show_figure('scatter-3d', lambda: plotly_express().scatter_3d(
             filtered_df,
             x='Höhe_m',
             y='Klare_Nächte_Jahr',
@@ -913,26 +559,23 @@ with tab3:
             title='🌐 3D-Analyse: Höhe vs Nächte vs Bortle',
             template=plot_template,
             color_continuous_scale='Viridis'
-        )
-        st.plotly_chart(fig_3d, use_container_width=True)
+        ))
         
         # Kontinente Vergleich
         if len(filtered_df) > 0:
-            continent_stats = []
-            for continent, countries in continent_countries.items():
-                continent_data = filtered_df[filtered_df['Land'].isin(countries)]
-                if len(continent_data) > 0:
-                    continent_stats.append({
-                        'Kontinent': continent,
-                        'Anzahl': len(continent_data),
-                        'Ø Score': continent_data['Qualitätsscore'].mean(),
-                        'Ø Nächte': continent_data['Klare_Nächte_Jahr'].mean(),
-                        'Beste': continent_data.loc[continent_data['Qualitätsscore'].idxmax(), 'Name']
-                    })
-            
-            if continent_stats:
-                continent_df = pd.DataFrame(continent_stats)
-                fig_continents = px.bar(
+            def build_continent_chart():
+                # Ein groupby-Durchlauf statt einer Suche pro Kontinent
+                by_continent = filtered_df.groupby('Kontinent', sort=False, observed=True)
+                continent_df = by_continent.agg(**{
+                    'Anzahl': ('Name', 'size'),
+                    'Ø Score': ('Qualitätsscore', 'mean'),
+                    'Ø Nächte': ('Klare_Nächte_Jahr', 'mean')
+                })
+                continent_df['Beste'] = filtered_df.loc[by_continent['Qualitätsscore'].idxmax(), 'Name'].to_numpy()
+                continent_order = list(CONTINENT_COUNTRIES) + [OTHER_CONTINENT]
+                continent_df = continent_df.reindex([c for c in continent_order if c in continent_df.index]).reset_index()
+                
+                return plotly_express().bar(
                     continent_df,
                     x='Kontinent',
                     y='Ø Score',
@@ -941,25 +584,192 @@ with tab3:
                     color='Ø Score',
                     color_continuous_scale='Viridis'
                 )
-                st.plotly_chart(fig_continents, use_container_width=True)
+            
+            show_figure('continents', build_continent_chart)
     
     # Korrelations-Heatmap
     st.subheader("🔗 Korrelationsanalyse")
     
     numeric_columns = ['Qualitätsscore', 'Klare_Nächte_Jahr', 'Bortle_Skala', 'Höhe_m', 'Luftfeuchtigkeit_%', 'Temperatur_°C']
-    correlation_matrix = filtered_df[numeric_columns].corr()
     
-    fig_corr = px.imshow(
-        correlation_matrix,
+    show_figure('correlation', lambda: plotly_express().imshow(
+        filtered_df[numeric_columns].corr(),
         text_auto=True,
         aspect="auto",
         title="🔗 Korrelationsmatrix der Hauptfaktoren",
         template=plot_template,
         color_continuous_scale='RdBu'
+    ))
+    
+    # Beste Reisezeit: Monatswerte aus dem Klimawürfel, Monatswechsel ohne neue Abfrage
+    st.subheader("📅 Beste Reisezeit")
+    
+    climate_cube = data_service.climate_cube(enhanced_df)
+    cube_rows = enhanced_df.index.get_indexer(filtered_df.index)
+    
+    travel_month = st.select_slider(
+        "Reisemonat",
+        options=list(range(12)),
+        value=datetime.now().month - 1,
+        format_func=lambda month: MONTH_NAMES[month]
     )
-    st.plotly_chart(fig_corr, use_container_width=True)
+    st.caption(
+        f"🛰️ Monatsdaten für {int(climate_cube.has_data[cube_rows].sum())} von {len(filtered_df)} Standorten, "
+        "übrige mit gleichmäßig verteilter Jahresschätzung"
+    )
+    
+    month_df = filtered_df.assign(
+        Monatsscore=np.round(climate_cube.scores[cube_rows, travel_month], 1),
+        Klare_Nächte_Monat=np.round(climate_cube.clear_nights[cube_rows, travel_month]).astype(np.int16),
+        Mondfreie_Stunden_Monat=np.round(climate_cube.darkness['moonless_dark_hours'][cube_rows, travel_month], 1),
+        Bester_Monat=np.array(MONTH_NAMES)[climate_cube.best_month[cube_rows]]
+    )
+    st.dataframe(
+        month_df.nlargest(10, 'Monatsscore')[['Name', 'Land', 'Monatsscore', 'Klare_Nächte_Monat', 'Mondfreie_Stunden_Monat', 'Bester_Monat', 'Qualitätsscore']],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Name": st.column_config.TextColumn("🏔️ Standort", width="medium"),
+            "Monatsscore": st.column_config.NumberColumn(f"🏆 Score {MONTH_NAMES[travel_month]}", format="%.1f"),
+            "Klare_Nächte_Monat": st.column_config.NumberColumn("🌙 Klare Nächte im Monat"),
+            "Mondfreie_Stunden_Monat": st.column_config.NumberColumn("🌑 Mondfrei (h/Nacht)", format="%.1f"),
+            "Bester_Monat": st.column_config.TextColumn("📅 Bester Monat"),
+            "Qualitätsscore": st.column_config.NumberColumn("🏆 Jahresscore", format="%.1f")
+        }
+    )
+    
+    if len(filtered_df) > 0:
+        def build_month_heatmap():
+            # Die 20 Standorte mit dem besten Monatsmittel, Score pro Monat
+            top_rows = np.argsort(-climate_cube.scores[cube_rows].mean(axis=1), kind='stable')[:20]
+            return plotly_express().imshow(
+                climate_cube.scores[cube_rows[top_rows]],
+                x=[name[:3] for name in MONTH_NAMES],
+                y=filtered_df['Name'].to_numpy()[top_rows].tolist(),
+                aspect="auto",
+                title="📅 Monatsscore der Top-20-Standorte",
+                template=plot_template,
+                color_continuous_scale='Viridis',
+                zmin=0,
+                zmax=100
+            )
+        
+        show_figure('month-heatmap', build_month_heatmap)
 
-with tab4:
+elif active_view == "🧭 Reiseplaner":
+    st.subheader("🧭 Reiseplaner: Wohin im gewählten Zeitraum?")
+    st.caption("Rangfolge nach erwarteten klaren, mondfreien Dunkelstunden (Klimadaten × Mondphase und Dunkelheit pro Nacht)")
+    
+    # Sites × Nächte einmal pro Tabellenstand und Tag, der Zeitraum ist nur noch eine Matrixrechnung
+    trip_planner = data_service.trip_planner(enhanced_df)
+    first_night = trip_planner.dates[0].astype(object)
+    last_night = trip_planner.dates[-1].astype(object)
+    
+    trip_start, trip_end = st.slider(
+        "📅 Reisezeitraum (Nachtbeginn)",
+        min_value=first_night,
+        max_value=last_night,
+        value=(first_night, first_night + timedelta(days=TRIP_DEFAULT_NIGHTS - 1)),
+        format="DD.MM.YYYY"
+    )
+    
+    filtered_mask = np.zeros(len(enhanced_df), dtype=bool)
+    filtered_mask[enhanced_df.index.get_indexer(filtered_df.index)] = True
+    
+    # Optionaler Startort: nur Standorte im Umkreis (räumlicher Index)
+    near = None
+    if st.checkbox("📍 Startort berücksichtigen"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            trip_lat = st.number_input("Breitengrad", min_value=-90.0, max_value=90.0, value=50.11, format="%.4f", key="trip_lat")
+        with col2:
+            trip_lon = st.number_input("Längengrad", min_value=-180.0, max_value=180.0, value=8.68, format="%.4f", key="trip_lon")
+        with col3:
+            trip_radius = st.slider("Max. Entfernung (km)", min_value=100, max_value=20000, value=3000, step=100)
+        near = data_service.spatial_index(enhanced_df).within(trip_lat, trip_lon, trip_radius)
+    
+    trip_df = trip_planner.rank(trip_start, trip_end, allowed=filtered_mask, near=near, limit=TRIP_RESULT_ROWS)
+    trip_nights = (trip_end - trip_start).days + 1
+    
+    if len(trip_df) > 0:
+        best_site = trip_df.iloc[0]
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("🏆 Bester Standort", best_site['Name'])
+        with col2:
+            st.metric("🌌 Erwartete Beobachtungsstunden", f"{best_site['Erwartete_Stunden']:.1f} h")
+        with col3:
+            st.metric("🌙 Erwartete klare Nächte", f"{best_site['Klare_Nächte_erwartet']:.1f} / {trip_nights}")
+        
+        # Beste Nacht pro Standort aus der Nacht-Matrix der angezeigten Standorte
+        trip_rows = enhanced_df.index.get_indexer(trip_df.index)
+        night_dates, night_hours = trip_planner.nightly(trip_rows, trip_start, trip_end)
+        trip_df = trip_df.assign(
+            Beste_Nacht=pd.to_datetime(night_dates[np.argmax(night_hours, axis=1)]).strftime('%d.%m.%Y')
+        )
+        
+        trip_columns = ['Name', 'Land', 'Erwartete_Stunden', 'Klare_Nächte_erwartet', 'Mondfreie_Stunden_Nacht', 'Beste_Nacht']
+        if near is not None:
+            trip_columns.append('Entfernung_km')
+        st.dataframe(
+            trip_df[trip_columns + ['Qualitätsscore']],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Name": st.column_config.TextColumn("🏔️ Standort", width="medium"),
+                "Erwartete_Stunden": st.column_config.NumberColumn("🌌 Erwartete Stunden", format="%.1f"),
+                "Klare_Nächte_erwartet": st.column_config.NumberColumn("🌙 Klare Nächte", format="%.1f"),
+                "Mondfreie_Stunden_Nacht": st.column_config.NumberColumn("🌑 Mondfrei (h/Nacht)", format="%.1f"),
+                "Beste_Nacht": st.column_config.TextColumn("⭐ Beste Nacht"),
+                "Entfernung_km": st.column_config.NumberColumn("📏 Entfernung (km)", format="%.0f"),
+                "Qualitätsscore": st.column_config.NumberColumn("🏆 Jahresscore", format="%.1f")
+            }
+        )
+        
+        def build_trip_heatmap():
+            return plotly_express().imshow(
+                night_hours[:TRIP_HEATMAP_SITES],
+                x=pd.to_datetime(night_dates).strftime('%d.%m.').tolist(),
+                y=trip_df['Name'].to_numpy()[:TRIP_HEATMAP_SITES].tolist(),
+                aspect="auto",
+                title="🌌 Erwartete Beobachtungsstunden pro Nacht",
+                template=plot_template,
+                color_continuous_scale='Viridis',
+                zmin=0
+            )
+        
+        near_key = (trip_lat, trip_lon, trip_radius) if near is not None else None
+        show_figure(f"trip-{trip_start}-{trip_end}-{near_key}", build_trip_heatmap)
+    else:
+        st.info("Keine gefilterten Standorte für diese Auswahl")
+    
+    # Kurzfristig: stündliche Vorhersage statt Klimatologie (OpenWeather-Key oder lokale Datei)
+    st.subheader("⛅ Beste Standorte laut Wettervorhersage")
+    if forecast_cache is None:
+        st.info("ℹ️ Für die Wettervorhersage wird ein OpenWeatherMap API Key benötigt")
+    else:
+        forecast_window = st.radio("Vorhersage-Zeitraum", options=list(FORECAST_WINDOWS), horizontal=True)
+        forecast_df = forecast_cache.rank(
+            enhanced_df, FORECAST_WINDOWS[forecast_window], allowed=filtered_mask, limit=TRIP_RESULT_ROWS
+        )
+        
+        if len(forecast_df) > 0:
+            st.dataframe(
+                forecast_df[['Name', 'Land', 'Beobachtungsstunden', 'Dunkelstunden_Vorhersage', 'Bewölkung_Nacht', 'Qualitätsscore']],
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Name": st.column_config.TextColumn("🏔️ Standort", width="medium"),
+                    "Beobachtungsstunden": st.column_config.NumberColumn("🌌 Klare, mondfreie Stunden", format="%.1f"),
+                    "Dunkelstunden_Vorhersage": st.column_config.NumberColumn("🌑 Dunkelstunden"),
+                    "Bewölkung_Nacht": st.column_config.NumberColumn("☁️ Bewölkung nachts (%)"),
+                    "Qualitätsscore": st.column_config.NumberColumn("🏆 Jahresscore", format="%.1f")
+                }
+            )
+        else:
+            st.info("⏳ Vorhersagen für die gefilterten Standorte werden geladen...")
+
+elif active_view == "🔍 Standort-Suche":
     st.subheader("🔍 Intelligente Standort-Suche")
     
     # Suchoptionen
@@ -968,7 +778,7 @@ with tab4:
     with col1:
         search_term = st.text_input(
             "🔍 Suche nach Standort, Land oder Region:",
-            placeholder="z.B. Atacama, Deutschland, Observatory..."
+            placeholder="z.B. Atacama, Deutschland, Sternwarte, Wueste..."
         )
     
     with col2:
@@ -977,50 +787,87 @@ with tab4:
             ["Alle Felder", "Nur Name", "Nur Land", "Nur Typ"]
         )
     
-    # Erweiterte Suchlogik
+    # Aktive Filter als Maske über die geteilte Tabelle (für Text- und Umkreissuche)
+    filtered_mask = np.zeros(len(enhanced_df), dtype=bool)
+    filtered_mask[enhanced_df.index.get_indexer(filtered_df.index)] = True
+    
+    # Invertierter Index (einmal pro Tabellenstand): Wörter, Aliase, Wortanfänge, Tippfehler
+    search_columns = {
+        "Alle Felder": SEARCH_COLUMNS,
+        "Nur Name": ['Name'],
+        "Nur Land": ['Land'],
+        "Nur Typ": ['Typ']
+    }[search_type]
+    
     if search_term:
-        search_lower = search_term.lower()
-        
-        if search_type == "Alle Felder":
-            mask = (
-                filtered_df['Name'].str.lower().str.contains(search_lower, na=False) |
-                filtered_df['Land'].str.lower().str.contains(search_lower, na=False) |
-                filtered_df['Typ'].str.lower().str.contains(search_lower, na=False)
-            )
-        elif search_type == "Nur Name":
-            mask = filtered_df['Name'].str.lower().str.contains(search_lower, na=False)
-        elif search_type == "Nur Land":
-            mask = filtered_df['Land'].str.lower().str.contains(search_lower, na=False)
-        else:  # Nur Typ
-            mask = filtered_df['Typ'].str.lower().str.contains(search_lower, na=False)
-        
-        search_results = filtered_df[mask].sort_values('Qualitätsscore', ascending=False)
+        search_index = data_service.search_index(enhanced_df)
+        search_results = with_live_weather(search_index.search(search_term, columns=search_columns, allowed=filtered_mask))
         
         if len(search_results) > 0:
             st.success(f"✅ {len(search_results)} Standorte gefunden")
             
             # Karte der Suchergebnisse
             if len(search_results) <= 50:  # Nur bei wenigen Ergebnissen
-                fig_search = px.scatter_mapbox(
-                    search_results,
-                    lat='Latitude',
-                    lon='Longitude',
-                    hover_name='Name',
-                    color='Qualitätsscore',
-                    size='Klare_Nächte_Jahr',
-                    zoom=2,
-                    height=400,
-                    title=f"🎯 Suchergebnisse für '{search_term}'",
-                    template=plot_template
-                )
-                fig_search.update_layout(mapbox_style=map_style)
-                st.plotly_chart(fig_search, use_container_width=True)
+                def build_search_map():
+                    fig_search = plotly_express().scatter_mapbox(
+                        search_results,
+                        lat='Latitude',
+                        lon='Longitude',
+                        hover_name='Name',
+                        color='Qualitätsscore',
+                        size='Klare_Nächte_Jahr',
+                        zoom=2,
+                        height=400,
+                        title=f"🎯 Suchergebnisse für '{search_term}'",
+                        template=plot_template
+                    )
+                    fig_search.update_layout(mapbox_style=map_style)
+                    return fig_search
+                
+                show_figure(f"search-{search_type}-{search_term}", build_search_map)
         else:
             st.warning("❌ Keine Standorte gefunden. Versuche andere Suchbegriffe.")
-            search_results = pd.DataFrame()
     else:
         search_results = filtered_df
     
+    # Umkreissuche um einen eigenen Standort (räumlicher Index, aktive Filter gelten)
+    st.subheader("🏠 Beste Standorte in meiner Nähe")
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        home_lat = st.number_input("Breitengrad", min_value=-90.0, max_value=90.0, value=50.11, format="%.4f")
+    with col2:
+        home_lon = st.number_input("Längengrad", min_value=-180.0, max_value=180.0, value=8.68, format="%.4f")
+    with col3:
+        home_radius = st.slider("Umkreis (km)", min_value=50, max_value=5000, value=1000, step=50)
+    with col4:
+        home_count = st.slider("Anzahl", min_value=1, max_value=50, value=10)
+
+    spatial_index = data_service.spatial_index(enhanced_df)
+    nearby = spatial_index.best_within(home_lat, home_lon, home_radius, k=home_count, allowed=filtered_mask)
+
+    if len(nearby) > 0:
+        st.dataframe(
+            nearby[['Name', 'Land', 'Entfernung_km', 'Qualitätsscore', 'Klare_Nächte_Jahr', 'Bortle_Skala', 'Höhe_m']],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Name": st.column_config.TextColumn("🏔️ Standort", width="medium"),
+                "Entfernung_km": st.column_config.NumberColumn("📏 Entfernung (km)", format="%.0f"),
+                "Qualitätsscore": st.column_config.NumberColumn("🏆 Score", format="%.1f")
+            }
+        )
+    else:
+        st.info(f"Keine gefilterten Standorte innerhalb von {home_radius} km")
+
+    with st.expander("🌍 Bester Standort pro Region"):
+        region_column = st.radio("Region", options=['Kontinent', 'Land'], horizontal=True)
+        st.dataframe(
+            best_per_region(filtered_df, region_column)[[region_column, 'Name', 'Qualitätsscore', 'Klare_Nächte_Jahr', 'Bortle_Skala']],
+            use_container_width=True,
+            hide_index=True
+        )
+
     # Sortierbare Tabelle
     st.subheader("📋 Alle Standorte (sortierbar)")
     
@@ -1055,7 +902,7 @@ with tab4:
         }
     )
 
-with tab5:
+elif active_view == "⚙️ Daten-Management":
     st.subheader("⚙️ Daten-Management & Export")
     
     col1, col2 = st.columns(2)
@@ -1063,57 +910,85 @@ with tab5:
     with col1:
         st.markdown("**🔄 Cache & Updates:**")
         
-        # Cache-Status (ohne get_stats)
-        try:
-            st.info(f"📊 Cache aktiv für bessere Performance")
-        except:
-            st.info("📊 Cache-System aktiv")
+        # Cache-Status aus den prozessweiten Messwerten
+        cache_stats = get_metrics().cache_table()
+        if len(cache_stats) > 0:
+            st.info("📊 Cache-Trefferquote: " + ", ".join(
+                f"{cache} {ratio:.0f}%" for cache, ratio in zip(cache_stats['Cache'], cache_stats['Trefferquote_%'])
+            ))
+        else:
+            st.info("📊 Noch keine Cache-Zugriffe gemessen")
         
         if st.button("🗑️ Cache leeren"):
             st.cache_data.clear()
+            clear_memo_caches()
             st.success("✅ Cache geleert!")
         
         if st.button("🔄 Vollständige Aktualisierung"):
             st.cache_data.clear()
-            st.session_state.mega_data_loaded = False
+            clear_memo_caches()
+            get_climate_store().invalidate()
+            data_service.refresh(revalidate=True)
             st.rerun()
         
+        if data_service.warnings:
+            with st.expander(f"⚠️ API-Warnungen ({len(data_service.warnings)})"):
+                for warning in data_service.warnings:
+                    st.warning(warning)
+
+        with st.expander("🧮 Speicherbedarf der Standorttabelle"):
+            report = memory_report(enhanced_df)
+            st.caption(f"{report['Bytes'].sum() / 2**20:.2f} MiB für {len(enhanced_df)} Standorte (einmal pro Prozess, von allen Sessions geteilt)")
+            st.dataframe(report, use_container_width=True)
+
         st.markdown("**⏰ Auto-Update:**")
-        st.info("🔄 NASA-Daten: alle 8h\n🌤️ Wetter: alle 6h")
+        st.info(
+            "🔄 NASA-Daten: alle 24h (Hintergrund-Aktualisierung)\n"
+            f"🌤️ Live-Wetter: alle {LIVE_WEATHER_TTL // 60} min pro Standort\n"
+            f"⛅ Vorhersage: alle {FORECAST_TTL // 3600}h"
+        )
+        snapshot_info = data_service.snapshot_info
+        if snapshot_info is not None:
+            source = "CLI" if snapshot_info['source'] == 'cli' else "App"
+            st.caption(f"💾 Snapshot {snapshot_info['file']} ({source}, {datetime.fromtimestamp(snapshot_info['created']):%d.%m.%Y %H:%M})")
+        else:
+            st.caption("💾 Noch kein Snapshot gespeichert (vorab per Cron: `python astro_core.py`)")
     
     with col2:
         st.markdown("**💾 Daten-Export:**")
         
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M')
-        
-        # CSV Export
-        csv_data = filtered_df.to_csv(index=False)
-        st.download_button(
-            label="📊 CSV Download (gefiltert)",
-            data=csv_data,
-            file_name=f"astrotourism_mega_{timestamp}.csv",
-            mime="text/csv",
-            help=f"Exportiert {len(filtered_df)} gefilterte Standorte"
+        export_scope = st.radio(
+            "Umfang",
+            options=["Gefiltert", "Alle Standorte"],
+            horizontal=True,
+            help=f"Gefiltert: {len(filtered_df)} Standorte, alle: {len(enhanced_df)}"
         )
+        export_format = st.selectbox("Format", options=list(EXPORT_FORMATS))
+        export_df = filtered_df if export_scope == "Gefiltert" else enhanced_df
+        file_extension, mime = EXPORT_FORMATS[export_format]
+        # Die gefilterte Tabelle trägt die Live-Überlagerung: neue Wetterdaten ergeben eine neue Datei
+        if export_scope == "Gefiltert":
+            export_version = (st.session_state.data_version, st.session_state.get('weather_versions'))
+        else:
+            export_version = st.session_state.data_version
+        export_key = (table_fingerprint(export_df, export_version), file_extension)
         
-        # JSON Export
-        json_data = filtered_df.to_json(orient='records', indent=2)
-        st.download_button(
-            label="📋 JSON Download (gefiltert)",
-            data=json_data,
-            file_name=f"astrotourism_mega_{timestamp}.json",
-            mime="application/json"
-        )
+        # Datei erst auf Anfrage erzeugen; danach bleibt sie für diesen Filterstand abrufbar
+        if st.button("📦 Export erstellen"):
+            with st.spinner(f"Erzeuge {export_format} ({len(export_df)} Standorte)..."):
+                build_export(export_df, *export_key)
+            st.session_state.export_key = export_key
+            st.session_state.export_timestamp = datetime.now().strftime('%Y%m%d_%H%M')
         
-        # Vollständiger Export
-        full_csv = enhanced_df.to_csv(index=False)
-        st.download_button(
-            label="📈 Vollständiger CSV Export",
-            data=full_csv,
-            file_name=f"astrotourism_complete_{timestamp}.csv",
-            mime="text/csv",
-            help=f"Alle {len(enhanced_df)} Standorte"
-        )
+        if st.session_state.get('export_key') == export_key:
+            prefix = 'astrotourism_mega' if export_scope == "Gefiltert" else 'astrotourism_complete'
+            st.download_button(
+                label=f"💾 {export_format} herunterladen",
+                data=build_export(export_df, *export_key),
+                file_name=f"{prefix}_{st.session_state.export_timestamp}.{file_extension}",
+                mime=mime,
+                help=f"Exportiert {len(export_df)} Standorte"
+            )
     
     # API-Informationen
     st.markdown("---")
@@ -1131,12 +1006,15 @@ with tab5:
         """)
     
     with col2:
-        st.markdown("""
+        calls_today = get_api_quota(openweather_key).calls_today() if openweather_key else 0
+        st.markdown(f"""
         **🌤️ OpenWeatherMap (Optional):**
         - 🔑 API-Key erforderlich
-        - 🔴 Live Wetterdaten
-        - 💰 1000 Calls/Tag kostenlos
-        - 🔄 6h Cache-Zeit
+        - 🔴 Live Wetterdaten, getrennt von den Klimadaten
+        - 💰 {LIVE_DAILY_QUOTA} Calls/Tag Kontingent, heute {calls_today} verbraucht
+        - ⚖️ Gleichmäßig über den UTC-Tag verteilt, {LIVE_QUOTA_SHARE:.0%} für Live-Wetter, {FORECAST_QUOTA_SHARE:.0%} für die Vorhersage
+        - 🔄 Erneuerung pro Standort nach {LIVE_WEATHER_TTL // 60} min
+        - ⛅ {FORECAST_HOURS} h Vorhersage, alle {FORECAST_TTL // 3600} h erneuert
         """)
     
     with col3:
@@ -1147,6 +1025,59 @@ with tab5:
         - ⛰️ Höhen-Korrekturen
         - 🔄 Immer verfügbar
         """)
+    
+    # Diagnose: wohin die Zeit geht (prozessweit, über alle Sessions)
+    st.markdown("---")
+    st.subheader("🩺 Diagnose & Performance")
+    
+    metrics = get_metrics()
+    endpoint = f" · Prometheus: http://{METRICS_HOST}:{METRICS_PORT}/metrics" if METRICS_PORT else ""
+    st.caption(f"Messwerte seit {datetime.fromtimestamp(metrics.started_at):%d.%m.%Y %H:%M:%S}, prozessweit für alle Sessions{endpoint}")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("**⏱️ Laufzeit pro Stufe:**")
+        st.dataframe(metrics.histogram_table('astro_stage_seconds').rename(columns={'stage': 'Stufe'}), use_container_width=True, hide_index=True)
+        
+        st.markdown("**🎯 Cache-Trefferquoten:**")
+        st.dataframe(metrics.cache_table(), use_container_width=True, hide_index=True)
+    
+    with col2:
+        st.markdown("**📡 Externe APIs:**")
+        st.dataframe(metrics.upstream_table().rename(columns={'source': 'Quelle'}), use_container_width=True, hide_index=True)
+        
+        st.markdown("**🐢 Langsamste Standorte:**")
+        snapshot = metrics.snapshot()
+        slowest = [
+            {'Quelle': source, 'Standort': entry['site'], 'Sekunden': entry['seconds']}
+            for source, entries in snapshot['slowest_sites'].items() for entry in entries
+        ]
+        st.dataframe(pd.DataFrame(slowest), use_container_width=True, hide_index=True)
+    
+    with st.expander(f"⚠️ Letzte API-Fehler ({len(snapshot['recent_errors'])})"):
+        for error in reversed(snapshot['recent_errors']):
+            st.text(f"{datetime.fromtimestamp(error['time']):%H:%M:%S} [{error['source']}] {error['message']}")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button(
+            "📄 Messwerte (JSON)",
+            data=json.dumps(snapshot, indent=2),
+            file_name="astro_metrics.json",
+            mime="application/json"
+        )
+    with col2:
+        st.download_button(
+            "📈 Messwerte (Prometheus)",
+            data=metrics.prometheus(),
+            file_name="astro_metrics.prom",
+            mime="text/plain"
+        )
+    with col3:
+        if st.button("♻️ Messwerte zurücksetzen"):
+            metrics.reset()
+            st.rerun()
 
 # Footer mit umfassenden Statistiken
 st.markdown("---")
@@ -1169,7 +1100,7 @@ with col3:
         st.metric("🌙 Beste Nächte", f"{max_nights}", best_nights[:15])
 
 with col4:
-    nasa_percentage = len(enhanced_df[enhanced_df['Datenquelle'].str.contains('NASA')]) / len(enhanced_df) * 100
+    nasa_percentage = nasa_count / len(enhanced_df) * 100
     st.metric("🛰️ NASA-Abdeckung", f"{nasa_percentage:.0f}%", "Live-Daten")
 
 with col5:
@@ -1196,9 +1127,10 @@ st.markdown(f"""
 - **GPS-Präzision**: Exakte Koordinaten für Navigation
 
 **🏆 Qualitätsscore-System:**
-- 50% Gewichtung: Klare Nächte pro Jahr
-- 30% Gewichtung: Bortle-Skala (Lichtverschmutzung)  
-- 20% Gewichtung: Höhe über Meeresspiegel
+- 40% Gewichtung: Klare Nächte pro Jahr
+- 25% Gewichtung: Bortle-Skala (Lichtverschmutzung)  
+- 15% Gewichtung: Höhe über Meeresspiegel
+- 20% Gewichtung: Mondfreie astronomische Dunkelheit pro Nacht (Ephemeriden)
 
 **Entwickelt für Astronomen, Astrophotografen und Sternengucker weltweit** 🌌
 """)
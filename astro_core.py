@@ -0,0 +1,2894 @@
+"""
+Datenkern der Astrotourismus-Weltkarte (ohne Streamlit)
+
+Katalog, API-Clients, Schätzung, Ephemeriden, Scoring, Indizes und
+Wetterdienste. Als Skript reichert das Modul den Katalog parallel an und
+schreibt einen versionierten Parquet-Snapshot, den die App beim Start lädt:
+
+    python astro_core.py                       # Katalog aus ASTRO_CATALOG_PATH
+    python astro_core.py --catalog welt.parquet --workers 16
+    python astro_core.py --list                # gespeicherte Snapshots
+    0 3 * * * cd /srv/astro && python astro_core.py   # nächtlich per Cron
+
+App und CLI müssen dasselbe Speicherverzeichnis (ASTRO_STORE_DIR) verwenden.
+Solange der ausgelieferte CLI-Snapshot jünger als ASTRO_SNAPSHOT_CLI_MAX_AGE ist,
+reichert die App nicht selbst an.
+"""
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from bisect import bisect_left
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+import argparse
+import threading
+import functools
+import time
+import hashlib
+import json
+import os
+import re
+import sys
+import unicodedata
+
+# Parallele API-Abfragen
+MAX_REQUESTS_IN_FLIGHT = 8  # Gleichzeitige Anfragen
+REQUESTS_PER_SECOND = 10    # Token-Bucket-Rate
+REQUEST_BURST = 10          # Token-Bucket-Kapazität
+
+# HTTP-Client (Connection-Pool, Retries, Timeouts)
+NASA_POWER_URL = os.environ.get('NASA_POWER_URL', 'https://power.larc.nasa.gov/api/temporal/climatology/point')
+OPENWEATHER_URL = os.environ.get('OPENWEATHER_URL', 'http://api.openweathermap.org/data/2.5/weather')
+OPENWEATHER_FORECAST_URL = os.environ.get('OPENWEATHER_FORECAST_URL', 'http://api.openweathermap.org/data/2.5/forecast')
+HTTP_POOL_SIZE = MAX_REQUESTS_IN_FLIGHT  # Offene Verbindungen pro Host
+HTTP_CONNECT_TIMEOUT = 5    # Sekunden bis zum Verbindungsaufbau
+HTTP_RETRIES = 3            # Wiederholungen bei 429/5xx
+HTTP_BACKOFF = 0.5          # Exponentieller Backoff: 0.5s, 1s, 2s ...
+HTTP_RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# Persistenter Klimadaten-Speicher (Parquet)
+NASA_PARAMETERS = 'CLOUD_AMT_DAY,CLOUD_AMT_NIGHT,RH2M,T2M,WS10M'
+STORE_DIR = os.environ.get('ASTRO_STORE_DIR', '.astro_store')
+STORE_MAX_AGE = 24*3600     # Danach gelten Einträge als veraltet
+STORE_COORD_DECIMALS = 2    # Rundung der Schlüssel-Koordinaten
+NASA_GRID_DEG = 0.5         # Eine NASA-Abfrage pro Gitterzelle (Auflösung der Klimadaten)
+SNAPSHOT_KEEP = 5           # Aufbewahrte Versionen der Standorttabelle
+SNAPSHOT_POLL_SECONDS = 300 # Prüfintervall auf neue Snapshots (z. B. vom Cron-Job)
+SNAPSHOT_CLI_MAX_AGE = int(os.environ.get('ASTRO_SNAPSHOT_CLI_MAX_AGE', str(36*3600)))  # So lange reichert die App neben CLI-Snapshots nicht selbst an
+
+# Live-Wetter (OpenWeather), getrennt von der Klimatologie
+LIVE_WEATHER_TTL = 3600             # Sekunden, danach wird ein Standort erneut abgefragt
+LIVE_WEATHER_MAX_AGE = 6*3600       # Ältere Beobachtungen werden nicht mehr angezeigt
+LIVE_DAILY_QUOTA = int(os.environ.get('ASTRO_OPENWEATHER_QUOTA', '1000'))  # Abrufe pro Tag (UTC), Free-Tarif
+LIVE_QUOTA_SHARE = 0.6              # Anteil des Tageskontingents für Live-Wetter
+QUOTA_PACING_HEADROOM = 3600        # Sekunden Vorlauf: zu Tagesbeginn ist eine Stunde Kontingent frei
+LIVE_BATCH_SIZE = 60                # Höchstzahl Abrufe pro Aktualisierung
+LIVE_GRID_DEG = 0.1                 # Standorte derselben Zelle (≈ 10 km) teilen einen Abruf
+
+# Kurzfristige Vorhersage (stündlich, pro Wetterzelle)
+FORECAST_FIXTURE = os.environ.get('ASTRO_FORECAST_FIXTURE')  # Lokale Vorhersage-Datei statt OpenWeather
+FORECAST_HOURS = 120            # Gespeicherter Horizont (5 Tage)
+FORECAST_TTL = 6*3600           # OpenWeather rechnet alle 3 h neu
+FORECAST_BATCH_SIZE = 60        # Höchstzahl Abrufe pro Aktualisierung
+FORECAST_QUOTA_SHARE = 0.4      # Reservierter Anteil des Tageskontingents (Rest: Live-Wetter)
+FORECAST_MISSING = 255          # Kennwert fehlender Stunden (uint8)
+FORECAST_MAX_HUMIDITY = 90      # Darüber Tau und Dunst: Stunde zählt nicht
+FORECAST_MAX_WIND = 12          # m/s, darüber kein ruhiges Teleskop
+
+# Inkrementelles Laden: Karte sofort zeigen, NASA-Daten blockweise nachladen
+INCREMENTAL_CHUNK_SIZE = 2 * MAX_REQUESTS_IN_FLIGHT  # Mindestzahl Standorte pro Block
+INCREMENTAL_CHUNKS = 50                              # Angestrebte Blockzahl (große Kataloge: größere Blöcke)
+INCREMENTAL_PUBLISH_SECONDS = 2.0                    # Mindestabstand zwischen veröffentlichten Zwischenständen
+SERVICE_REFRESH_SECONDS = 8*3600                     # Geplante Hintergrund-Aktualisierung
+
+# Filter-Engine (vorberechnete Bitmasken, memoisierte Ergebnisse)
+FILTER_CATEGORICAL_COLUMNS = ['Land', 'Kontinent', 'Typ', 'Datenquelle', 'Bortle_Skala']
+FILTER_RANGE_COLUMNS = ['Qualitätsscore', 'Klare_Nächte_Jahr']
+FILTER_CACHE_SIZE = 256        # Memoisierte Filter-Tupel
+FILTER_RANGE_CACHE_SIZE = 16   # Zwischengespeicherte Bereichsmasken
+FILTER_FRAME_CACHE_SIZE = 4    # Zwischengespeicherte gefilterte Tabellen
+
+# Standort-Katalog (CSV, Parquet oder Arrow/Feather)
+CATALOG_PATH = os.environ.get('ASTRO_CATALOG_PATH', str(Path(__file__).resolve().parent / 'data' / 'locations.csv'))
+CATALOG_SCHEMA = {
+    'Name': 'str',
+    'Land': 'category',
+    'Latitude': 'float64',
+    'Longitude': 'float64',
+    'Höhe_m': 'int16',
+    'Bortle_Skala': 'int8',
+    'Klimazone': 'category'
+}
+CATALOG_OPTIONAL_COLUMNS = ['Klimazone']  # Fehlt sie, wird 'continental' angenommen
+CATALOG_RANGES = {
+    'Latitude': (-90, 90),
+    'Longitude': (-180, 180),
+    'Höhe_m': (-500, 9000),
+    'Bortle_Skala': (1, 9)
+}
+
+# Kompaktes Schema der angereicherten Tabelle (von allen Sessions geteilt)
+COMPACT_DTYPES = {
+    'Land': 'category',
+    'Kontinent': 'category',
+    'Klimazone': 'category',
+    'Typ': 'category',
+    'Datenquelle': 'category',
+    'Status': 'category',
+    'Aktuelle_Bedingungen': 'category',
+    'Höhe_m': 'int16',
+    'Bortle_Skala': 'int8',
+    'Klare_Nächte_Jahr': 'int16',
+    'Luftfeuchtigkeit_%': 'float32',
+    'Temperatur_°C': 'float32',
+    'Wind_kmh': 'float32',
+    'Dunkelstunden': 'float32',
+    'Mondfreie_Stunden': 'float32',
+    'Milchstraße_Stunden': 'float32',
+    'Qualitätsscore': 'float32'
+}
+
+# Export (nur auf Anfrage erzeugt, pro Filterstand zwischengespeichert)
+EXPORT_CHUNK_ROWS = 20_000   # Zeilen pro geschriebenem Block
+
+# Räumlicher Index (Gitter über Breite/Länge, exakte Distanz auf der Kugel)
+SPATIAL_CELL_DEG = 1.0       # Zellgröße des Gitters in Grad
+EARTH_RADIUS_KM = 6371.0088  # Mittlerer Erdradius
+
+# Standort-Suche (invertierter Index über Wörter und Trigramme)
+SEARCH_COLUMNS = ['Name', 'Land', 'Typ']
+SEARCH_ALIASES = [             # Gleichwertige Suchbegriffe
+    ('observatory', 'observatorium', 'sternwarte', 'observatoire'),
+    ('wüste', 'desert', 'desierto'),
+    ('insel', 'island', 'isla'),
+    ('berg', 'mountain', 'mount', 'mont', 'monte', 'cerro'),
+    ('tal', 'valley', 'valle'),
+    ('see', 'lake', 'lago', 'lac')
+]
+SEARCH_MAX_EXPANSIONS = 50     # Höchstzahl der Wörter pro Präfix- bzw. Fuzzy-Suche
+SEARCH_FUZZY_THRESHOLD = 0.4   # Mindest-Ähnlichkeit (Trigramm-Jaccard)
+SEARCH_WEIGHTS = {'exact': 3.0, 'prefix': 2.0, 'infix': 1.5, 'fuzzy': 1.0}
+
+# Monatliche Klimadaten (Würfel Standorte × 12 Monate × NASA-Parameter)
+MONTHS = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+MONTH_NAMES = ['Januar', 'Februar', 'März', 'April', 'Mai', 'Juni',
+               'Juli', 'August', 'September', 'Oktober', 'November', 'Dezember']
+DAYS_PER_MONTH = np.array([31, 28.25, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+CLIMATE_CUBE_PARAMETERS = NASA_PARAMETERS.split(',')
+CLEAR_CLOUD_THRESHOLD = 25  # < 25% Bewölkung = gut für Astronomie
+
+# Ephemeriden (Sonne, Mond, galaktisches Zentrum; ohne Netzwerk, geringe Genauigkeit)
+ASTRONOMICAL_TWILIGHT = -18.0          # Sonnenhöhe für astronomische Dunkelheit (Grad)
+GALACTIC_CORE_RA_DEC = (266.405, -28.936)  # Sagittarius A* (Grad)
+GALACTIC_CORE_MIN_ALTITUDE = 10.0      # Mindesthöhe für sichtbares Milchstraßenzentrum
+EPHEMERIS_LAT_STEP = 0.5               # Breitenraster der Berechnung (Grad)
+EPHEMERIS_LON_STEP = 15.0              # Längenraster (eine Stunde Ortszeit)
+DARKNESS_REFERENCE_HOURS = 6.0         # Mondfreie Dunkelheit pro Nacht für volle Punktzahl (Jahresmittel am Äquator ≈ 5,7 h)
+EPHEMERIS_COLUMNS = ['Dunkelstunden', 'Mondfreie_Stunden', 'Milchstraße_Stunden']
+
+# Reiseplaner
+TRIP_HORIZON_NIGHTS = 366   # Planbare Nächte ab heute
+
+# Messwerte (Diagnose-Panel, /metrics)
+METRICS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)  # Sekunden
+METRICS_SLOWEST_SITES = 10      # Gemerkte langsamste Standorte pro Quelle
+METRICS_RECENT_ERRORS = 50      # Aufbewahrte vollständige Fehlermeldungen
+METRICS_PORT = int(os.environ.get('ASTRO_METRICS_PORT', '0'))  # 0 = kein eigener HTTP-Endpunkt
+METRICS_HOST = os.environ.get('ASTRO_METRICS_HOST', '127.0.0.1')
+
+# Kontinente und ihre Länder (einzige Quelle für die Spalte 'Kontinent')
+CONTINENT_COUNTRIES = {
+    'Europa': ['Deutschland', 'Frankreich', 'Spanien', 'Portugal', 'Wales', 'Schottland', 'Irland', 'Schweiz', 'Österreich', 'Ungarn', 'Dänemark'],
+    'Nordamerika': ['USA', 'Kanada'],
+    'Südamerika': ['Chile'],
+    'Asien': ['Indien', 'Nepal', 'Tibet/China', 'China', 'Pakistan', 'Tadschikistan', 'Mongolei'],
+    'Afrika': ['Namibia', 'Südafrika', 'Botswana', 'Marokko', 'Algerien', 'Äthiopien', 'Chad', 'Niger'],
+    'Ozeanien': ['Australien', 'Neuseeland']
+}
+OTHER_CONTINENT = 'Sonstige'  # Länder ohne Eintrag
+COUNTRY_CONTINENT = {
+    country: continent
+    for continent, countries in CONTINENT_COUNTRIES.items()
+    for country in countries
+}
+
+
+class MetricsRegistry:
+    """
+    Prozessweite Messwerte: Zähler, Latenz-Histogramme, langsamste Standorte, letzte Fehler
+    
+    Thread-sicher (Worker-Threads der Anreicherung, Live-Wetter, Vorhersage).
+    Histogramme zählen pro Bucket aus METRICS_BUCKETS; Quantile werden daraus
+    linear interpoliert. Ausgabe als JSON (snapshot) oder im Prometheus-Textformat.
+    """
+    
+    def __init__(self, buckets=METRICS_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self.lock:
+            self.counters = {}     # (Name, Labels) → Wert
+            self.histograms = {}   # (Name, Labels) → {'counts', 'sum', 'count', 'max'}
+            self.slowest = {}      # Quelle → [(Sekunden, Standort)], absteigend
+            self.errors = deque(maxlen=METRICS_RECENT_ERRORS)
+            self.started_at = time.time()
+    
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+    
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0, 'max': 0.0}
+            histogram['counts'][bisect_left(self.buckets, seconds)] += 1
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+            histogram['max'] = max(histogram['max'], seconds)
+    
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+    
+    def record_site(self, source, site, seconds):
+        """Abrufdauer eines Standorts für die Liste der langsamsten merken"""
+        with self.lock:
+            slowest = self.slowest.setdefault(source, [])
+            if len(slowest) < METRICS_SLOWEST_SITES or seconds > slowest[-1][0]:
+                slowest.append((seconds, site))
+                slowest.sort(reverse=True)
+                del slowest[METRICS_SLOWEST_SITES:]
+    
+    def record_error(self, source, reason, message):
+        """Fehler zählen (nach Quelle und Grund) und die vollständige Meldung aufbewahren"""
+        self.inc('astro_upstream_errors_total', source=source, reason=reason)
+        with self.lock:
+            self.errors.append((time.time(), source, message))
+    
+    def quantile(self, histogram, q):
+        """Quantil aus den Bucket-Zählern (lineare Interpolation innerhalb des Buckets)"""
+        if histogram['count'] == 0:
+            return float('nan')
+        rank = q * histogram['count']
+        seen = 0
+        for i, count in enumerate(histogram['counts']):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else histogram['max']
+                return min(lower + (upper - lower) * (rank - seen) / count, histogram['max'])
+            seen += count
+        return histogram['max']
+    
+    def counter_values(self, name):
+        """{Labels als dict-Tupel: Wert} eines Zählers"""
+        with self.lock:
+            return {labels: value for (metric, labels), value in self.counters.items() if metric == name}
+    
+    def histogram_table(self, name):
+        """Zusammenfassung eines Histogramms pro Label-Kombination (Anzahl, Mittel, p50, p95, Max in ms)"""
+        with self.lock:
+            histograms = [(dict(labels), dict(h, counts=list(h['counts']))) for (metric, labels), h in self.histograms.items() if metric == name]
+        rows = [
+            {**labels, 'Anzahl': h['count'], 'Summe_s': round(h['sum'], 3),
+             'Mittel_ms': round(h['sum'] / h['count'] * 1000, 1),
+             'p50_ms': round(self.quantile(h, 0.5) * 1000, 1), 'p95_ms': round(self.quantile(h, 0.95) * 1000, 1),
+             'Max_ms': round(h['max'] * 1000, 1)}
+            for labels, h in histograms
+        ]
+        return pd.DataFrame(rows).sort_values('Summe_s', ascending=False) if rows else pd.DataFrame()
+    
+    def cache_table(self):
+        """Anfragen, Fehlschläge und Trefferquote pro Cache"""
+        requests_by_cache = {dict(labels)['cache']: value for labels, value in self.counter_values('astro_cache_requests_total').items()}
+        misses = {dict(labels)['cache']: value for labels, value in self.counter_values('astro_cache_misses_total').items()}
+        rows = [
+            {'Cache': cache, 'Anfragen': total, 'Fehlschläge': misses.get(cache, 0),
+             'Trefferquote_%': round((1 - misses.get(cache, 0) / total) * 100, 1) if total else float('nan')}
+            for cache, total in sorted(requests_by_cache.items())
+        ]
+        return pd.DataFrame(rows)
+    
+    def upstream_table(self):
+        """Latenz, Anfragen und Fehlerquote pro externer Quelle"""
+        latency = self.histogram_table('astro_upstream_seconds')
+        if latency.empty:
+            return latency
+        totals, failures = Counter(), Counter()
+        for labels, value in self.counter_values('astro_upstream_requests_total').items():
+            labels = dict(labels)
+            totals[labels['source']] += value
+            if labels['status'] != '200':
+                failures[labels['source']] += value
+        return latency.assign(
+            Fehler=[failures[source] for source in latency['source']],
+            **{'Fehlerquote_%': [round(failures[source] / max(totals[source], 1) * 100, 1) for source in latency['source']]}
+        )
+    
+    def snapshot(self):
+        """Alle Messwerte als JSON-fähiges dict"""
+        with self.lock:
+            return {
+                'started_at': self.started_at,
+                'uptime_s': round(time.time() - self.started_at, 1),
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+                'histograms': [
+                    {'name': name, 'labels': dict(labels), 'count': h['count'], 'sum': h['sum'], 'max': h['max'],
+                     'p50': self.quantile(h, 0.5), 'p95': self.quantile(h, 0.95),
+                     'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], np.cumsum(h['counts']).tolist()))}
+                    for (name, labels), h in sorted(self.histograms.items())
+                ],
+                'slowest_sites': {
+                    source: [{'site': site, 'seconds': round(seconds, 3)} for seconds, site in sites]
+                    for source, sites in self.slowest.items()
+                },
+                'recent_errors': [
+                    {'time': timestamp, 'source': source, 'message': message}
+                    for timestamp, source, message in self.errors
+                ]
+            }
+    
+    def prometheus(self):
+        """Messwerte im Prometheus-Textformat (Version 0.0.4)"""
+        def format_labels(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ''
+            escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+            return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+        
+        lines = []
+        with self.lock:
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f'# TYPE {name} counter')
+                lines += [f'{name}{format_labels(labels)} {value}' for (metric, labels), value in sorted(self.counters.items()) if metric == name]
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append(f'# TYPE {name} histogram')
+                for (metric, labels), h in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    for bound, cumulative in zip([str(b) for b in self.buckets] + ['+Inf'], np.cumsum(h['counts']).tolist()):
+                        lines.append(f'{name}_bucket{format_labels(labels, [("le", bound)])} {cumulative}')
+                    lines.append(f'{name}_sum{format_labels(labels)} {h["sum"]}')
+                    lines.append(f'{name}_count{format_labels(labels)} {h["count"]}')
+        return '\n'.join(lines) + '\n'
+
+@functools.lru_cache(maxsize=None)
+def get_metrics():
+    """Prozessweite Messwerte (alle Sessions und Hintergrund-Threads)"""
+    return MetricsRegistry()
+
+def timed(stage):
+    """Decorator: Laufzeit als astro_stage_seconds{stage=...} messen"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_metrics().timer('astro_stage_seconds', stage=stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+@functools.lru_cache(maxsize=None)
+def start_metrics_server(port, host=METRICS_HOST):
+    """/metrics (Prometheus-Text) und /metrics.json in einem Hintergrund-Thread ausliefern"""
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            registry = get_metrics()
+            path = self.path.split('?')[0]
+            if path == '/metrics.json':
+                body, content_type = json.dumps(registry.snapshot()).encode(), 'application/json'
+            elif path == '/metrics':
+                body, content_type = registry.prometheus().encode(), 'text/plain; version=0.0.4; charset=utf-8'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass  # Keine Zugriffsprotokolle auf stderr
+    
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+MEMO_CACHES = []  # Alle memoize-Caches des Prozesses (für clear_memo_caches)
+
+def memoize(ttl=None, max_entries=None):
+    """Thread-sicherer Funktions-Cache wie st.cache_data, auch ohne Streamlit
+    
+    Numpy-Arrays werden über ihren Inhalt verschlüsselt. Ergebnisse werden
+    geteilt und dürfen nicht verändert werden.
+    """
+    def decorate(func):
+        entries = OrderedDict()
+        lock = threading.Lock()
+        
+        def make_key(args, kwargs):
+            return tuple(
+                (value.dtype.str, value.shape, hashlib.blake2b(np.ascontiguousarray(value).tobytes(), digest_size=16).digest())
+                if isinstance(value, np.ndarray) else value
+                for value in args + tuple(sorted(kwargs.items()))
+            )
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            now = time.time()
+            with lock:
+                entry = entries.get(key)
+                if entry is not None and (ttl is None or now - entry[1] < ttl):
+                    entries.move_to_end(key)
+                    return entry[0]
+            
+            value = func(*args, **kwargs)
+            with lock:
+                entries[key] = (value, now)
+                entries.move_to_end(key)
+                if max_entries is not None and len(entries) > max_entries:
+                    entries.popitem(last=False)
+            return value
+        
+        def clear():
+            with lock:
+                entries.clear()
+        
+        wrapper.clear = clear
+        MEMO_CACHES.append(wrapper)
+        return wrapper
+    return decorate
+
+def clear_memo_caches():
+    for cache in MEMO_CACHES:
+        cache.clear()
+
+
+class TokenBucket:
+    """
+    Thread-sicherer Token-Bucket als Ratenbegrenzer
+    """
+    
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Blockiert, bis ein Token verfügbar ist"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+@functools.lru_cache(maxsize=None)
+def get_rate_limiter():
+    """Prozessweiter Ratenbegrenzer für alle API-Anfragen"""
+    return TokenBucket(REQUESTS_PER_SECOND, REQUEST_BURST)
+
+
+def fetch_concurrently(func, items, max_in_flight=MAX_REQUESTS_IN_FLIGHT, progress_callback=None):
+    """Führt func(item) parallel aus - Ergebnisse in Eingabereihenfolge"""
+    items = list(items)
+    results = [None] * len(items)
+    
+    with ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as executor:
+        futures = {executor.submit(func, item): idx for idx, item in enumerate(items)}
+        
+        # Fortschritt im aufrufenden Thread melden
+        for done, future in enumerate(as_completed(futures), 1):
+            idx = futures[future]
+            results[idx] = future.result()
+            if progress_callback:
+                progress_callback(done, len(items), items[idx])
+    
+    return results
+
+
+@contextmanager
+def file_lock(path):
+    """Exklusive Sperre über Prozesse hinweg (Sperrdatei <path>.lock), z. B. zwischen App und CLI"""
+    lock_path = Path(f'{path}.lock')
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a+b') as handle:
+        if os.name == 'nt':
+            import msvcrt
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == 'nt':
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+class ClimateStore:
+    """
+    Persistenter Parquet-Speicher für NASA-Rohdaten und die erweiterte Standorttabelle
+    
+    Einträge werden nach STORE_MAX_AGE als veraltet markiert, aber weiter
+    ausgeliefert (stale-while-revalidate) und im Hintergrund erneuert.
+    Mehrere Prozesse (App-Replikate, CLI) teilen die Antwortdatei: vor jedem
+    Schreiben wird sie unter file_lock eingelesen und eingemischt, eigene
+    ungespeicherte Einträge gewinnen nur, wenn sie neuer sind.
+    Die Standorttabelle wird in versionierten Snapshots abgelegt; snapshots/latest.json
+    zeigt auf die aktuelle Version (geschrieben von der App oder dem CLI).
+    """
+    
+    def __init__(self, directory, max_age=STORE_MAX_AGE):
+        self.directory = Path(directory)
+        self.responses_path = self.directory / 'nasa_power.parquet'
+        self.snapshot_dir = self.directory / 'snapshots'
+        self.manifest_path = self.snapshot_dir / 'latest.json'
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.refreshing = set()
+        self.executor = ThreadPoolExecutor(max_workers=MAX_REQUESTS_IN_FLIGHT)
+        self.responses_mtime = self._responses_mtime()  # Vor dem Lesen: spätere Schreibvorgänge werden erkannt
+        self.responses = self._read_responses()
+        self.dirty = set()     # Seit dem letzten Schreiben geänderte Schlüssel
+    
+    @staticmethod
+    def make_key(lat, lon, parameters):
+        """Schlüssel aus gerundeten Koordinaten und Parameterliste"""
+        return (round(float(lat), STORE_COORD_DECIMALS), round(float(lon), STORE_COORD_DECIMALS), parameters)
+    
+    def _responses_mtime(self):
+        try:
+            return self.responses_path.stat().st_mtime_ns
+        except OSError:
+            return None
+    
+    def reload_if_changed(self):
+        """Von anderen Prozessen (z. B. dem CLI) geschriebene Antworten übernehmen
+        
+        Je Schlüssel gewinnt der neuere Abruf, ungespeicherte eigene Einträge bleiben erhalten.
+        """
+        mtime = self._responses_mtime()
+        with self.lock:
+            if mtime is None or mtime == self.responses_mtime:
+                return False
+        
+        stored = self._read_responses()
+        with self.lock:
+            self._merge(stored)
+            self.responses_mtime = mtime
+        return True
+    
+    def _merge(self, stored):
+        """Einträge der Datei übernehmen; eigene ungespeicherte nur behalten, wenn sie neuer sind (unter self.lock)"""
+        for key, entry in stored.items():
+            current = self.responses.get(key)
+            if key not in self.dirty or current is None or current[1] < entry[1]:
+                self.responses[key] = entry
+    
+    def _read_responses(self):
+        if not self.responses_path.exists():
+            return {}
+        
+        try:
+            table = pd.read_parquet(self.responses_path)
+        except Exception:
+            return {}  # Beschädigte Datei wird beim nächsten Schreiben ersetzt
+        
+        return {
+            (lat, lon, parameters): (json.loads(payload), fetched_at)
+            for lat, lon, parameters, payload, fetched_at in zip(
+                table['lat'], table['lon'], table['parameters'], table['payload'], table['fetched_at']
+            )
+        }
+    
+    def _is_stale(self, fetched_at):
+        return time.time() - fetched_at > self.max_age
+    
+    def get_response(self, lat, lon, parameters):
+        """Gespeicherte Antwort und Veraltet-Flag (None, False wenn nicht vorhanden)"""
+        with self.lock:
+            entry = self.responses.get(self.make_key(lat, lon, parameters))
+        
+        if entry is None:
+            return None, False
+        
+        payload, fetched_at = entry
+        return payload, self._is_stale(fetched_at)
+    
+    def put_response(self, lat, lon, parameters, payload):
+        with self.lock:
+            key = self.make_key(lat, lon, parameters)
+            self.responses[key] = (payload, time.time())
+            self.dirty.add(key)
+    
+    def refresh_response(self, lat, lon, parameters, fetch):
+        """Veralteten Eintrag im Hintergrund neu laden (höchstens einmal gleichzeitig)"""
+        key = self.make_key(lat, lon, parameters)
+        with self.lock:
+            if key in self.refreshing:
+                return
+            self.refreshing.add(key)
+        
+        def run():
+            try:
+                payload = fetch()
+                if payload is not None:
+                    self.put_response(lat, lon, parameters, payload)
+            except Exception:
+                pass  # Alter Eintrag bleibt gültig, nächster Zugriff versucht es erneut
+            finally:
+                with self.lock:
+                    self.refreshing.discard(key)
+                    batch_done = not self.refreshing
+                # Einmal schreiben, wenn alle angestoßenen Aktualisierungen fertig sind
+                if batch_done:
+                    self.flush()
+        
+        self.executor.submit(run)
+    
+    def flush(self):
+        """Geänderte Antworten atomar auf die Festplatte schreiben"""
+        with self.lock:
+            if not self.dirty:
+                return
+        self._write_responses()
+    
+    def _write_responses(self, invalidate=False):
+        """Datei unter file_lock einlesen, einmischen und mit den eigenen Einträgen neu schreiben
+        
+        invalidate=True markiert danach alle Einträge als veraltet, auch die anderer Prozesse.
+        """
+        written = set()
+        try:
+            with self.write_lock, file_lock(self.responses_path):
+                stored = self._read_responses()
+                with self.lock:
+                    self._merge(stored)
+                    if invalidate:
+                        self.responses = {key: (payload, 0.0) for key, (payload, _) in self.responses.items()}
+                        self.dirty = set(self.responses)
+                    rows = [
+                        {'lat': lat, 'lon': lon, 'parameters': parameters,
+                         'payload': json.dumps(payload), 'fetched_at': fetched_at}
+                        for (lat, lon, parameters), (payload, fetched_at) in self.responses.items()
+                    ]
+                    written, self.dirty = self.dirty, set()
+                
+                self._write_atomic(pd.DataFrame(rows), self.responses_path)
+                mtime = self._responses_mtime()
+        except Exception:
+            with self.lock:
+                if invalidate and not written:  # Datei nicht lesbar: zumindest im Speicher veralten
+                    self.responses = {key: (payload, 0.0) for key, (payload, _) in self.responses.items()}
+                    written = set(self.responses)
+                self.dirty |= written  # Beim nächsten flush() erneut versuchen
+            return
+        
+        with self.lock:
+            self.responses_mtime = mtime  # Eigene Datei nicht erneut einlesen
+    
+    def snapshot_info(self):
+        """Eintrag der aktuellen Snapshot-Version (None wenn keiner vorhanden)"""
+        try:
+            return json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            return None
+    
+    def list_snapshots(self):
+        """Gespeicherte Snapshot-Dateien, neueste zuerst"""
+        return sorted(self.snapshot_dir.glob('locations-*.parquet'), reverse=True)
+    
+    def load_locations(self, catalog=None):
+        """Aktueller Snapshot (speicherabgebildet), Veraltet-Flag und Versionseintrag
+        
+        Mit catalog (Fingerabdruck) werden nur Snapshots desselben Katalogs
+        geliefert. (None, False, None) wenn kein passender vorhanden ist.
+        """
+        info = self.snapshot_info()
+        if info is None or (catalog is not None and info.get('catalog') != catalog):
+            return None, False, None
+        
+        try:
+            import pyarrow.parquet as pq
+            df = pq.read_table(self.snapshot_dir / info['file'], memory_map=True).to_pandas()
+        except Exception:
+            return None, False, None
+        
+        return df, self._is_stale(info['created']), info
+    
+    def save_locations(self, df, catalog=None, source='app', keep=SNAPSHOT_KEEP):
+        """Neue Snapshot-Version schreiben und latest.json umstellen (None bei Fehler)"""
+        created = time.time()
+        info = {
+            'file': f"locations-{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime(created))}-{os.getpid()}.parquet",
+            'created': created,
+            'catalog': catalog,
+            'source': source,
+            'rows': len(df),
+            'nasa_rows': int(df['Datenquelle'].astype(str).str.contains('NASA').sum())
+        }
+        try:
+            with self.write_lock:
+                self._write_atomic(df, self.snapshot_dir / info['file'])
+                self._write_text_atomic(json.dumps(info), self.manifest_path)
+        except Exception:
+            return None  # Ohne Speicher läuft die App mit der Tabelle im Speicher weiter
+        
+        for path in self.list_snapshots()[keep:]:
+            try:
+                path.unlink()
+            except OSError:
+                pass  # Noch geöffnet oder bereits gelöscht: beim nächsten Schreiben erneut
+        return info
+    
+    def invalidate(self):
+        """Alle Einträge als veraltet markieren (werden weiter ausgeliefert)"""
+        self._write_responses(invalidate=True)
+        
+        info = self.snapshot_info()
+        if info is not None:
+            with self.write_lock:
+                self._write_text_atomic(json.dumps({**info, 'created': 0.0}), self.manifest_path)
+    
+    def _write_atomic(self, df, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')  # App und CLI schreiben in dasselbe Verzeichnis
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    
+    def _write_text_atomic(self, text, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        tmp_path.write_text(text)
+        os.replace(tmp_path, path)
+
+
+@functools.lru_cache(maxsize=None)
+def get_climate_store():
+    """Prozessweiter Klimadaten-Speicher"""
+    return ClimateStore(STORE_DIR)
+
+# Erweiterte API-Klasse mit mehreren Datenquellen
+class MultiSourceWeatherAPI:
+    """
+    Klasse für mehrere API-Datenquellen
+    
+    Alle Anfragen laufen über eine gemeinsame Session mit Keep-Alive,
+    Connection-Pool und Retries mit exponentiellem Backoff.
+    """
+    
+    def __init__(self, pool_size=HTTP_POOL_SIZE):
+        # Erst beim ersten Abruf laden: mit aktuellem Snapshot startet die App ohne HTTP-Client
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': 'Astrotourism-App/1.0'})
+        
+        retry = Retry(
+            total=HTTP_RETRIES,
+            backoff_factor=HTTP_BACKOFF,
+            status_forcelist=HTTP_RETRY_STATUS,
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry, pool_block=True)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def get(self, url, params, read_timeout, source='http'):
+        """Ratenbegrenzte GET-Anfrage über den Connection-Pool
+        
+        Latenz (ohne Wartezeit im Token-Bucket, mit Retries), Status und Fehler
+        werden pro Quelle gemessen.
+        """
+        get_rate_limiter().acquire()
+        metrics = get_metrics()
+        site = f"{params.get('lat', params.get('latitude'))}, {params.get('lon', params.get('longitude'))}"
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, params=params, timeout=(HTTP_CONNECT_TIMEOUT, read_timeout))
+        except Exception as e:
+            metrics.inc('astro_upstream_requests_total', source=source, status='error')
+            metrics.record_error(source, type(e).__name__, f"{site}: {e}")
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.observe('astro_upstream_seconds', elapsed, source=source)
+            metrics.record_site(source, site, elapsed)
+        
+        metrics.inc('astro_upstream_requests_total', source=source, status=str(response.status_code))
+        if response.status_code != 200:
+            metrics.record_error(source, f"http_{response.status_code}", f"{site}: HTTP {response.status_code} {response.reason}")
+        return response
+    
+    @staticmethod
+    @memoize(ttl=24*3600)  # 24h Cache, läuft in Worker-Threads
+    def get_nasa_power_data(lat, lon, location_name):
+        """NASA POWER API - Klimadaten"""
+        get_metrics().inc('astro_cache_misses_total', cache='nasa_power')
+        return MultiSourceWeatherAPI.load_nasa_power_data(lat, lon)
+    
+    @staticmethod
+    def load_nasa_power_data(lat, lon, revalidate=False):
+        """NASA-Klimadaten aus dem persistenten Speicher, sonst von der API
+        
+        Veraltete Einträge werden sofort ausgeliefert und im Hintergrund
+        erneuert; mit revalidate=True wird stattdessen direkt neu geladen.
+        """
+        store = get_climate_store()
+        payload, is_stale = store.get_response(lat, lon, NASA_PARAMETERS)
+        
+        metrics = get_metrics()
+        metrics.inc('astro_cache_requests_total', cache='climate_store')
+        if payload is not None and not (is_stale and revalidate):
+            if is_stale:
+                store.refresh_response(
+                    lat, lon, NASA_PARAMETERS,
+                    lambda: MultiSourceWeatherAPI.fetch_nasa_power_raw(lat, lon)
+                )
+            return MultiSourceWeatherAPI.parse_nasa_power_data(payload)
+        
+        metrics.inc('astro_cache_misses_total', cache='climate_store')
+        stale_payload = payload
+        try:
+            payload = MultiSourceWeatherAPI.fetch_nasa_power_raw(lat, lon)
+        except Exception as e:
+            if stale_payload is not None:
+                return MultiSourceWeatherAPI.parse_nasa_power_data(stale_payload)
+            # Warnung wird im Haupt-Thread angezeigt (Abfrage läuft parallel)
+            return {'success': False, 'error': str(e)[:50]}
+        
+        if payload is None:
+            if stale_payload is not None:
+                return MultiSourceWeatherAPI.parse_nasa_power_data(stale_payload)
+            return {'success': False}
+        
+        store.put_response(lat, lon, NASA_PARAMETERS, payload)
+        return MultiSourceWeatherAPI.parse_nasa_power_data(payload)
+    
+    @staticmethod
+    def fetch_nasa_power_raw(lat, lon):
+        """Rohe NASA POWER Parameter-Antwort abrufen (None bei Fehlschlag)"""
+        params = {
+            'parameters': NASA_PARAMETERS,
+            'community': 'RE',
+            'longitude': lon,
+            'latitude': lat,
+            'start': 2015,
+            'end': 2023,
+            'format': 'JSON'
+        }
+        
+        response = get_weather_api().get(NASA_POWER_URL, params, read_timeout=15, source='nasa_power')
+        
+        if response.status_code == 200:
+            data = response.json()
+            
+            if 'properties' in data and 'parameter' in data['properties']:
+                return data['properties']['parameter']
+        
+        return None
+    
+    @staticmethod
+    def monthly_values(params_data, parameters=CLIMATE_CUBE_PARAMETERS):
+        """Monatswerte JAN–DEC als Array (12 × Parameter), NaN wo Werte fehlen
+        
+        Der Jahreswert 'ANN' gehört nicht zu den Monaten und wird ignoriert.
+        """
+        values = np.full((12, len(parameters)), np.nan)
+        for column, parameter in enumerate(parameters):
+            monthly = params_data.get(parameter) or {}
+            for row, month in enumerate(MONTHS):
+                value = monthly.get(month)
+                # NASA kennzeichnet fehlende Werte mit -999
+                if value is not None and value > -999:
+                    values[row, column] = value
+        return values
+    
+    @staticmethod
+    def parse_nasa_power_data(params_data):
+        """NASA POWER Parameter in Astronomie-Kennzahlen umrechnen"""
+        cloud_night = {month: value for month, value in params_data.get('CLOUD_AMT_NIGHT', {}).items() if month in MONTHS}
+        humidity = [value for month, value in params_data.get('RH2M', {}).items() if month in MONTHS]
+        temperature = [value for month, value in params_data.get('T2M', {}).items() if month in MONTHS]
+        wind_speed = [value for month, value in params_data.get('WS10M', {}).items() if month in MONTHS]
+        
+        if not cloud_night:
+            return {'success': False}
+        
+        monthly_clouds = list(cloud_night.values())
+        avg_cloud_cover = sum(monthly_clouds) / len(monthly_clouds)
+        
+        # Optimierte Berechnung für Astronomie
+        clear_probability = max(0, (CLEAR_CLOUD_THRESHOLD - avg_cloud_cover) / CLEAR_CLOUD_THRESHOLD)
+        
+        # Saisonale Variation berücksichtigen
+        min_clouds = min(monthly_clouds)
+        max_clouds = max(monthly_clouds)
+        seasonal_factor = 1 - ((max_clouds - min_clouds) / 100) * 0.3
+        
+        clear_nights = int(365 * clear_probability * seasonal_factor)
+        clear_nights = max(min(clear_nights, 350), 30)  # Between 30-350
+        
+        avg_humidity = sum(humidity) / len(humidity) if humidity else 50
+        avg_temp = sum(temperature) / len(temperature) if temperature else 15
+        avg_wind = sum(wind_speed) / len(wind_speed) if wind_speed else 5
+        
+        return {
+            'success': True,
+            'clear_nights': clear_nights,
+            'cloud_cover': round(avg_cloud_cover, 1),
+            'humidity': round(avg_humidity, 1),
+            'temperature': round(avg_temp - 273.15, 1),  # K to C
+            'wind_speed': round(avg_wind, 1),
+            'data_source': 'NASA POWER',
+            'status': '🛰️ NASA'
+        }
+    
+    @staticmethod
+    def get_openweather_data(lat, lon, api_key=None, url=OPENWEATHER_URL):
+        """OpenWeatherMap API - Aktuelles Wetter (ungecacht, Frische und Kontingent verwaltet LiveWeather)"""
+        if not api_key:
+            return {'success': False, 'reason': 'No API key'}
+        
+        params = {
+            'lat': lat,
+            'lon': lon,
+            'appid': api_key,
+            'units': 'metric'
+        }
+        
+        try:
+            response = get_weather_api().get(url, params, read_timeout=10, source='openweather')
+            
+            if response.status_code == 200:
+                data = response.json()
+                return {
+                    'success': True,
+                    'current_clouds': data['clouds']['all'],
+                    'current_humidity': data['main']['humidity'],
+                    'current_temp': data['main']['temp'],
+                    'visibility': data.get('visibility', 10000),
+                    'data_source': 'OpenWeather',
+                    'status': '🌤️ Live'
+                }
+        except Exception:
+            pass
+        
+        return {'success': False}
+    
+    @staticmethod
+    def get_enhanced_geographic_estimation(lat, lon, altitude, climate_zone=None):
+        """Erweiterte geografische Schätzung"""
+        abs_lat = abs(lat)
+        
+        # Basis nach detaillierten Klimazonen
+        if climate_zone == 'desert':
+            base_clear = 310
+        elif climate_zone == 'polar':
+            base_clear = 120
+        elif climate_zone == 'mediterranean':
+            base_clear = 240
+        elif climate_zone == 'continental':
+            base_clear = 200
+        elif climate_zone == 'oceanic':
+            base_clear = 160
+        elif climate_zone == 'tropical':
+            base_clear = 180
+        else:
+            # Automatische Klimazone-Bestimmung
+            if altitude > 3000:
+                base_clear = 290  # Alpine
+            elif abs_lat < 23.5 and altitude < 500:
+                base_clear = 170  # Tropical lowlands
+            elif abs_lat < 23.5 and altitude > 1000:
+                base_clear = 250  # Tropical highlands
+            elif 23.5 <= abs_lat <= 35 and altitude < 500:
+                base_clear = 200  # Subtropical lowlands
+            elif 23.5 <= abs_lat <= 35 and altitude > 500:
+                base_clear = 270  # Subtropical highlands
+            elif 35 <= abs_lat <= 50:
+                base_clear = 180  # Temperate
+            elif 50 <= abs_lat <= 66.5:
+                base_clear = 140  # Subarctic
+            else:
+                base_clear = 100  # Arctic
+        
+        # Höhen-Modifikationen
+        if altitude > 4000:
+            base_clear += 50
+        elif altitude > 3000:
+            base_clear += 40
+        elif altitude > 2000:
+            base_clear += 25
+        elif altitude > 1000:
+            base_clear += 15
+        elif altitude > 500:
+            base_clear += 8
+        
+        # Kontinentalitäts-Effekt
+        continentality = abs(lon)
+        if continentality > 140:  # Sehr kontinental
+            base_clear += 30
+        elif continentality > 100:  # Kontinental
+            base_clear += 20
+        elif continentality > 60:  # Leicht kontinental
+            base_clear += 10
+        
+        # Spezielle geografische Faktoren
+        # Wüstengürtel (15-35°N/S)
+        if 15 <= abs_lat <= 35 and altitude > 200:
+            base_clear += 25
+        
+        # Monsun-Gebiete (reduzieren)
+        if (70 <= lon <= 140 and 10 <= lat <= 40) or (-20 <= lat <= 20 and lon > 90):
+            base_clear -= 30
+        
+        # Westküsten-Effekt (marine layer)
+        if ((lat > 30 and -130 <= lon <= -110) or  # US West Coast
+            (lat > 30 and -20 <= lon <= 10) or     # Europe West Coast
+            (-40 <= lat <= -30 and -80 <= lon <= -60)):  # Chile Coast
+            base_clear -= 20
+        
+        return max(min(base_clear, 350), 50)
+    
+    @staticmethod
+    def get_enhanced_geographic_estimation_array(lat, lon, altitude, climate_zone=None):
+        """Erweiterte geografische Schätzung für ganze Arrays (identisch zur Skalar-Version)"""
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        altitude = np.asarray(altitude, dtype=float)
+        zone = np.broadcast_to(np.asarray(climate_zone, dtype=object), lat.shape)
+        abs_lat = np.abs(lat)
+        
+        # Basis nach detaillierten Klimazonen, sonst automatische Bestimmung
+        subtropical = (23.5 <= abs_lat) & (abs_lat <= 35)
+        base_clear = np.select(
+            [
+                zone == 'desert', zone == 'polar', zone == 'mediterranean',
+                zone == 'continental', zone == 'oceanic', zone == 'tropical',
+                altitude > 3000,                          # Alpine
+                (abs_lat < 23.5) & (altitude < 500),      # Tropical lowlands
+                (abs_lat < 23.5) & (altitude > 1000),     # Tropical highlands
+                subtropical & (altitude < 500),           # Subtropical lowlands
+                subtropical & (altitude > 500),           # Subtropical highlands
+                (35 <= abs_lat) & (abs_lat <= 50),        # Temperate
+                (50 <= abs_lat) & (abs_lat <= 66.5)       # Subarctic
+            ],
+            [310, 120, 240, 200, 160, 180, 290, 170, 250, 200, 270, 180, 140],
+            default=100  # Arctic
+        )
+        
+        # Höhen-Modifikationen
+        base_clear += np.select(
+            [altitude > 4000, altitude > 3000, altitude > 2000, altitude > 1000, altitude > 500],
+            [50, 40, 25, 15, 8],
+            default=0
+        )
+        
+        # Kontinentalitäts-Effekt
+        continentality = np.abs(lon)
+        base_clear += np.select(
+            [continentality > 140, continentality > 100, continentality > 60],
+            [30, 20, 10],
+            default=0
+        )
+        
+        # Wüstengürtel (15-35°N/S)
+        base_clear += np.where((15 <= abs_lat) & (abs_lat <= 35) & (altitude > 200), 25, 0)
+        
+        # Monsun-Gebiete (reduzieren)
+        monsoon = (
+            ((70 <= lon) & (lon <= 140) & (10 <= lat) & (lat <= 40)) |
+            ((-20 <= lat) & (lat <= 20) & (lon > 90))
+        )
+        base_clear -= np.where(monsoon, 30, 0)
+        
+        # Westküsten-Effekt (marine layer)
+        west_coast = (
+            ((lat > 30) & (-130 <= lon) & (lon <= -110)) |   # US West Coast
+            ((lat > 30) & (-20 <= lon) & (lon <= 10)) |      # Europe West Coast
+            ((-40 <= lat) & (lat <= -30) & (-80 <= lon) & (lon <= -60))  # Chile Coast
+        )
+        base_clear -= np.where(west_coast, 20, 0)
+        
+        return np.clip(base_clear, 50, 350)
+
+
+@functools.lru_cache(maxsize=None)
+def get_weather_api():
+    """Prozessweiter API-Client (ein Connection-Pool für alle Sessions)"""
+    return MultiSourceWeatherAPI()
+
+def read_catalog_file(path):
+    """Liest die Katalogdatei (Parquet/Arrow speicherabgebildet, sonst CSV)"""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == '.parquet':
+        import pyarrow.parquet as pq
+        df = pq.read_table(path, memory_map=True).to_pandas()
+    elif suffix in ('.arrow', '.feather', '.ipc'):
+        import pyarrow.feather as feather
+        df = feather.read_table(path, memory_map=True).to_pandas()
+    elif suffix == '.csv':
+        df = pd.read_csv(path, dtype={'Name': 'str', 'Land': 'category', 'Klimazone': 'category'})
+    else:
+        raise ValueError(f"Nicht unterstütztes Katalogformat: {path.suffix or path.name}")
+    
+    missing = [column for column in CATALOG_SCHEMA if column not in df.columns and column not in CATALOG_OPTIONAL_COLUMNS]
+    if missing:
+        raise ValueError(f"Katalog {path.name}: fehlende Spalten {', '.join(missing)}")
+    
+    # Nicht-numerische Einträge werden zu fehlenden Werten und von validate_catalog gemeldet
+    df = df[[column for column in CATALOG_SCHEMA if column in df.columns]].copy()
+    for column in CATALOG_RANGES:
+        df[column] = pd.to_numeric(df[column], errors='coerce')
+    return df
+
+def validate_catalog(df, name='Katalog'):
+    """Prüft fehlende Werte, Wertebereiche und doppelte Namen; wirft ValueError mit allen Fehlern"""
+    problems = []
+    for column in df.columns:
+        if column in CATALOG_OPTIONAL_COLUMNS:
+            continue
+        null_count = int(df[column].isna().sum())
+        if null_count:
+            problems.append(f"{null_count} fehlende/ungültige Werte in '{column}'")
+    
+    for column, (minimum, maximum) in CATALOG_RANGES.items():
+        outside = (df[column] < minimum) | (df[column] > maximum)
+        if outside.any():
+            examples = ', '.join(df.loc[outside, 'Name'].astype(str).head(3))
+            problems.append(f"{int(outside.sum())} Werte von '{column}' außerhalb [{minimum}, {maximum}] ({examples})")
+        
+        # Ganzzahlige Zielspalten würden Nachkommastellen beim Umwandeln still abschneiden
+        if CATALOG_SCHEMA[column].startswith('int'):
+            fractional = df[column].notna() & (df[column] % 1 != 0)
+            if fractional.any():
+                examples = ', '.join(df.loc[fractional, 'Name'].astype(str).head(3))
+                problems.append(f"{int(fractional.sum())} nicht ganzzahlige Werte in '{column}' ({examples})")
+    
+    duplicates = df['Name'].dropna()
+    duplicates = duplicates[duplicates.duplicated()]
+    if len(duplicates):
+        problems.append(f"doppelte Namen: {', '.join(duplicates.astype(str).unique()[:5])}")
+    
+    if problems:
+        raise ValueError(f"{name} ungültig: " + '; '.join(problems))
+
+# Standort-Katalog aus Datei (Standard: data/locations.csv mit 100 Standorten)
+@memoize(ttl=24*3600)
+def load_comprehensive_locations(path=CATALOG_PATH):
+    """Lädt und validiert den Standort-Katalog, leitet die Spalte 'Kontinent' ab"""
+    df = read_catalog_file(path)
+    validate_catalog(df, Path(path).name)
+    
+    df = df.astype({column: CATALOG_SCHEMA[column] for column in df.columns}).reset_index(drop=True)
+    continent = df['Land'].astype(object).map(COUNTRY_CONTINENT).fillna(OTHER_CONTINENT)
+    df['Kontinent'] = continent.astype('category')
+    return df
+
+# Luftfeuchtigkeit nach Klimazone (Fallback-Schätzung)
+CLIMATE_HUMIDITY = {
+    'desert': 20, 'mediterranean': 60, 'oceanic': 75,
+    'continental': 55, 'tropical': 80, 'polar': 70
+}
+
+# Standort-Typ nach Schlüsselwörtern im Namen (erste Übereinstimmung gewinnt)
+LOCATION_TYPE_KEYWORDS = [
+    ('Observatorium', ['observatory', 'observatorium', 'telescope']),
+    ('Wüste', ['desert', 'wüste', 'sahara', 'atacama', 'gobi']),
+    ('Dark Sky Reserve', ['national', 'park', 'preserve', 'reserve']),
+    ('Hochgebirge', ['mountain', 'peak', 'berg', 'mont', 'alpen', 'himalaya']),
+    ('Insel', ['island', 'insel'])
+]
+
+CLIMATE_COLUMNS = [
+    'nasa_success', 'clear_nights', 'humidity', 'temperature', 'wind_speed'
+]
+
+# API-Integration mit mehreren Quellen
+def nasa_grid_cell(lat, lon):
+    """Mittelpunkt der NASA_GRID_DEG-Gitterzelle (Skalare oder Arrays)"""
+    cell_lat = np.floor(np.asarray(lat, dtype=float) / NASA_GRID_DEG) * NASA_GRID_DEG + NASA_GRID_DEG / 2
+    cell_lon = np.floor(np.asarray(lon, dtype=float) / NASA_GRID_DEG) * NASA_GRID_DEG + NASA_GRID_DEG / 2
+    return np.round(cell_lat, 4), np.round(cell_lon, 4)
+
+@timed('fetch_climate')
+def fetch_climate_table(df, max_in_flight=MAX_REQUESTS_IN_FLIGHT,
+                        revalidate=False, progress_callback=None, warning_callback=None, flush=True):
+    """Netzwerk-Schritt: Klimaspalten pro Standort (gleicher Index wie df)
+    
+    NASA-Daten werden nur einmal pro Gitterzelle abgefragt und an alle
+    Standorte der Zelle verteilt. Live-Wetter kommt getrennt aus LiveWeather.
+    flush=False überlässt das Schreiben des Speichers dem Aufrufer.
+    """
+    api = get_weather_api()
+    
+    names = df['Name'].tolist()
+    cell_lats, cell_lons = nasa_grid_cell(df['Latitude'].tolist(), df['Longitude'].tolist())
+    site_cells = list(zip(cell_lats.tolist(), cell_lons.tolist()))
+    
+    # Standorte je Gitterzelle (Reihenfolge des ersten Auftretens)
+    cell_sites = {}
+    for name, cell in zip(names, site_cells):
+        cell_sites.setdefault(cell, []).append(name)
+    
+    tasks = [
+        {'kind': 'nasa', 'Name': sites[0], 'lat': cell[0], 'lon': cell[1]}
+        for cell, sites in cell_sites.items()
+    ]
+    
+    def fetch_task(task):
+        # NASA POWER API
+        if revalidate:
+            return api.load_nasa_power_data(task['lat'], task['lon'], revalidate=True)
+        get_metrics().inc('astro_cache_requests_total', cache='nasa_power')
+        return api.get_nasa_power_data(task['lat'], task['lon'], f"{task['lat']:.2f}, {task['lon']:.2f}")
+    
+    results = fetch_concurrently(
+        fetch_task, tasks,
+        max_in_flight=max_in_flight,
+        progress_callback=progress_callback
+    )
+    if flush:
+        get_climate_store().flush()
+    
+    nasa_results = dict(zip(cell_sites, results))
+    
+    if warning_callback:
+        for cell, nasa_result in nasa_results.items():
+            if nasa_result.get('error'):
+                warning_callback(f"NASA API Fehler für {', '.join(cell_sites[cell])}: {nasa_result['error']}...")
+    
+    records = []
+    for cell in site_cells:
+        nasa_result = nasa_results[cell]
+        records.append({
+            'nasa_success': nasa_result['success'],
+            'clear_nights': nasa_result.get('clear_nights'),
+            'humidity': nasa_result.get('humidity'),
+            'temperature': nasa_result.get('temperature'),
+            'wind_speed': nasa_result.get('wind_speed', 5)
+        })
+    
+    climate = pd.DataFrame(records, index=df.index, columns=CLIMATE_COLUMNS)
+    return climate.astype({column: float for column in CLIMATE_COLUMNS if not column.endswith('_success')})
+
+def sun_moon_positions(days):
+    """Rektaszension/Deklination von Sonne und Mond (Radiant) und Mondbeleuchtung (0–1)
+    
+    days: Tage seit J2000.0 (beliebige Array-Form). Genauigkeit etwa 0,3°.
+    """
+    rad = np.radians
+    sun_anomaly = rad(357.529 + 0.98560028 * days)
+    sun_lon = rad(280.459 + 0.98564736 * days + 1.915 * np.sin(sun_anomaly) + 0.020 * np.sin(2 * sun_anomaly))
+    obliquity = rad(23.439 - 0.00000036 * days)
+    
+    moon_anomaly = rad(134.963 + 13.064993 * days)
+    elongation = rad(297.850 + 12.190749 * days)
+    latitude_argument = rad(93.272 + 13.229350 * days)
+    moon_lon = rad(
+        218.316 + 13.176396 * days
+        + 6.289 * np.sin(moon_anomaly)
+        + 1.274 * np.sin(2 * elongation - moon_anomaly)
+        + 0.658 * np.sin(2 * elongation)
+        + 0.214 * np.sin(2 * moon_anomaly)
+        - 0.186 * np.sin(sun_anomaly)
+        - 0.114 * np.sin(2 * latitude_argument)
+    )
+    moon_lat = rad(5.128 * np.sin(latitude_argument))
+    
+    sun_ra = np.arctan2(np.cos(obliquity) * np.sin(sun_lon), np.cos(sun_lon))
+    sun_dec = np.arcsin(np.sin(obliquity) * np.sin(sun_lon))
+    moon_ra = np.arctan2(np.sin(moon_lon) * np.cos(obliquity) - np.tan(moon_lat) * np.sin(obliquity), np.cos(moon_lon))
+    moon_dec = np.arcsin(np.sin(moon_lat) * np.cos(obliquity) + np.cos(moon_lat) * np.sin(obliquity) * np.sin(moon_lon))
+    illumination = (1 - np.cos(moon_lat) * np.cos(moon_lon - sun_lon)) / 2
+    return sun_ra, sun_dec, moon_ra, moon_dec, illumination
+
+def hour_angle_limit(lat, dec, altitude):
+    """Halber Stundenwinkel (Grad), in dem ein Objekt über altitude steht: 0 = nie, 180 = immer"""
+    cos_limit = (np.sin(np.radians(altitude)) - np.sin(lat) * np.sin(dec)) / (np.cos(lat) * np.cos(dec))
+    return np.degrees(np.arccos(np.clip(cos_limit, -1, 1)))
+
+def visible_hours(window_start, window_end, hour_angle, half_width, rate):
+    """Stunden im Fenster [window_start, window_end] (relativ zur Ortsmitternacht), in denen
+    ein Objekt mit Stundenwinkel hour_angle (Mitternacht) und Rate (Grad/h) innerhalb ±half_width steht"""
+    hour_angle = (hour_angle + 180) % 360 - 180
+    hours = 0
+    for turn in (-360, 0, 360):
+        start = (-half_width - hour_angle + turn) / rate
+        end = (half_width - hour_angle + turn) / rate
+        hours = hours + np.clip(np.minimum(window_end, end) - np.maximum(window_start, start), 0, None)
+    return hours
+
+def night_ephemeris(lat, lon, dates):
+    """Ephemeriden pro Ort und Nacht (Form Orte × Nächte), alles auf die Ortsmitternacht bezogen
+    
+    dates: Datum des Nachtbeginns. Liefert astronomische Dunkelheit, Mondbeleuchtung und -höhe,
+    Dunkelstunden mit Mond über dem Horizont, mondfreie Stunden (Mondstunden nach Beleuchtung
+    gewichtet) und Stunden mit dem galaktischen Zentrum über GALACTIC_CORE_MIN_ALTITUDE.
+    """
+    lat = np.radians(np.clip(np.asarray(lat, dtype=float), -89.9, 89.9))[:, None]
+    midnight = (np.asarray(dates, dtype='datetime64[D]') + 1 - np.datetime64('2000-01-01', 'D')).astype(float) - 0.5
+    
+    # Positionen hängen nur vom Zeitpunkt ab: einmal pro Längengrad berechnen
+    lon_values, lon_inverse = np.unique(np.asarray(lon, dtype=float), return_inverse=True)
+    days = midnight[None, :] - lon_values[:, None] / 360  # Mittlere Ortsmitternacht in Tagen seit J2000.0
+    positions = sun_moon_positions(days)
+    sun_ra, sun_dec, moon_ra, moon_dec, illumination = (values[lon_inverse.ravel()] for values in positions)
+    sidereal = ((280.46061837 + 360.98564736629 * days + lon_values[:, None]) % 360)[lon_inverse.ravel()]
+    
+    # Dunkelheit: Sonne außerhalb ±limit Stundenwinkel, Fenster um die Mitternacht
+    sun_hour_angle = (sidereal - np.degrees(sun_ra)) % 360
+    twilight_limit = hour_angle_limit(lat, sun_dec, ASTRONOMICAL_TWILIGHT)
+    dark_start = (twilight_limit - sun_hour_angle) / 15
+    dark_end = (360 - twilight_limit - sun_hour_angle) / 15
+    
+    moon_hour_angle = sidereal - np.degrees(moon_ra)
+    moon_dark_hours = visible_hours(dark_start, dark_end, moon_hour_angle, hour_angle_limit(lat, moon_dec, 0.0), 14.49)
+    
+    core_ra, core_dec = np.radians(GALACTIC_CORE_RA_DEC)
+    core_limit = hour_angle_limit(lat, core_dec, GALACTIC_CORE_MIN_ALTITUDE)
+    core_hours = visible_hours(dark_start, dark_end, sidereal - np.degrees(core_ra), core_limit, 15.041)
+    
+    moon_altitude = np.degrees(np.arcsin(
+        np.sin(lat) * np.sin(moon_dec) + np.cos(lat) * np.cos(moon_dec) * np.cos(np.radians(moon_hour_angle))
+    ))
+    dark_hours = dark_end - dark_start
+    return {
+        'dark_hours': dark_hours,
+        'moon_illumination': illumination,
+        'moon_altitude': moon_altitude,
+        'moon_dark_hours': moon_dark_hours,
+        'moonless_dark_hours': dark_hours - moon_dark_hours * illumination,
+        'core_hours': core_hours
+    }
+
+def ephemeris_bins(lat, lon):
+    """Ephemeriden-Raster der Standorte: (Rasterpunkte, Zuordnung Standort → Rasterpunkt)"""
+    lat_bins = np.round(np.asarray(lat, dtype=float) / EPHEMERIS_LAT_STEP) * EPHEMERIS_LAT_STEP
+    lon_bins = np.round(np.asarray(lon, dtype=float) / EPHEMERIS_LON_STEP) * EPHEMERIS_LON_STEP
+    bins, inverse = np.unique(np.column_stack((lat_bins, lon_bins)), axis=0, return_inverse=True)
+    return bins, inverse.ravel()
+
+def site_ephemeris(lat, lon, dates):
+    """night_ephemeris für alle Standorte (Standorte × Nächte, float32), einmal pro Rasterpunkt berechnet"""
+    bins, inverse = ephemeris_bins(lat, lon)
+    ephemeris = night_ephemeris(bins[:, 0], bins[:, 1], dates)
+    return {name: values.astype(np.float32)[inverse] for name, values in ephemeris.items()}
+
+@memoize(max_entries=4)
+def darkness_by_month(lat, lon, year):
+    """Mittelwerte der Nacht-Ephemeriden pro Monat (Standorte × 12) und übers Jahr (Standorte)"""
+    dates = np.arange(np.datetime64(f'{year}-01-01'), np.datetime64(f'{year + 1}-01-01'))
+    month_starts = np.searchsorted(dates, np.arange(np.datetime64(f'{year}-01'), np.datetime64(f'{year + 1}-01')).astype('datetime64[D]'))
+    nights_per_month = np.diff(np.r_[month_starts, len(dates)])
+    bins, inverse = ephemeris_bins(lat, lon)
+    ephemeris = night_ephemeris(bins[:, 0], bins[:, 1], dates)
+    
+    monthly = {
+        name: (np.add.reduceat(values, month_starts, axis=1) / nights_per_month).astype(np.float32)[inverse]
+        for name, values in ephemeris.items()
+    }
+    annual = {name: values.mean(axis=1).astype(np.float32)[inverse] for name, values in ephemeris.items()}
+    return monthly, annual
+
+def hourly_sky(lat, lon, times):
+    """Himmelsgewicht pro Ort und Stunde (Orte × Zeitpunkte): 0 ohne astronomische Dunkelheit,
+    sonst 1 minus Mondbeleuchtung, solange der Mond über dem Horizont steht
+    
+    times: Unix-Zeitpunkte (UTC).
+    """
+    lat = np.radians(np.asarray(lat, dtype=float))[:, None]
+    days = (np.asarray(times, dtype=float) - 946728000) / 86400  # Tage seit J2000.0
+    sun_ra, sun_dec, moon_ra, moon_dec, illumination = sun_moon_positions(days)
+    sidereal = (280.46061837 + 360.98564736629 * days)[None, :] + np.asarray(lon, dtype=float)[:, None]
+    
+    def altitude(ra, dec):
+        hour_angle = np.radians(sidereal - np.degrees(ra))
+        return np.degrees(np.arcsin(np.sin(lat) * np.sin(dec) + np.cos(lat) * np.cos(dec) * np.cos(hour_angle)))
+    
+    dark = altitude(sun_ra, sun_dec) < ASTRONOMICAL_TWILIGHT
+    moonlight = np.where(altitude(moon_ra, moon_dec) > 0, illumination, 0)
+    return np.where(dark, 1 - moonlight, 0)
+
+def classify_location_types(names):
+    """Standort-Typ aus dem Namen ableiten (spaltenweise)"""
+    name_lower = names.str.lower()
+    conditions = [
+        name_lower.str.contains('|'.join(keywords), regex=True, na=False).to_numpy()
+        for _, keywords in LOCATION_TYPE_KEYWORDS
+    ]
+    choices = [location_type for location_type, _ in LOCATION_TYPE_KEYWORDS]
+    return np.select(conditions, choices, default='Naturgebiet')
+
+@timed('enrich')
+def enrich_columns(df, climate):
+    """Spaltenweise Anreicherung: Klimatabelle einfügen, Fallbacks, Typ und Score"""
+    lat = df['Latitude'].to_numpy(dtype=float)
+    lon = df['Longitude'].to_numpy(dtype=float)
+    altitude = df['Höhe_m'].to_numpy(dtype=float)
+    if 'Klimazone' in df.columns:
+        climate_zone = df['Klimazone'].astype(object)
+    else:
+        climate_zone = pd.Series('continental', index=df.index)
+    
+    nasa = climate['nasa_success'].to_numpy(dtype=bool)
+    
+    # Erweiterte geografische Schätzung für Standorte ohne NASA-Daten
+    estimated_nights = MultiSourceWeatherAPI.get_enhanced_geographic_estimation_array(
+        lat, lon, altitude, climate_zone.to_numpy(dtype=object)
+    )
+    clear_nights = np.where(nasa, climate['clear_nights'].fillna(0).to_numpy(), estimated_nights).astype(np.int64)
+    
+    # Temperatur-Schätzung: -6.5°C pro 1000m, Breitengrad-Effekt
+    estimated_temperature = 15 - altitude / 150 - np.abs(lat) / 4
+    estimated_humidity = climate_zone.map(CLIMATE_HUMIDITY).fillna(50).to_numpy(dtype=float)
+    
+    temperature = np.where(nasa, climate['temperature'].to_numpy(dtype=float), estimated_temperature)
+    humidity = np.where(nasa, climate['humidity'].to_numpy(dtype=float), estimated_humidity)
+    wind_speed = np.where(nasa, climate['wind_speed'].fillna(5).to_numpy(dtype=float), 5.0)
+    
+    # Live-Bedingungen ergänzt LiveWeather.overlay() getrennt von der Klimatologie
+    data_source = np.where(nasa, 'NASA POWER', 'Enhanced Geographic')
+    status = np.where(nasa, '🛰️ NASA', '🌍 Erweiterte Schätzung')
+    current_conditions = np.where(nasa, 'Keine Live-Daten', 'Geschätzt')
+    
+    enhanced_df = df.copy()
+    enhanced_df['Klare_Nächte_Jahr'] = clear_nights
+    enhanced_df['Luftfeuchtigkeit_%'] = np.round(humidity, 1)
+    enhanced_df['Temperatur_°C'] = np.round(temperature, 1)
+    enhanced_df['Wind_kmh'] = np.round(wind_speed, 1)
+    enhanced_df['Datenquelle'] = data_source
+    enhanced_df['Status'] = status
+    enhanced_df['Typ'] = classify_location_types(df['Name'])
+    enhanced_df['Aktuelle_Bedingungen'] = current_conditions
+    
+    # Nacht-Ephemeriden des laufenden Jahres (Mittel pro Nacht)
+    _, darkness = darkness_by_month(lat, lon, datetime.now().year)
+    enhanced_df['Dunkelstunden'] = np.round(darkness['dark_hours'], 1)
+    enhanced_df['Mondfreie_Stunden'] = np.round(darkness['moonless_dark_hours'], 1)
+    enhanced_df['Milchstraße_Stunden'] = np.round(darkness['core_hours'], 1)
+    enhanced_df['Qualitätsscore'] = calculate_quality_score(
+        clear_nights, df['Bortle_Skala'].to_numpy(), altitude, darkness['moonless_dark_hours']
+    )
+    
+    return compact_table(enhanced_df)
+
+def compact_table(df):
+    """Kategorien für wiederkehrende Texte, kleine Ganzzahl- und float32-Spalten"""
+    return df.astype({column: dtype for column, dtype in COMPACT_DTYPES.items() if column in df.columns})
+
+def json_ready(df):
+    """float32-Spalten als float64 mit einer Nachkommastelle (sonst 87.3000030518 im JSON)"""
+    float32_columns = [column for column in df.columns if df[column].dtype == np.float32]
+    return df.astype({column: 'float64' for column in float32_columns}).round({column: 1 for column in float32_columns})
+
+def table_fingerprint(df, version):
+    """Schlüssel einer (gefilterten) Tabelle: Datenstand plus Positionen der Zeilen"""
+    positions = hashlib.blake2b(df.index.to_numpy().tobytes(), digest_size=16).hexdigest()
+    return f"{version}:{len(df)}:{positions}"
+
+def catalog_fingerprint(df):
+    """Inhalts-Schlüssel des Katalogs (Snapshots passen nur zum selben Katalog)"""
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.blake2b(hashes.tobytes(), digest_size=16).hexdigest()
+
+def iter_chunks(df, rows=EXPORT_CHUNK_ROWS):
+    for start in range(0, len(df), rows):
+        yield df.iloc[start:start + rows]
+
+def write_export(df, file_format, target, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Schreibt die Tabelle blockweise als CSV, JSON, Parquet oder XLSX in ein Binärziel"""
+    if file_format == 'csv':
+        # Kopfzeile separat: auch eine leere Tabelle ergibt eine gültige CSV-Datei
+        target.write(df.iloc[:0].to_csv(index=False).encode('utf-8'))
+        for chunk in iter_chunks(df, chunk_rows):
+            target.write(chunk.to_csv(index=False, header=False).encode('utf-8'))
+    
+    elif file_format == 'json':
+        # Ein JSON-Array, Block für Block ohne die äußeren Klammern geschrieben;
+        # wie bei orient='records' ergibt eine leere Tabelle [] ohne Spaltennamen
+        target.write(b'[')
+        for i, chunk in enumerate(iter_chunks(df, chunk_rows)):
+            records = json_ready(chunk).to_json(orient='records', indent=2, force_ascii=False).strip()
+            target.write(((',' if i else '') + records[1:-1].rstrip()).encode('utf-8'))
+        target.write(b'\n]')
+    
+    elif file_format == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        for chunk in iter_chunks(df, chunk_rows):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(target, table.schema)
+            writer.write_table(table)
+        if writer is None:
+            writer = pq.ParquetWriter(target, pa.Schema.from_pandas(df, preserve_index=False))
+        writer.close()
+    
+    elif file_format == 'xlsx':
+        import xlsxwriter
+        # constant_memory: fertige Zeilen werden sofort auf die Festplatte ausgelagert
+        workbook = xlsxwriter.Workbook(target, {'constant_memory': True})
+        worksheet = workbook.add_worksheet('Standorte')
+        worksheet.write_row(0, 0, list(df.columns))
+        row = 1
+        for chunk in iter_chunks(df, chunk_rows):
+            chunk = json_ready(chunk).astype(object)
+            for values in chunk.where(chunk.notna(), None).itertuples(index=False):
+                worksheet.write_row(row, 0, values)
+                row += 1
+        workbook.close()
+    
+    else:
+        raise ValueError(f"Unbekanntes Exportformat: {file_format}")
+
+def memory_report(df):
+    """Speicherbedarf pro Spalte (inklusive Zeichenketten) in Bytes"""
+    usage = df.memory_usage(index=True, deep=True)
+    return pd.DataFrame({
+        'Typ': df.dtypes.astype(str).reindex(usage.index).fillna('index'),
+        'Bytes': usage,
+        'Bytes/Standort': (usage / max(len(df), 1)).round(1)
+    })
+
+def enrich_locations(df, max_in_flight=MAX_REQUESTS_IN_FLIGHT,
+                     revalidate=False, progress_callback=None, warning_callback=None):
+    """Erweitere Daten mit Klimadaten (parallele Abfragen, ohne Streamlit-Ausgaben)"""
+    climate = fetch_climate_table(
+        df,
+        max_in_flight=max_in_flight,
+        revalidate=revalidate,
+        progress_callback=progress_callback,
+        warning_callback=warning_callback
+    )
+    return enrich_columns(df, climate)
+
+def empty_climate_table(index):
+    """Klimatabelle ohne API-Ergebnisse (alle Standorte mit Schätzwerten)"""
+    climate = pd.DataFrame(np.nan, index=index, columns=CLIMATE_COLUMNS)
+    climate['nasa_success'] = False
+    return climate
+
+class IncrementalEnrichment:
+    """
+    Lädt API-Daten blockweise im Hintergrund nach
+    
+    snapshot() liefert jederzeit die vollständige Tabelle: bereits geladene
+    Standorte mit API-Daten, alle übrigen mit geografischer Schätzung.
+    Bricht der Lauf ab, steht die Ausnahme in error und eine Meldung in warnings;
+    on_finished wird in jedem Fall aufgerufen.
+    """
+    
+    def __init__(self, base_df, chunk_size=None, revalidate=False, on_finished=None):
+        self.base_df = base_df
+        self.chunk_size = chunk_size or max(INCREMENTAL_CHUNK_SIZE, -(-len(base_df) // INCREMENTAL_CHUNKS))
+        self.revalidate = revalidate
+        self.on_finished = on_finished
+        self.climate = empty_climate_table(base_df.index)
+        self.lock = threading.Lock()
+        self.done = 0
+        self.version = 0
+        self.finished = False
+        self.error = None
+        self.warnings = []
+        self.thread = threading.Thread(target=self._run, daemon=True)
+    
+    def start(self):
+        self.thread.start()
+        return self
+    
+    def _run(self):
+        # Neue Versionen lösen Reruns und eine Neuberechnung der Tabelle aus: höchstens alle INCREMENTAL_PUBLISH_SECONDS
+        published = time.monotonic()
+        try:
+            get_climate_store().reload_if_changed()  # Abrufe des CLI nicht wiederholen
+            for start in range(0, len(self.base_df), self.chunk_size):
+                chunk = self.base_df.iloc[start:start + self.chunk_size]
+                climate_chunk = fetch_climate_table(
+                    chunk,
+                    revalidate=self.revalidate,
+                    warning_callback=self.warnings.append,
+                    flush=False
+                )
+                with self.lock:
+                    self.climate.loc[chunk.index, CLIMATE_COLUMNS] = climate_chunk
+                    self.done += len(chunk)
+                    if time.monotonic() - published >= INCREMENTAL_PUBLISH_SECONDS:
+                        self.version += 1
+                        published = time.monotonic()
+        except Exception as e:
+            self.error = e
+            self.warnings.append(f"Anreicherung abgebrochen nach {self.done}/{len(self.base_df)} Standorten: {e}")
+        finally:
+            get_climate_store().flush()
+            with self.lock:
+                self.finished = True
+                self.version += 1
+            if self.on_finished:
+                self.on_finished(self)
+    
+    def progress(self):
+        with self.lock:
+            return self.done, len(self.base_df)
+    
+    def snapshot(self):
+        """Aktueller Stand als erweiterte Standorttabelle"""
+        with self.lock:
+            climate = self.climate.copy()
+            version = self.version
+        return enrich_columns(self.base_df, climate), version
+
+class FilterEngine:
+    """
+    Vorberechnete Filterstrukturen für eine (unveränderliche) Standorttabelle
+    
+    Kategoriale Spalten werden einmal kodiert und als Bitmaske pro Wert
+    abgelegt, numerische Spalten sortiert für Bereichsfilter. Ergebnisse
+    werden pro Filter-Tupel memoisiert.
+    """
+    
+    @timed('build_filter_engine')
+    def __init__(self, df, categorical_columns, range_columns):
+        self.df = df
+        self.n = len(df)
+        self.lock = threading.Lock()
+        self.bitmaps = {}
+        self.counts = {}
+        for column in categorical_columns:
+            codes, uniques = pd.factorize(df[column])
+            self.bitmaps[column] = {
+                value: np.packbits(codes == code) for code, value in enumerate(uniques.tolist())
+            }
+            self.counts[column] = dict(zip(uniques.tolist(), np.bincount(codes[codes >= 0], minlength=len(uniques)).tolist()))
+        
+        self.sorted = {}
+        for column in range_columns:
+            values = df[column].to_numpy()
+            order = np.argsort(values, kind='stable')
+            self.sorted[column] = (values[order], order)
+        
+        self.range_cache = OrderedDict()
+        self.index_cache = OrderedDict()
+        self.frame_cache = OrderedDict()
+    
+    def _union(self, column, values):
+        bitmaps = self.bitmaps[column]
+        result = np.zeros((self.n + 7) // 8, dtype=np.uint8)
+        for value in values:
+            if value in bitmaps:
+                result |= bitmaps[value]
+        return result
+    
+    def _range_bitmap(self, column, minimum, maximum):
+        key = (column, minimum, maximum)
+        cached = self.range_cache.get(key)
+        if cached is not None:
+            self.range_cache.move_to_end(key)
+            return cached[1]
+        
+        sorted_values, order = self.sorted[column]
+        # Python-Zahlen wie beim Vergleich mit pandas in der Genauigkeit der Spalte (float32-Scores)
+        if sorted_values.dtype.kind == 'f':
+            minimum, maximum = (sorted_values.dtype.type(value) if type(value) is float else value for value in (minimum, maximum))
+        start = 0 if minimum is None else int(np.searchsorted(sorted_values, minimum, side='left'))
+        stop = self.n if maximum is None else int(np.searchsorted(sorted_values, maximum, side='right'))
+        
+        # Nächstgelegene zwischengespeicherte Maske derselben Spalte wiederverwenden,
+        # sodass nur die Zeilen zwischen den Schwellen umgeschaltet werden
+        base = None
+        for (other_column, _, _), (positions, _, other_mask) in self.range_cache.items():
+            if other_column != column:
+                continue
+            distance = abs(positions[0] - start) + abs(positions[1] - stop)
+            if base is None or distance < base[0]:
+                base = (distance, positions, other_mask)
+        
+        if base is not None and base[0] < min(stop - start, self.n - (stop - start)):
+            _, (old_start, old_stop), old_mask = base
+            mask = old_mask.copy()
+            mask[order[min(start, old_start):max(start, old_start)]] = start < old_start
+            mask[order[min(stop, old_stop):max(stop, old_stop)]] = stop > old_stop
+        elif stop - start <= self.n // 2:
+            mask = np.zeros(self.n, dtype=bool)
+            mask[order[start:stop]] = True
+        else:
+            mask = np.ones(self.n, dtype=bool)
+            mask[order[:start]] = False
+            mask[order[stop:]] = False
+        
+        bitmap = np.packbits(mask)
+        self._remember(self.range_cache, key, ((start, stop), bitmap, mask), FILTER_RANGE_CACHE_SIZE)
+        return bitmap
+    
+    @staticmethod
+    def _remember(cache, key, value, size):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > size:
+            cache.popitem(last=False)
+    
+    def indices(self, ranges=(), values=()):
+        """Positionen der passenden Zeilen (memoisiert)
+        
+        ranges: ((Spalte, Minimum, Maximum), ...), None = offen
+        values: ((Spalte, (Wert, ...)), ...), None statt Werten = kein Filter
+        """
+        key = (tuple(ranges), tuple((column, None if v is None else tuple(v)) for column, v in values))
+        with self.lock:
+            cached = self.index_cache.get(key)
+            if cached is not None:
+                self.index_cache.move_to_end(key)
+                return cached
+            
+            bitmaps = [self._range_bitmap(column, minimum, maximum) for column, minimum, maximum in ranges]
+            bitmaps += [self._union(column, selected) for column, selected in values if selected is not None]
+            
+            if bitmaps:
+                combined = np.bitwise_and.reduce(bitmaps) if len(bitmaps) > 1 else bitmaps[0]
+                result = np.flatnonzero(np.unpackbits(combined, count=self.n))
+            else:
+                result = np.arange(self.n)
+            
+            self._remember(self.index_cache, key, result, FILTER_CACHE_SIZE)
+            return result
+    
+    @timed('filter')
+    def filter(self, ranges=(), values=()):
+        """Gefilterte Tabelle (die letzten Ergebnisse bleiben zwischengespeichert)"""
+        key = (tuple(ranges), tuple((column, None if v is None else tuple(v)) for column, v in values))
+        metrics = get_metrics()
+        metrics.inc('astro_cache_requests_total', cache='filter')
+        with self.lock:
+            cached = self.frame_cache.get(key)
+            if cached is not None:
+                self.frame_cache.move_to_end(key)
+                return cached
+        
+        metrics.inc('astro_cache_misses_total', cache='filter')
+        frame = self.df.take(self.indices(ranges, values))
+        with self.lock:
+            self._remember(self.frame_cache, key, frame, FILTER_FRAME_CACHE_SIZE)
+        return frame
+    
+    def count(self, column, value):
+        return self.counts[column].get(value, 0)
+    
+    def value_range(self, column):
+        """(Minimum, Maximum) einer Bereichsspalte"""
+        sorted_values, _ = self.sorted[column]
+        return sorted_values[0], sorted_values[-1]
+
+class SpatialIndex:
+    """
+    Gitterindex über die Standortkoordinaten für Umkreisabfragen
+    
+    Zeilen werden nach Gitterzelle sortiert; eine Abfrage liest pro
+    Breitenstreifen nur den zusammenhängenden Bereich der betroffenen
+    Zellen und prüft die Kandidaten exakt über Einheitsvektoren.
+    """
+    
+    @timed('build_spatial_index')
+    def __init__(self, df, cell_deg=SPATIAL_CELL_DEG):
+        self.df = df
+        self.n = len(df)
+        self.cell_deg = cell_deg
+        self.n_rows = int(np.ceil(180 / cell_deg))
+        self.n_cols = int(np.ceil(360 / cell_deg))
+        
+        lat = np.radians(df['Latitude'].to_numpy(dtype=float))
+        lon = np.radians(df['Longitude'].to_numpy(dtype=float))
+        self.xyz = np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+        
+        cells = self._row(df['Latitude'].to_numpy(dtype=float)) * self.n_cols + self._col(df['Longitude'].to_numpy(dtype=float))
+        self.order = np.argsort(cells, kind='stable')
+        self.sorted_cells = cells[self.order]
+    
+    def _row(self, lat):
+        return np.clip(np.floor((np.asarray(lat) + 90) / self.cell_deg).astype(np.int64), 0, self.n_rows - 1)
+    
+    def _col(self, lon):
+        return np.floor((np.asarray(lon) + 180) / self.cell_deg).astype(np.int64) % self.n_cols
+    
+    def within(self, lat, lon, radius_km):
+        """(Positionen, Entfernungen in km) aller Standorte im Umkreis"""
+        angle = min(radius_km / EARTH_RADIUS_KM, np.pi)
+        first_row = int(self._row(lat - np.degrees(angle)))
+        last_row = int(self._row(lat + np.degrees(angle)))
+        
+        # Längenausdehnung der Kugelkappe; enthält sie einen Pol, ganze Breitenstreifen lesen
+        if angle >= np.pi / 2 - abs(np.radians(lat)):
+            col_ranges = [(0, self.n_cols - 1)]
+        else:
+            delta_lon = np.degrees(np.arcsin(np.sin(angle) / np.cos(np.radians(lat))))
+            first_col, last_col = int(self._col(lon - delta_lon)), int(self._col(lon + delta_lon))
+            if 2 * delta_lon + self.cell_deg >= 360:
+                col_ranges = [(0, self.n_cols - 1)]
+            elif first_col <= last_col:
+                col_ranges = [(first_col, last_col)]
+            else:  # über die Datumsgrenze
+                col_ranges = [(first_col, self.n_cols - 1), (0, last_col)]
+        
+        rows = np.arange(first_row, last_row + 1)
+        low = np.concatenate([rows * self.n_cols + start for start, _ in col_ranges])
+        high = np.concatenate([rows * self.n_cols + stop for _, stop in col_ranges])
+        starts = np.searchsorted(self.sorted_cells, low, side='left')
+        stops = np.searchsorted(self.sorted_cells, high, side='right')
+        candidates = np.concatenate([self.order[a:b] for a, b in zip(starts, stops)] or [np.empty(0, dtype=np.int64)])
+        
+        point = np.array([np.cos(np.radians(lat)) * np.cos(np.radians(lon)),
+                          np.cos(np.radians(lat)) * np.sin(np.radians(lon)),
+                          np.sin(np.radians(lat))])
+        cosine = self.xyz[candidates] @ point
+        inside = cosine >= np.cos(angle)
+        positions = candidates[inside]
+        return positions, EARTH_RADIUS_KM * np.arccos(np.clip(cosine[inside], -1, 1))
+    
+    def best_within(self, lat, lon, radius_km, k=10, column='Qualitätsscore', allowed=None):
+        """Die k besten Standorte (nach column) im Umkreis, mit Spalte 'Entfernung_km'
+        
+        allowed: optionale boolesche Maske über alle Zeilen (z.B. aktive Filter)
+        """
+        positions, distances = self.within(lat, lon, radius_km)
+        if allowed is not None:
+            keep = allowed[positions]
+            positions, distances = positions[keep], distances[keep]
+        
+        values = self.df[column].to_numpy(dtype=float)[positions]
+        if len(positions) > k:
+            # Gleichstände an der k-ten Stelle mitnehmen, damit die Entfernung entscheidet
+            cutoff = -np.partition(-values, k - 1)[k - 1]
+            top = values >= cutoff
+            positions, distances, values = positions[top], distances[top], values[top]
+        ranking = np.lexsort((distances, -values))[:k]
+        
+        result = self.df.take(positions[ranking])
+        return result.assign(Entfernung_km=np.round(distances[ranking], 1))
+
+def best_per_region(df, region_column, column='Qualitätsscore'):
+    """Bester Standort je Region (z.B. 'Kontinent' oder 'Land'), absteigend nach column"""
+    if len(df) == 0:
+        return df
+    best = df.groupby(region_column, observed=True)[column].idxmax()
+    return df.loc[best.to_numpy()].sort_values(column, ascending=False)
+
+def normalize_search_text(text):
+    """Kleinschreibung, ß → ss, Akzente entfernt; Umlaute und ae/oe/ue werden gleich (ü, ue → u)"""
+    text = unicodedata.normalize('NFKD', str(text).lower().replace('ß', 'ss'))
+    text = ''.join(character for character in text if not unicodedata.combining(character))
+    return text.replace('ae', 'a').replace('oe', 'o').replace('ue', 'u')
+
+def search_tokens(text):
+    return re.findall(r'[a-z0-9]+', normalize_search_text(text))
+
+def trigrams(token):
+    padded = f"^{token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class SearchIndex:
+    """
+    Invertierter Index über die Textspalten für Präfix-, Teilwort- und Fuzzy-Suche
+    
+    Pro Spalte wird jedem Wort die Liste seiner Zeilen zugeordnet; das
+    sortierte Vokabular dient der Präfixsuche, ein Trigramm-Index über
+    das Vokabular der Teilwort- (Komposita wie "Nationalpark") und der
+    Fuzzy-Suche. Der Aufwand einer Abfrage hängt von
+    der Zahl der Treffer ab, nicht von der Größe des Katalogs.
+    """
+    
+    @timed('build_search_index')
+    def __init__(self, df, columns=SEARCH_COLUMNS, aliases=SEARCH_ALIASES):
+        self.df = df
+        self.postings = {}
+        vocabulary = set()
+        for column in columns:
+            codes, uniques = pd.factorize(df[column])
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            
+            token_codes = {}
+            for code, value in enumerate(uniques.tolist()):
+                for token in set(search_tokens(value)):
+                    token_codes.setdefault(token, []).append(code)
+            
+            self.postings[column] = {
+                token: np.sort(np.concatenate([order[bounds[code]:bounds[code + 1]] for code in token_codes_list]))
+                for token, token_codes_list in token_codes.items()
+            }
+            vocabulary.update(token_codes)
+        
+        self.vocabulary = sorted(vocabulary)
+        self.trigram_index = {}
+        for token_id, token in enumerate(self.vocabulary):
+            for gram in trigrams(token):
+                self.trigram_index.setdefault(gram, []).append(token_id)
+        
+        self.aliases = {}
+        for group in aliases:
+            normalized = [normalize_search_text(alias) for alias in group]
+            for alias in normalized:
+                self.aliases[alias] = [other for other in normalized if other != alias]
+    
+    def _prefix_matches(self, prefix):
+        start = bisect_left(self.vocabulary, prefix)
+        matches = []
+        for token in self.vocabulary[start:start + SEARCH_MAX_EXPANSIONS]:
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        return matches
+    
+    def _infix_matches(self, query_token):
+        """Wörter, die das Suchwort enthalten (alle seine Trigramme, dann exakt geprüft)"""
+        grams = [query_token[i:i + 3] for i in range(len(query_token) - 2)]
+        candidates = None
+        for gram in sorted(grams, key=lambda gram: len(self.trigram_index.get(gram, ()))):
+            token_ids = self.trigram_index.get(gram, ())
+            candidates = set(token_ids) if candidates is None else candidates.intersection(token_ids)
+            if not candidates:
+                return []
+        matches = [self.vocabulary[token_id] for token_id in sorted(candidates)]
+        return [token for token in matches if query_token in token][:SEARCH_MAX_EXPANSIONS]
+    
+    def _fuzzy_matches(self, token):
+        """(Wort, Jaccard-Ähnlichkeit) ähnlich geschriebener Wörter"""
+        grams = trigrams(token)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.trigram_index.get(gram, ()))
+        matches = []
+        for token_id, count in shared.most_common(SEARCH_MAX_EXPANSIONS):
+            candidate = self.vocabulary[token_id]
+            similarity = count / (len(grams) + len(trigrams(candidate)) - count)
+            if similarity >= SEARCH_FUZZY_THRESHOLD:
+                matches.append((candidate, similarity))
+        return matches
+    
+    def _token_scores(self, query_token, columns):
+        """(Zeilen, Punkte) für ein Suchwort: exakt/Alias > Präfix > Teilwort > Fuzzy, bester Wert je Zeile"""
+        weighted = [(query_token, SEARCH_WEIGHTS['exact'])]
+        weighted += [(alias, SEARCH_WEIGHTS['exact']) for alias in self.aliases.get(query_token, ())]
+        weighted += [(token, SEARCH_WEIGHTS['prefix']) for token in self._prefix_matches(query_token) if token != query_token]
+        if len(query_token) >= 3:
+            weighted += [(token, SEARCH_WEIGHTS['infix']) for token in self._infix_matches(query_token) if not token.startswith(query_token)]
+            weighted += [(token, SEARCH_WEIGHTS['fuzzy'] * similarity) for token, similarity in self._fuzzy_matches(query_token)]
+        
+        rows, scores = [], []
+        for column in columns:
+            postings = self.postings[column]
+            for token, weight in weighted:
+                positions = postings.get(token)
+                if positions is not None:
+                    rows.append(positions)
+                    scores.append(np.full(len(positions), weight))
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        
+        rows, scores = np.concatenate(rows), np.concatenate(scores)
+        order = np.lexsort((-scores, rows))
+        rows, scores = rows[order], scores[order]
+        first = np.r_[True, rows[1:] != rows[:-1]]
+        return rows[first], scores[first]
+    
+    @timed('search')
+    def search(self, query, columns=SEARCH_COLUMNS, allowed=None, limit=None):
+        """Treffer nach Relevanz (Spalte 'Relevanz'), dann Qualitätsscore sortiert
+        
+        Jedes Suchwort muss in einer der Spalten vorkommen (als Wort, Alias,
+        Wortanfang, Wortteil oder ähnlich geschrieben).
+        """
+        tokens = search_tokens(query)
+        if not tokens:
+            return self.df.iloc[:0].assign(Relevanz=np.empty(0))
+        
+        rows, scores = self._token_scores(tokens[0], columns)
+        for token in tokens[1:]:
+            other_rows, other_scores = self._token_scores(token, columns)
+            rows, here, there = np.intersect1d(rows, other_rows, assume_unique=True, return_indices=True)
+            scores = scores[here] + other_scores[there]
+        
+        if allowed is not None:
+            keep = allowed[rows]
+            rows, scores = rows[keep], scores[keep]
+        
+        quality = self.df['Qualitätsscore'].to_numpy(dtype=float)[rows]
+        ranking = np.lexsort((-quality, -scores))[:limit]
+        return self.df.take(rows[ranking]).assign(Relevanz=np.round(scores[ranking], 2))
+
+class ClimateCube:
+    """
+    Monatliche NASA-Klimadaten aller Standorte als kompakter Würfel
+    
+    values hat die Form (Standorte × 12 × Parameter) in float32. Die Werte
+    stammen aus dem Klimaspeicher (eine Antwort pro Gitterzelle), daher
+    kostet der Würfel keine zusätzliche Abfrage. Monatliche klare Nächte
+    und Scores werden für alle Standorte und Monate auf einmal berechnet;
+    Standorte ohne NASA-Daten erhalten die Jahresschätzung gleichmäßig
+    über die Monate verteilt.
+    """
+    
+    @timed('build_climate_cube')
+    def __init__(self, df, store):
+        self.df = df
+        self.parameters = CLIMATE_CUBE_PARAMETERS
+        
+        cell_lats, cell_lons = nasa_grid_cell(df['Latitude'].to_numpy(), df['Longitude'].to_numpy())
+        cells, inverse = np.unique(np.column_stack((cell_lats, cell_lons)), axis=0, return_inverse=True)
+        cell_values = np.full((len(cells), 12, len(self.parameters)), np.nan)
+        for i, (lat, lon) in enumerate(cells.tolist()):
+            payload, _ = store.get_response(lat, lon, NASA_PARAMETERS)
+            if payload is not None:
+                cell_values[i] = MultiSourceWeatherAPI.monthly_values(payload, self.parameters)
+        self.values = cell_values[inverse.ravel()].astype(np.float32)
+        
+        cloud = self.values[:, :, self.parameters.index('CLOUD_AMT_NIGHT')]
+        self.has_data = ~np.isnan(cloud).any(axis=1)
+        
+        monthly_clear = DAYS_PER_MONTH * np.clip((CLEAR_CLOUD_THRESHOLD - cloud) / CLEAR_CLOUD_THRESHOLD, 0, 1)
+        estimated = df['Klare_Nächte_Jahr'].to_numpy(dtype=float)[:, None] / 365 * DAYS_PER_MONTH
+        self.clear_nights = np.where(self.has_data[:, None], monthly_clear, estimated).astype(np.float32)
+        
+        # Monatsscore auf der Jahresskala: klare Nächte des Monats hochgerechnet auf ein Jahr,
+        # dazu die mondfreie Dunkelheit des Monats (keine im Sommer hoher Breiten)
+        self.darkness, _ = darkness_by_month(
+            df['Latitude'].to_numpy(dtype=float), df['Longitude'].to_numpy(dtype=float), datetime.now().year
+        )
+        annualized = np.clip(self.clear_nights / DAYS_PER_MONTH * 365, 30, 350)
+        self.scores = calculate_quality_score(
+            annualized,
+            df['Bortle_Skala'].to_numpy(dtype=float)[:, None],
+            df['Höhe_m'].to_numpy(dtype=float)[:, None],
+            self.darkness['moonless_dark_hours']
+        ).astype(np.float32)
+        self.best_month = np.argmax(self.scores, axis=1)
+    
+    def parameter(self, name):
+        """Monatswerte eines NASA-Parameters (Standorte × 12)"""
+        return self.values[:, :, self.parameters.index(name)]
+
+class TripPlanner:
+    """
+    Reiseplanung: erwartete klare, mondfreie Dunkelstunden pro Standort und Nacht
+    
+    Die mondfreien Dunkelstunden werden einmal für TRIP_HORIZON_NIGHTS Nächte
+    ab first_night pro Ephemeriden-Rasterpunkt berechnet und kumuliert; die
+    Wahrscheinlichkeit einer klaren Nacht stammt monatsweise aus dem
+    ClimateCube. Ein Zeitraum zerfällt in höchstens 13 Monatsabschnitte, die
+    Rangfolge ist daher eine Matrixrechnung (Standorte × Abschnitte) ohne
+    neue Ephemeriden und ohne Abfrage.
+    """
+    
+    @timed('build_trip_planner')
+    def __init__(self, df, cube, first_night, horizon=TRIP_HORIZON_NIGHTS):
+        self.df = df
+        self.first_night = np.datetime64(first_night, 'D')
+        self.dates = self.first_night + np.arange(horizon)
+        self.night_month = (self.dates.astype('datetime64[M]').astype(int) % 12).astype(np.int8)
+        
+        bins, self.site_bin = ephemeris_bins(df['Latitude'].to_numpy(dtype=float), df['Longitude'].to_numpy(dtype=float))
+        self.moonless = np.clip(night_ephemeris(bins[:, 0], bins[:, 1], self.dates)['moonless_dark_hours'], 0, None).astype(np.float32)
+        self.cumulative = np.zeros((len(bins), horizon + 1))
+        np.cumsum(self.moonless, axis=1, out=self.cumulative[:, 1:])
+        
+        self.clear_probability = (cube.clear_nights / DAYS_PER_MONTH).astype(np.float32)
+    
+    def night_range(self, start, end):
+        """Positionen [first, stop) der Nächte start bis end (einschließlich), auf den Horizont begrenzt"""
+        first = int(np.clip((np.datetime64(start, 'D') - self.first_night).astype(int), 0, len(self.dates)))
+        stop = int(np.clip((np.datetime64(end, 'D') - self.first_night).astype(int) + 1, first, len(self.dates)))
+        return first, stop
+    
+    @timed('trip_rank')
+    def rank(self, start, end, allowed=None, near=None, limit=None):
+        """Standorte nach erwarteten klaren, mondfreien Dunkelstunden im Zeitraum
+        
+        allowed: optionale boolesche Maske über alle Zeilen (z.B. aktive Filter)
+        near: optional (Positionen, Entfernungen) aus SpatialIndex.within, fügt 'Entfernung_km' hinzu
+        """
+        first, stop = self.night_range(start, end)
+        if near is not None:
+            positions, distances = near
+        else:
+            positions, distances = np.arange(len(self.df)), None
+        if allowed is not None:
+            keep = allowed[positions]
+            positions = positions[keep]
+            distances = distances[keep] if distances is not None else None
+        
+        # Monatsabschnitte des Zeitraums: Summen aus den kumulierten Stunden
+        changes = first + 1 + np.flatnonzero(np.diff(self.night_month[first:stop]))
+        segment_start = np.r_[first, changes] if stop > first else np.empty(0, dtype=np.int64)
+        segment_stop = np.r_[changes, stop] if stop > first else np.empty(0, dtype=np.int64)
+        segment_month = self.night_month[segment_start]
+        
+        segment_hours = (self.cumulative[:, segment_stop] - self.cumulative[:, segment_start])[self.site_bin[positions]]
+        probability = self.clear_probability[positions[:, None], segment_month]
+        nights = max(stop - first, 1)
+        
+        expected_hours = (probability * segment_hours).sum(axis=1)
+        expected_nights = (probability * (segment_stop - segment_start)).sum(axis=1)
+        quality = self.df['Qualitätsscore'].to_numpy(dtype=float)[positions]
+        ranking = np.lexsort((-quality, -expected_hours))[:limit]
+        
+        result = self.df.take(positions[ranking]).assign(
+            Erwartete_Stunden=np.round(expected_hours[ranking], 1),
+            Klare_Nächte_erwartet=np.round(expected_nights[ranking], 1),
+            Mondfreie_Stunden_Nacht=np.round(segment_hours.sum(axis=1)[ranking] / nights, 1)
+        )
+        if distances is not None:
+            result = result.assign(Entfernung_km=np.round(distances[ranking], 1))
+        return result
+    
+    def nightly(self, positions, start, end):
+        """(Daten, erwartete Stunden pro Standort und Nacht) für die Positionen im Zeitraum"""
+        first, stop = self.night_range(start, end)
+        months = self.night_month[first:stop]
+        hours = self.moonless[self.site_bin[positions], first:stop] * self.clear_probability[np.asarray(positions)[:, None], months]
+        return self.dates[first:stop], hours
+
+class LocationDataService:
+    """
+    Prozessweiter Datendienst: eine Anreicherung für alle Browser-Sessions
+    
+    Gleichzeitige Aktualisierungen werden zusammengefasst (single-flight),
+    fertige Tabellen atomar ausgetauscht. Die ausgelieferte Tabelle wird von
+    allen Sessions geteilt und darf nicht verändert werden.
+    """
+    
+    def __init__(self, base_df, refresh_interval=SERVICE_REFRESH_SECONDS):
+        self.base_df = base_df
+        self.catalog = catalog_fingerprint(base_df)
+        self.lock = threading.Lock()
+        self.table = None      # Vollständige Tabelle der letzten Anreicherung
+        self.version = 0       # Erhöht bei jedem Austausch
+        self.loader = None     # Laufende Anreicherung
+        self.partial = None    # (Loader-Version, Zwischenstand) beim ersten Laden
+        self.engine = None     # FilterEngine der zuletzt ausgelieferten Tabelle
+        self.spatial = None    # SpatialIndex der zuletzt ausgelieferten Tabelle
+        self.search = None     # SearchIndex der zuletzt ausgelieferten Tabelle
+        self.cube = None       # ClimateCube der zuletzt ausgelieferten Tabelle
+        self.planner = None    # TripPlanner der zuletzt ausgelieferten Tabelle (und des Tages)
+        self.snapshot_info = None  # Eintrag des geladenen bzw. geschriebenen Snapshots
+        self.warnings = []
+        
+        # Persistente Tabelle sofort ausliefern, veraltete im Hintergrund erneuern
+        loaded, is_stale = self.load_snapshot()
+        if not loaded:
+            self.refresh()
+        elif is_stale and not self._cli_snapshot_fresh():
+            self.refresh(revalidate=True)
+        
+        threading.Thread(target=self._refresh_periodically, args=(refresh_interval,), daemon=True).start()
+    
+    def load_snapshot(self):
+        """Neueren Snapshot desselben Katalogs übernehmen: (übernommen, veraltet)
+        
+        Bereits übernommene oder selbst geschriebene Versionen werden nicht erneut gelesen.
+        """
+        store = get_climate_store()
+        info = store.snapshot_info()
+        with self.lock:
+            known = self.snapshot_info
+        if info is None or (known is not None and known['file'] == info['file']):
+            return False, False
+        
+        stored_df, is_stale, info = store.load_locations(self.catalog)
+        # Tabellen mit älterem Schema (fehlende Katalog- oder Ephemeridenspalten) werden neu berechnet
+        if stored_df is None or not set(self.base_df.columns) | set(EPHEMERIS_COLUMNS) <= set(stored_df.columns):
+            return False, False
+        
+        table = compact_table(stored_df)
+        # ClimateCube und TripPlanner lesen die Monatswerte aus dem Speicher: dieselben Antworten wie der Snapshot
+        store.reload_if_changed()
+        with self.lock:
+            self.table = table
+            self.version += 1
+            self.snapshot_info = info
+        return True, is_stale
+    
+    def refresh(self, revalidate=False):
+        """Anreicherung starten bzw. laufende zurückgeben (single-flight)"""
+        with self.lock:
+            if self.loader is None:
+                self.loader = IncrementalEnrichment(
+                    self.base_df,
+                    revalidate=revalidate,
+                    on_finished=self._swap
+                ).start()
+            return self.loader
+    
+    def _cli_snapshot_fresh(self):
+        """Aktueller Snapshot stammt vom CLI und ist jünger als SNAPSHOT_CLI_MAX_AGE"""
+        with self.lock:
+            info = self.snapshot_info
+        return (info is not None and info.get('source') == 'cli'
+                and time.time() - info['created'] < SNAPSHOT_CLI_MAX_AGE)
+    
+    def _refresh_periodically(self, interval):
+        """Neue Snapshots (z. B. vom CLI) übernehmen, sonst nach interval selbst anreichern
+        
+        Solange ein frischer CLI-Snapshot ausgeliefert wird, übernimmt der Cron-Job die Anreicherung.
+        """
+        last_refresh = time.time()
+        while True:
+            time.sleep(min(SNAPSHOT_POLL_SECONDS, interval))
+            loaded, _ = self.load_snapshot()
+            if loaded or self._cli_snapshot_fresh():
+                last_refresh = time.time()
+            elif time.time() - last_refresh >= interval:
+                self.refresh(revalidate=True)
+                last_refresh = time.time()
+    
+    def _swap(self, loader):
+        if loader.error is not None:
+            self._discard(loader)
+            return
+        
+        table, _ = loader.snapshot()
+        with self.lock:
+            self.table = table
+            self.version += 1
+            self.loader = None
+            self.partial = None
+            self.warnings = list(loader.warnings)
+        
+        if table['Datenquelle'].str.contains('NASA').any():
+            info = get_climate_store().save_locations(table, self.catalog)
+            if info is not None:
+                with self.lock:
+                    self.snapshot_info = info
+    
+    def _discard(self, loader):
+        """Abgebrochene Anreicherung: bisherige Tabelle behalten, Fehler unter den Warnungen zeigen
+        
+        Ohne bisherige Tabelle wird der Zwischenstand nur im Speicher ausgeliefert, nie als Snapshot.
+        """
+        with self.lock:
+            first_run = self.table is None
+        table = loader.snapshot()[0] if first_run else None
+        with self.lock:
+            if table is not None:
+                self.table = table
+                self.version += 1
+            self.loader = None
+            self.partial = None
+            self.warnings = list(loader.warnings)
+    
+    def is_partial(self):
+        """True, solange noch keine vollständige Tabelle vorliegt"""
+        with self.lock:
+            return self.table is None
+    
+    def progress(self):
+        """(fertig, gesamt) der laufenden Anreicherung, sonst None"""
+        with self.lock:
+            loader = self.loader
+        return loader.progress() if loader is not None else None
+    
+    def version_key(self):
+        with self.lock:
+            if self.table is None and self.loader is not None:
+                return (self.version, self.loader.version)
+            return (self.version, 0)
+    
+    def snapshot(self):
+        """Geteilte Tabelle und Versionsschlüssel (Zwischenstand beim ersten Laden)"""
+        with self.lock:
+            if self.table is not None:
+                return self.table, (self.version, 0)
+            
+            loader = self.loader
+            partial = self.partial
+            version = self.version
+        
+        # Zwischenstand außerhalb der Sperre berechnen (blockiert sonst alle Sessions)
+        if partial is None or partial[0] != loader.version:
+            table, loader_version = loader.snapshot()
+            partial = (loader_version, table)
+            with self.lock:
+                if self.partial is None or self.partial[0] < loader_version:
+                    self.partial = partial
+        return partial[1], (version, partial[0])
+
+    def filter_engine(self, table):
+        """FilterEngine für die übergebene Tabelle (einmal pro Tabellenstand gebaut)"""
+        with self.lock:
+            if self.engine is None or self.engine.df is not table:
+                self.engine = FilterEngine(table, FILTER_CATEGORICAL_COLUMNS, FILTER_RANGE_COLUMNS)
+            return self.engine
+    
+    def search_index(self, table):
+        """SearchIndex für die übergebene Tabelle (einmal pro Tabellenstand gebaut)"""
+        with self.lock:
+            if self.search is None or self.search.df is not table:
+                self.search = SearchIndex(table)
+            return self.search
+    
+    def climate_cube(self, table):
+        """ClimateCube für die übergebene Tabelle (einmal pro Tabellenstand gebaut)"""
+        with self.lock:
+            if self.cube is None or self.cube.df is not table:
+                self.cube = ClimateCube(table, get_climate_store())
+            return self.cube
+    
+    def trip_planner(self, table):
+        """TripPlanner für die übergebene Tabelle (einmal pro Tabellenstand und Tag gebaut)"""
+        cube = self.climate_cube(table)
+        today = np.datetime64(datetime.now().date(), 'D')
+        with self.lock:
+            if self.planner is None or self.planner.df is not table or self.planner.first_night != today:
+                self.planner = TripPlanner(table, cube, today)
+            return self.planner
+    
+    def spatial_index(self, table):
+        """SpatialIndex für die übergebene Tabelle (einmal pro Tabellenstand gebaut)"""
+        with self.lock:
+            if self.spatial is None or self.spatial.df is not table:
+                self.spatial = SpatialIndex(table)
+            return self.spatial
+
+@functools.lru_cache(maxsize=None)
+def get_data_service():
+    """Ein Datendienst pro Prozess"""
+    return LocationDataService(load_comprehensive_locations())
+
+class ApiQuota:
+    """
+    Tageskontingent eines API-Keys pro UTC-Tag, persistent im Speicherverzeichnis
+    
+    Live-Wetter und Vorhersage mit demselben Key buchen ihre Abrufe hier;
+    die Zählung überlebt Neustarts. Prozesse mit demselben Key (Replikate,
+    überlappende Neustarts) teilen die Datei: take() liest sie unter file_lock
+    ein und mischt die Zählung vor dem Bewilligen ein. Jeder Verbraucher mit Eintrag in shares
+    erhält einen festen Anteil des Limits, damit keiner den anderen aushungert.
+    Das Kontingent wird über den UTC-Tag verteilt: bis zur Uhrzeit t sind
+    höchstens (t + QUOTA_PACING_HEADROOM) / 24 h des (Anteils am) Limit nutzbar,
+    nicht verbrauchte Abrufe bleiben für später erhalten.
+    """
+    
+    def __init__(self, path, limit=LIVE_DAILY_QUOTA, shares=None):
+        self.path = Path(path)
+        self.limit = limit
+        self.shares = shares or {}
+        self.lock = threading.Lock()
+        self.day, self.calls, self.consumers = self._read() or (time.strftime('%Y-%m-%d', time.gmtime()), 0, {})
+    
+    def _read(self):
+        """Zählung des laufenden UTC-Tages aus der Datei (None, wenn fehlend oder beschädigt)"""
+        today = time.strftime('%Y-%m-%d', time.gmtime())
+        try:
+            stored = json.loads(self.path.read_text())
+            if stored['day'] != today:
+                return today, 0, {}
+            return today, int(stored['calls']), {name: int(count) for name, count in stored.get('consumers', {}).items()}
+        except Exception:
+            return None
+    
+    def _sync(self):
+        """Zählung anderer Prozesse einmischen (unter self.lock), höhere Stände gewinnen"""
+        self._roll_day()
+        stored = self._read()
+        if stored is None or stored[0] != self.day:
+            return
+        _, calls, consumers = stored
+        self.calls = max(self.calls, calls)
+        for consumer, count in consumers.items():
+            self.consumers[consumer] = max(self.consumers.get(consumer, 0), count)
+    
+    def _write(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f'{self.path.name}.{os.getpid()}.tmp')
+            tmp_path.write_text(json.dumps({'day': self.day, 'calls': self.calls, 'consumers': self.consumers}))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # Zählung läuft im Speicher weiter
+    
+    def _roll_day(self):
+        today = time.strftime('%Y-%m-%d', time.gmtime())
+        if today != self.day:
+            self.day, self.calls, self.consumers = today, 0, {}
+    
+    def available(self, consumer=None, now=None):
+        """Jetzt noch bewilligbare Abrufe (Anteil des Verbrauchers, gleichmäßig über den Tag)"""
+        now = time.time() if now is None else now
+        with self.lock:
+            self._sync()
+            return self._available(consumer, now)
+    
+    def _available(self, consumer, now):
+        elapsed = now % 86400  # Sekunden seit Mitternacht UTC
+        paced = min(1.0, (elapsed + QUOTA_PACING_HEADROOM) / 86400)
+        if consumer in self.shares:
+            allowance = int(self.limit * self.shares[consumer] * paced) - self.consumers.get(consumer, 0)
+        else:
+            allowance = int(self.limit * paced) - self.calls
+        return max(0, min(allowance, self.limit - self.calls))
+    
+    def calls_today(self):
+        """Bereits verbrauchte Abrufe des laufenden UTC-Tages"""
+        with self.lock:
+            self._sync()
+            return self.calls
+    
+    def consumer_calls(self):
+        """Verbrauchte Abrufe pro Verbraucher im laufenden UTC-Tag"""
+        with self.lock:
+            self._sync()
+            return dict(self.consumers)
+    
+    def take(self, count, consumer=None):
+        """Bis zu count Abrufe für consumer verbuchen; liefert die bewilligte Zahl"""
+        with self.lock:
+            granted = None
+            try:
+                with file_lock(self.path):
+                    granted = self._take(count, consumer)
+            except OSError:
+                pass  # Keine Sperrdatei möglich: Zählung nur im Speicher
+            if granted is None:
+                granted = self._take(count, consumer)
+            return granted
+    
+    def _take(self, count, consumer):
+        self._sync()
+        granted = min(count, self._available(consumer, time.time()))
+        if granted:
+            self.calls += granted
+            if consumer is not None:
+                self.consumers[consumer] = self.consumers.get(consumer, 0) + granted
+            self._write()
+        return granted
+
+@functools.lru_cache(maxsize=None)
+def get_api_quota(api_key):
+    """Ein Kontingent pro Prozess und OpenWeather-Key (Live-Wetter und Vorhersage)"""
+    key_hash = hashlib.blake2b(api_key.encode(), digest_size=8).hexdigest()
+    return ApiQuota(Path(STORE_DIR) / f'openweather_quota_{key_hash}.json', shares={'live': LIVE_QUOTA_SHARE, 'forecast': FORECAST_QUOTA_SHARE})
+
+def weather_cells(df):
+    """Wetterzellen der Standorte: (Zuordnung Standort → Zelle, Zellkoordinaten)"""
+    cells = np.round(df[['Latitude', 'Longitude']].to_numpy(dtype=float) / LIVE_GRID_DEG).astype(np.int64)
+    cells, inverse = np.unique(cells, axis=0, return_inverse=True)
+    return inverse.ravel(), np.round(cells * LIVE_GRID_DEG, 4)
+
+class WeatherCellRefresher:
+    """
+    Gemeinsame Aktualisierung von Wetterdaten pro LIVE_GRID_DEG-Zelle
+    
+    Standorte derselben Zelle teilen einen Abruf. Jede Zelle hat eine eigene
+    Frische (ttl); request() lädt veraltete Zellen in der übergebenen
+    Priorität im Hintergrund nach (single-flight), höchstens batch_size pro
+    Durchlauf und nur im Rahmen des Kontingents (quota=None: unbegrenzt),
+    gebucht auf den Verbraucher quota_consumer.
+    Unterklassen liefern _fetch(lat, lon) und _store(cells, results, now).
+    """
+    
+    quota_consumer = None
+    
+    def __init__(self, base_df, quota=None, ttl=LIVE_WEATHER_TTL, batch_size=LIVE_BATCH_SIZE):
+        self.index = base_df.index
+        self.site_cell, self.cell_coords = weather_cells(base_df)
+        self.quota = quota
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.checked_at = np.zeros(len(self.cell_coords))  # Letzter Abrufversuch
+        self.lock = threading.Lock()
+        self.running = False
+        self.version = 0       # Erhöht nach jedem abgeschlossenen Durchlauf
+    
+    def request(self, labels):
+        """Veraltete Zellen der Standorte (Index-Labels, nach Priorität sortiert) im Hintergrund laden
+        
+        Liefert die Zahl der gestarteten Abrufe (0, wenn nichts fällig, ein Durchlauf läuft
+        oder das Kontingent erschöpft ist).
+        """
+        rows = self.index.get_indexer(labels)
+        cells = self.site_cell[rows[rows >= 0]]
+        _, first = np.unique(cells, return_index=True)
+        cells = cells[np.sort(first)]  # Eindeutig, Priorität bleibt erhalten
+        
+        with self.lock:
+            if self.running:
+                return 0
+            now = time.time()
+            due = cells[now - self.checked_at[cells] >= self.ttl][:self.batch_size]
+            # Abrufe vorab verbuchen: auch fehlgeschlagene zählen gegen das Kontingent
+            if self.quota is not None:
+                due = due[:self.quota.take(len(due), self.quota_consumer)]
+            if len(due) == 0:
+                return 0
+            self.checked_at[due] = now
+            self.running = True
+        
+        threading.Thread(target=self._run, args=(due,), daemon=True).start()
+        return len(due)
+    
+    def _run(self, cells):
+        try:
+            results = fetch_concurrently(
+                lambda cell: self._fetch(self.cell_coords[cell, 0], self.cell_coords[cell, 1]),
+                cells.tolist()
+            )
+            with self.lock:
+                self._store(cells, results, time.time())
+        finally:
+            with self.lock:
+                self.running = False
+                self.version += 1
+
+class LiveWeather(WeatherCellRefresher):
+    """
+    Live-Bedingungen von OpenWeather für den Katalog, getrennt von der Klimatologie
+    
+    overlay() ergänzt 'Status' und 'Aktuelle_Bedingungen' einer Tabelle,
+    ohne die Anreicherung zu wiederholen.
+    """
+    
+    quota_consumer = 'live'
+    
+    def __init__(self, base_df, api_key, url=OPENWEATHER_URL, quota=None,
+                 ttl=LIVE_WEATHER_TTL, batch_size=LIVE_BATCH_SIZE):
+        super().__init__(base_df, quota, ttl, batch_size)
+        self.api_key = api_key
+        self.url = url
+        self.observed_at = np.zeros(len(self.cell_coords))  # Letzte erfolgreiche Beobachtung
+        self.clouds = np.full(len(self.cell_coords), np.nan)
+        self.humidity = np.full(len(self.cell_coords), np.nan)
+        self.temperature = np.full(len(self.cell_coords), np.nan)
+    
+    def _fetch(self, lat, lon):
+        return MultiSourceWeatherAPI.get_openweather_data(lat, lon, self.api_key, self.url)
+    
+    def _store(self, cells, results, now):
+        for cell, result in zip(cells, results):
+            if result.get('success'):
+                self.observed_at[cell] = now
+                self.clouds[cell] = result['current_clouds']
+                self.humidity[cell] = result['current_humidity']
+                self.temperature[cell] = result['current_temp']
+    
+    def fresh_sites(self):
+        """Zahl der Standorte mit anzeigbarer Live-Beobachtung"""
+        with self.lock:
+            fresh = time.time() - self.observed_at <= LIVE_WEATHER_MAX_AGE
+        return int(fresh[self.site_cell].sum())
+    
+    def overlay(self, df):
+        """df mit Live-Status und -Bedingungen (unverändert zurück, wenn keine Beobachtung vorliegt)
+        
+        Bei Standorten ohne NASA-Daten ersetzen Live-Feuchte und -Temperatur die
+        Schätzung, Datenquelle wird 'OpenWeather + Geographic'.
+        """
+        rows = self.index.get_indexer(df.index)
+        cells = np.where(rows >= 0, self.site_cell[rows], 0)
+        with self.lock:
+            fresh = (rows >= 0) & (time.time() - self.observed_at[cells] <= LIVE_WEATHER_MAX_AGE)
+            clouds, humidity, temperature = self.clouds[cells], self.humidity[cells], self.temperature[cells]
+        if not fresh.any():
+            return df
+        
+        nasa = df['Datenquelle'].astype(str).str.contains('NASA').to_numpy()
+        live_only = fresh & ~nasa
+        status = df['Status'].to_numpy(dtype=object).copy()
+        status[fresh] = np.where(nasa[fresh], '🛰️ NASA + 🌤️ Live', '🌤️ Live + 🌍 Geo')
+        conditions = df['Aktuelle_Bedingungen'].to_numpy(dtype=object).copy()
+        conditions[fresh] = [f"Live: {value:.0f}% Bewölkung" for value in clouds[fresh]]
+        source = df['Datenquelle'].to_numpy(dtype=object).copy()
+        source[live_only] = 'OpenWeather + Geographic'
+        return df.assign(**{
+            'Status': pd.Categorical(status),
+            'Aktuelle_Bedingungen': pd.Categorical(conditions),
+            'Datenquelle': pd.Categorical(source),
+            'Luftfeuchtigkeit_%': np.where(live_only, np.round(humidity, 1), df['Luftfeuchtigkeit_%']).astype(np.float32),
+            'Temperatur_°C': np.where(live_only, np.round(temperature, 1), df['Temperatur_°C']).astype(np.float32)
+        })
+
+@functools.lru_cache(maxsize=None)
+def get_live_weather(api_key):
+    """Ein Live-Wetter-Dienst pro Prozess und OpenWeather-Key (gemeinsames Kontingent)"""
+    return LiveWeather(load_comprehensive_locations(), api_key, quota=get_api_quota(api_key))
+
+def parse_forecast(payload):
+    """OpenWeather-Vorhersage als Arrays: Zeit (Unix), Bewölkung (%), Luftfeuchte (%), Wind (m/s)"""
+    entries = payload['list']
+    return (
+        np.array([entry['dt'] for entry in entries], dtype=np.int64),
+        np.array([entry['clouds']['all'] for entry in entries], dtype=float),
+        np.array([entry['main']['humidity'] for entry in entries], dtype=float),
+        np.array([entry.get('wind', {}).get('speed', np.nan) for entry in entries], dtype=float)
+    )
+
+class OpenWeatherForecastProvider:
+    """5-Tage-Vorhersage in 3-Stunden-Schritten (OpenWeather /forecast)"""
+    
+    def __init__(self, api_key, url=OPENWEATHER_FORECAST_URL):
+        self.api_key = api_key
+        self.url = url
+    
+    def fetch(self, lat, lon):
+        """Vorhersage als parse_forecast-Arrays oder None"""
+        params = {'lat': lat, 'lon': lon, 'appid': self.api_key, 'units': 'metric'}
+        try:
+            response = get_weather_api().get(self.url, params, read_timeout=10, source='openweather_forecast')
+            if response.status_code == 200:
+                return parse_forecast(response.json())
+        except Exception:
+            pass
+        return None
+
+class FixtureForecastProvider:
+    """
+    Vorhersage aus einer lokalen Datei im OpenWeather-Format (ohne API-Key)
+    
+    Die Datei enthält eine Vorhersage ('list') für alle Standorte oder ein
+    Objekt "lat,lon" (Zellkoordinaten) → Vorhersage mit optionalem 'default'.
+    Die Zeitpunkte werden verschoben, sodass der erste Schritt auf die
+    laufende Stunde fällt.
+    """
+    
+    def __init__(self, path):
+        self.payload = json.loads(Path(path).read_text())
+    
+    def fetch(self, lat, lon):
+        payload = self.payload
+        if 'list' not in payload:
+            payload = payload.get(f"{lat:g},{lon:g}", payload.get('default'))
+        if payload is None:
+            return None
+        times, *values = parse_forecast(payload)
+        return (times - times[0] + int(time.time()) // 3600 * 3600, *values)
+
+class ForecastCache(WeatherCellRefresher):
+    """
+    Stündliche Vorhersage (Bewölkung, Feuchte, Wind) aller Standorte als (Zellen × Stunden)-Arrays
+    
+    Spalte 0 ist die laufende volle Stunde; mit der Zeit werden die Arrays
+    verschoben statt neu geladen, eine Aktualisierung überschreibt nur die
+    Zeilen der abgerufenen Zellen. Die Himmelsgewichte (Dunkelheit, Mond)
+    werden einmal pro Stunde und Ephemeriden-Rasterpunkt berechnet; rank()
+    ist danach eine Matrixrechnung über (Zelle, Rasterpunkt)-Paare × Stunden.
+    """
+    
+    quota_consumer = 'forecast'
+    
+    def __init__(self, base_df, provider, quota=None, hours=FORECAST_HOURS,
+                 ttl=FORECAST_TTL, batch_size=FORECAST_BATCH_SIZE):
+        super().__init__(base_df, quota, ttl, batch_size)
+        self.provider = provider
+        self.hours = hours
+        self.origin = int(time.time()) // 3600 * 3600
+        
+        n_cells = len(self.cell_coords)
+        self.clouds = np.full((n_cells, hours), FORECAST_MISSING, dtype=np.uint8)
+        self.humidity = np.full((n_cells, hours), FORECAST_MISSING, dtype=np.uint8)
+        self.wind = np.full((n_cells, hours), np.nan, dtype=np.float16)
+        
+        self.bins, site_bin = ephemeris_bins(base_df['Latitude'].to_numpy(dtype=float), base_df['Longitude'].to_numpy(dtype=float))
+        pairs, inverse = np.unique(np.column_stack((self.site_cell, site_bin)), axis=0, return_inverse=True)
+        self.site_pair = inverse.ravel()
+        self.pair_cell, self.pair_bin = pairs[:, 0], pairs[:, 1]
+        self.sky = None
+        self.sky_origin = None
+        self.scores = {}        # Fenster → ((Version, Stunde), Paarwerte)
+    
+    def _fetch(self, lat, lon):
+        return self.provider.fetch(lat, lon)
+    
+    def _advance(self):
+        """Arrays auf die laufende Stunde verschieben (unter self.lock)"""
+        shift = min((int(time.time()) // 3600 * 3600 - self.origin) // 3600, self.hours)
+        if shift <= 0:
+            return
+        for values, missing in ((self.clouds, FORECAST_MISSING), (self.humidity, FORECAST_MISSING), (self.wind, np.nan)):
+            values[:, :self.hours - shift] = values[:, shift:]
+            values[:, self.hours - shift:] = missing
+        self.origin += shift * 3600
+    
+    def _store(self, cells, results, now):
+        self._advance()
+        grid = self.origin + 3600 * np.arange(self.hours)
+        for cell, result in zip(cells, results):
+            if result is None or len(result[0]) == 0:
+                continue
+            times, clouds, humidity, wind = result
+            step = np.median(np.diff(times)) if len(times) > 1 else 3600
+            # Jede Stunde übernimmt den letzten Zeitschritt, der sie abdeckt
+            source = np.searchsorted(times, grid, side='right') - 1
+            valid = (source >= 0) & (grid - times[np.maximum(source, 0)] < step)
+            source = np.maximum(source, 0)
+            self.clouds[cell] = np.where(valid, np.clip(clouds[source], 0, 100), FORECAST_MISSING)
+            self.humidity[cell] = np.where(valid, np.clip(humidity[source], 0, 100), FORECAST_MISSING)
+            self.wind[cell] = np.where(valid, wind[source], np.nan)
+    
+    def _sky(self):
+        """Himmelsgewichte (Rasterpunkte × Stunden) zur laufenden Stunde (unter self.lock)"""
+        if self.sky_origin != self.origin:
+            times = self.origin + 3600 * np.arange(self.hours) + 1800  # Stundenmitte
+            self.sky = hourly_sky(self.bins[:, 0], self.bins[:, 1], times).astype(np.float32)
+            self.sky_origin = self.origin
+        return self.sky
+    
+    def covered_sites(self):
+        """Zahl der Standorte mit Vorhersage für die laufende Stunde"""
+        with self.lock:
+            self._advance()
+            covered = self.clouds[:, 0] != FORECAST_MISSING
+        return int(covered[self.site_cell].sum())
+    
+    def _pair_scores(self, hours):
+        """(Beobachtungsstunden, Dunkelstunden, Bewölkung bei Dunkelheit) pro Paar, NaN ohne Vorhersage
+        
+        Einmal pro Datenstand, Stunde und Fenster berechnet, nur für Zellen mit Vorhersage (unter self.lock).
+        """
+        key = (self.version, self.origin)
+        if self.scores.get(hours, (None,))[0] != key:
+            covered = (self.clouds[:, :hours] != FORECAST_MISSING).any(axis=1)
+            pairs = np.flatnonzero(covered[self.pair_cell])
+            cells = self.pair_cell[pairs]
+            sky = self._sky()[self.pair_bin[pairs], :hours]
+            clouds = self.clouds[cells, :hours]
+            
+            # Gütefaktor pro Stunde: freier Himmel, ohne Tau und Sturm
+            calm = (self.humidity[cells, :hours] <= FORECAST_MAX_HUMIDITY) & ~(self.wind[cells, :hours] > FORECAST_MAX_WIND)
+            quality = np.where(calm & (clouds != FORECAST_MISSING), 1 - clouds / np.float32(100), 0)
+            dark = sky > 0
+            dark_count = dark.sum(axis=1)
+            
+            scores = tuple(np.full(len(self.pair_cell), np.nan, dtype=np.float32) for _ in range(3))
+            scores[0][pairs] = np.einsum('ij,ij->i', quality, sky)
+            scores[1][pairs] = dark_count
+            scores[2][pairs] = np.where(dark, clouds, 0).sum(axis=1) / np.maximum(dark_count, 1)
+            self.scores[hours] = (key, scores)
+        return self.scores[hours][1]
+    
+    @timed('forecast_rank')
+    def rank(self, df, hours, allowed=None, limit=None):
+        """Standorte von df nach erwarteten klaren, dunklen und mondfreien Stunden der nächsten hours Stunden
+        
+        Nur Standorte mit Vorhersage; allowed: optionale boolesche Maske über die Zeilen von df.
+        """
+        with self.lock:
+            self._advance()
+            pair_hours, pair_dark, pair_clouds = self._pair_scores(min(hours, self.hours))
+        
+        rows = self.index.get_indexer(df.index)
+        pairs = self.site_pair[np.maximum(rows, 0)]
+        keep = (rows >= 0) & ~np.isnan(pair_hours[pairs])
+        if allowed is not None:
+            keep &= allowed
+        positions = np.flatnonzero(keep)
+        pairs = pairs[positions]
+        
+        quality_score = df['Qualitätsscore'].to_numpy(dtype=float)[positions]
+        ranking = np.lexsort((-quality_score, -pair_hours[pairs]))[:limit]
+        return df.take(positions[ranking]).assign(
+            Beobachtungsstunden=np.round(pair_hours[pairs[ranking]], 1),
+            Dunkelstunden_Vorhersage=pair_dark[pairs[ranking]].astype(np.int16),
+            Bewölkung_Nacht=np.round(pair_clouds[pairs[ranking]]).astype(np.int16)
+        )
+
+@functools.lru_cache(maxsize=None)
+def get_forecast_cache(api_key=None):
+    """Ein Vorhersage-Cache pro Prozess: lokale Datei (FORECAST_FIXTURE) oder OpenWeather mit gemeinsamem Kontingent"""
+    if FORECAST_FIXTURE:
+        return ForecastCache(load_comprehensive_locations(), FixtureForecastProvider(FORECAST_FIXTURE))
+    provider = OpenWeatherForecastProvider(api_key)
+    return ForecastCache(load_comprehensive_locations(), provider, quota=get_api_quota(api_key))
+
+def calculate_quality_score(clear_nights, bortle, altitude, dark_hours=None):
+    """Berechne Qualitätsscore für Astrotourismus (0-100), auch für ganze Spalten
+    
+    dark_hours: mondfreie astronomische Dunkelheit pro Nacht (Stunden), optional
+    """
+    nights_score = np.minimum(clear_nights / 350 * 100, 100)
+    bortle_score = (4 - bortle) / 3 * 100  # Niedriger Bortle = besser
+    altitude_score = np.minimum(altitude / 4000 * 100, 100)
+    
+    if dark_hours is None:
+        # Gewichtung: 50% klare Nächte, 30% Bortle, 20% Höhe
+        total_score = (nights_score * 0.5 + bortle_score * 0.3 + altitude_score * 0.2)
+    else:
+        # Gewichtung: 40% klare Nächte, 25% Bortle, 15% Höhe, 20% mondfreie Dunkelheit
+        darkness_score = np.clip(dark_hours / DARKNESS_REFERENCE_HOURS * 100, 0, 100)
+        total_score = (nights_score * 0.4 + bortle_score * 0.25 + altitude_score * 0.15 + darkness_score * 0.2)
+    return np.round(total_score, 1)
+
+
+def main(argv=None):
+    """Kommandozeile: Katalog anreichern und als neuen Snapshot speichern"""
+    parser = argparse.ArgumentParser(
+        description="Reichert den Standort-Katalog mit NASA-Klimadaten an und schreibt einen "
+                    "versionierten Parquet-Snapshot, den die Streamlit-App beim Start lädt."
+    )
+    parser.add_argument('--catalog', default=CATALOG_PATH, help="Katalogdatei (CSV, Parquet oder Arrow/Feather)")
+    parser.add_argument('--workers', type=int, default=MAX_REQUESTS_IN_FLIGHT, help="Gleichzeitige API-Anfragen")
+    parser.add_argument('--keep', type=int, default=SNAPSHOT_KEEP, help="Aufbewahrte Snapshot-Versionen")
+    parser.add_argument('--list', action='store_true', help="Gespeicherte Snapshots anzeigen und beenden")
+    args = parser.parse_args(argv)
+    
+    store = get_climate_store()
+    if args.list:
+        info = store.snapshot_info()
+        for path in store.list_snapshots():
+            marker = '*' if info is not None and info['file'] == path.name else ' '
+            print(f"{marker} {path.name}  {path.stat().st_size / 2**20:.2f} MiB")
+        return 0
+    
+    try:
+        df = load_comprehensive_locations(args.catalog)
+    except (OSError, ValueError) as e:
+        print(f"Standort-Katalog konnte nicht geladen werden: {e}", file=sys.stderr)
+        return 2
+    
+    start = time.perf_counter()
+    last_report = [start]
+    
+    def report_progress(done, total, item):
+        if done == total or time.perf_counter() - last_report[0] >= 5:
+            last_report[0] = time.perf_counter()
+            print(f"NASA-Gitterzellen: {done}/{total}", file=sys.stderr)
+    
+    # Veraltete gespeicherte Antworten direkt neu laden: der Snapshot soll aktuell sein
+    warnings = []
+    table = enrich_locations(
+        df,
+        max_in_flight=args.workers,
+        revalidate=True,
+        progress_callback=report_progress,
+        warning_callback=warnings.append
+    )
+    if warnings:
+        print(f"⚠️ {len(warnings)} API-Warnungen, z. B. {warnings[0]}", file=sys.stderr)
+    
+    nasa_rows = int(table['Datenquelle'].astype(str).str.contains('NASA').sum())
+    if nasa_rows == 0:
+        print("Keine NASA-Daten erhalten, Snapshot nicht geschrieben", file=sys.stderr)
+        return 1
+    
+    info = store.save_locations(table, catalog_fingerprint(df), source='cli', keep=args.keep)
+    if info is None:
+        print(f"Snapshot konnte nicht in {store.snapshot_dir} geschrieben werden", file=sys.stderr)
+        return 1
+    
+    print(f"{info['file']}: {info['rows']} Standorte, {nasa_rows} mit NASA-Daten, {time.perf_counter() - start:.1f} s")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
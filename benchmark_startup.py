@@ -0,0 +1,105 @@
+"""
+Startzeit-Benchmark: kalter Import und erstes Rendern der App
+
+Jede Messung läuft in einem frischen Python-Prozess (wie ein neu gestartetes
+Replikat); die Oberfläche wird mit Streamlits AppTest ohne Browser gerendert.
+
+    python benchmark_startup.py --runs 5
+    python benchmark_startup.py --view "⚙️ Daten-Management"
+    ASTRO_STORE_DIR=/srv/astro/.astro_store python benchmark_startup.py   # mit Snapshot vom CLI
+
+Ohne Snapshot im Speicherverzeichnis zeigt der erste Lauf geografische
+Schätzungen und startet die NASA-Abfragen im Hintergrund (echte API-Zugriffe).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+APP_PATH = Path(__file__).resolve().parent / 'Astro.py'
+RENDER_TIMEOUT = 120  # Sekunden für den ersten Lauf
+
+
+def measure_imports():
+    """Importzeiten in einem frischen Prozess (Sekunden, kumulativ in dieser Reihenfolge)"""
+    timings = {}
+    for module in ['numpy', 'pandas', 'astro_core', 'streamlit', 'plotly.express']:
+        start = time.perf_counter()
+        __import__(module)
+        timings[f"import {module}"] = time.perf_counter() - start
+    return timings
+
+
+def measure_render(view):
+    """Erster und zweiter Lauf von Astro.py in einem frischen Prozess"""
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    timings = {'import streamlit.testing': time.perf_counter() - start}
+
+    at = AppTest.from_file(str(APP_PATH), default_timeout=RENDER_TIMEOUT)
+    if view:
+        at.session_state['active_view'] = view
+
+    start = time.perf_counter()
+    at.run()
+    timings['erster Lauf'] = time.perf_counter() - start
+    plotly_loaded = 'plotly.express' in sys.modules
+
+    start = time.perf_counter()
+    at.run()
+    timings['zweiter Lauf'] = time.perf_counter() - start
+
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return timings, plotly_loaded
+
+
+def run_child(kind, view):
+    """Messung in einem neuen Interpreter ausführen, Ergebnis als JSON"""
+    command = [sys.executable, __file__, '--child', kind]
+    if view:
+        command += ['--view', view]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Misst kalten Import und erstes Rendern der Astrotourismus-App.")
+    parser.add_argument('--runs', type=int, default=3, help="Wiederholungen pro Messung (frischer Prozess)")
+    parser.add_argument('--view', help="Zuerst gerenderte Ansicht (Standard: Weltkarte)")
+    parser.add_argument('--child', choices=['imports', 'render'], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        sys.path.insert(0, str(APP_PATH.parent))
+        if args.child == 'imports':
+            result = {'timings': measure_imports()}
+        else:
+            timings, plotly_loaded = measure_render(args.view)
+            result = {'timings': timings, 'plotly_loaded': plotly_loaded}
+        print(json.dumps(result), flush=True)
+        os._exit(0)  # Hintergrund-Threads der App (Nachladen, Wetter) nicht abwarten
+
+    samples = {}
+    plotly_loaded = set()
+    for _ in range(args.runs):
+        for kind in ['imports', 'render']:
+            result = run_child(kind, args.view)
+            for name, seconds in result['timings'].items():
+                samples.setdefault(name, []).append(seconds)
+            if 'plotly_loaded' in result:
+                plotly_loaded.add(result['plotly_loaded'])
+
+    print(f"{'Messung':<28}{'Median':>10}{'Min':>10}{'Max':>10}")
+    for name, values in samples.items():
+        print(f"{name:<28}{statistics.median(values):>9.3f}s{min(values):>9.3f}s{max(values):>9.3f}s")
+    print(f"plotly.express beim ersten Lauf geladen: {'ja' if True in plotly_loaded else 'nein'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
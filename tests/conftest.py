@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# astro_core liegt im Wurzelverzeichnis des Repositorys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,86 @@
+"""Tageskontingent: mehrere Prozesse mit demselben Key teilen eine Zählung"""
+import pytest
+
+import astro_core
+from astro_core import ApiQuota
+
+
+@pytest.fixture
+def unpaced(monkeypatch):
+    """Ganzes Tageskontingent sofort verfügbar (unabhängig von der Uhrzeit des Testlaufs)"""
+    monkeypatch.setattr(astro_core, 'QUOTA_PACING_HEADROOM', 86400)
+
+
+def test_processes_share_the_daily_limit(tmp_path, unpaced):
+    path = tmp_path / 'quota.json'
+    first, second = ApiQuota(path, limit=10), ApiQuota(path, limit=10)
+
+    assert first.take(6) == 6
+    assert second.take(6) == 4
+    assert first.take(1) == 0
+    assert first.calls_today() == second.calls_today() == 10
+    assert ApiQuota(path, limit=10).calls_today() == 10
+
+
+def test_processes_share_consumer_counts(tmp_path, unpaced):
+    path = tmp_path / 'quota.json'
+    shares = {'live': 0.6, 'forecast': 0.4}
+    first, second = ApiQuota(path, limit=10, shares=shares), ApiQuota(path, limit=10, shares=shares)
+
+    assert first.take(5, 'live') == 5
+    assert second.take(5, 'live') == 1
+    assert second.take(5, 'forecast') == 4
+    assert first.consumer_calls() == {'live': 6, 'forecast': 4}
+
+
+MIDNIGHT = 20_000 * 86400  # Beliebiger Tag, 00:00 UTC
+
+
+@pytest.mark.parametrize('seconds, expected', [
+    (0, 100),               # Zu Tagesbeginn: eine Stunde Vorlauf
+    (6 * 3600, 700),
+    (12 * 3600, 1300),
+    (23 * 3600, 2400),      # Letzte Stunde: ganzes Limit
+    (23 * 3600 + 1800, 2400)
+])
+def test_pacing_over_the_utc_day(tmp_path, seconds, expected):
+    quota = ApiQuota(tmp_path / 'quota.json', limit=2400)
+    assert quota.available(now=MIDNIGHT + seconds) == expected
+
+
+def test_consumer_shares(tmp_path):
+    quota = ApiQuota(tmp_path / 'quota.json', limit=2400, shares={'live': 0.6, 'forecast': 0.4})
+    noon = MIDNIGHT + 12 * 3600
+
+    assert quota.available('live', now=noon) == int(2400 * 0.6 * 13 / 24)
+    assert quota.available('forecast', now=noon) == int(2400 * 0.4 * 13 / 24)
+    assert quota.available('live', now=MIDNIGHT + 23 * 3600) == 1440
+    assert quota.available('forecast', now=MIDNIGHT + 23 * 3600) == 960
+
+    # Verbrauch des einen Anteils schmälert den anderen nicht
+    quota.consumers, quota.calls = {'live': 1440}, 1440
+    assert quota.available('live', now=MIDNIGHT + 23 * 3600) == 0
+    assert quota.available('forecast', now=MIDNIGHT + 23 * 3600) == 960
+    # Verbraucher ohne Anteil teilen sich das Gesamtlimit
+    assert quota.available(now=MIDNIGHT + 23 * 3600) == 960
+
+
+def test_shares_never_exceed_the_remaining_limit(tmp_path):
+    quota = ApiQuota(tmp_path / 'quota.json', limit=100, shares={'live': 0.6, 'forecast': 0.4})
+    quota.calls = 95  # z. B. Abrufe ohne Verbraucher
+    assert quota.available('live', now=MIDNIGHT + 23 * 3600) == 5
+
+
+def test_day_rollover(tmp_path, unpaced):
+    path = tmp_path / 'quota.json'
+    path.write_text('{"day": "2000-01-01", "calls": 999, "consumers": {"live": 999}}')
+    quota = ApiQuota(path, limit=10, shares={'live': 0.6})
+    assert quota.calls_today() == 0
+    assert quota.take(3, 'live') == 3
+
+    # Tageswechsel im laufenden Prozess: Speicher und Datei stammen vom Vortag
+    quota.day = '2000-01-01'
+    path.write_text('{"day": "2000-01-01", "calls": 3, "consumers": {"live": 3}}')
+    assert quota.consumer_calls() == {}
+    assert quota.take(6, 'live') == 6
+    assert quota.calls_today() == 6
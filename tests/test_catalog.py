@@ -0,0 +1,117 @@
+"""Katalog: Einlesen und Prüfung (alle Fehler in einer Meldung)"""
+import pandas as pd
+import pytest
+
+from astro_core import load_comprehensive_locations, read_catalog_file, validate_catalog
+
+ROWS = {
+    'Name': ['Atacama-Wüste', 'Mauna Kea', 'Sossusvlei'],
+    'Land': ['Chile', 'USA', 'Namibia'],
+    'Latitude': [-24.6, 19.8, -24.7],
+    'Longitude': [-70.4, -155.5, 15.3],
+    'Höhe_m': [2400, 4200, 600],
+    'Bortle_Skala': [1, 2, 1],
+    'Klimazone': ['desert', 'tropical', 'desert']
+}
+
+
+def catalog(**changes):
+    return pd.DataFrame({**ROWS, **changes})
+
+
+def problems(df):
+    with pytest.raises(ValueError) as error:
+        validate_catalog(df, 'test.csv')
+    message = str(error.value)
+    assert message.startswith('test.csv ungültig: ')
+    return message
+
+
+def test_valid_catalog_passes():
+    validate_catalog(catalog())
+    validate_catalog(catalog().drop(columns='Klimazone'))
+    validate_catalog(catalog(Klimazone=[None, 'desert', None]))  # Optionale Spalte darf fehlen
+
+
+def test_missing_values():
+    message = problems(catalog(Land=['Chile', None, None], Latitude=[-24.6, float('nan'), -24.7]))
+    assert "2 fehlende/ungültige Werte in 'Land'" in message
+    assert "1 fehlende/ungültige Werte in 'Latitude'" in message
+
+
+@pytest.mark.parametrize('column, values, bounds', [
+    ('Latitude', [91.0, 19.8, -90.5], '[-90, 90]'),
+    ('Longitude', [-180.1, -155.5, 180.5], '[-180, 180]'),
+    ('Höhe_m', [9500, 4200, -600], '[-500, 9000]'),
+    ('Bortle_Skala', [0, 2, 10], '[1, 9]')
+])
+def test_values_out_of_range(column, values, bounds):
+    message = problems(catalog(**{column: values}))
+    assert f"2 Werte von '{column}' außerhalb {bounds}" in message
+    assert 'Mauna Kea' not in message.split('außerhalb')[1]
+
+
+def test_range_bounds_are_inclusive():
+    validate_catalog(catalog(Latitude=[-90.0, 90.0, 0.0], Longitude=[-180.0, 180.0, 0.0],
+                             Höhe_m=[-500, 9000, 0], Bortle_Skala=[1, 9, 5]))
+
+
+def test_fractional_integer_columns():
+    message = problems(catalog(Bortle_Skala=[1, 2.5, 1], Höhe_m=[2400.0, 4200.0, 600.4]))
+    assert "1 nicht ganzzahlige Werte in 'Bortle_Skala' (Mauna Kea)" in message
+    assert "1 nicht ganzzahlige Werte in 'Höhe_m' (Sossusvlei)" in message
+
+
+def test_duplicate_names():
+    message = problems(catalog(Name=['Mauna Kea', 'Mauna Kea', 'Sossusvlei']))
+    assert 'doppelte Namen: Mauna Kea' in message
+
+
+def test_all_problems_in_one_error():
+    message = problems(catalog(
+        Name=['A', 'A', None], Latitude=[100.0, 0.0, 0.0], Bortle_Skala=[1, 12, 1]
+    ))
+    assert message.count('; ') == 3
+    for part in ["fehlende/ungültige Werte in 'Name'", "'Latitude' außerhalb", "'Bortle_Skala' außerhalb", 'doppelte Namen: A']:
+        assert part in message
+
+
+def test_read_csv_coerces_text_to_missing(tmp_path):
+    path = tmp_path / 'sites.csv'
+    catalog(Höhe_m=['2400', 'hoch', '600']).to_csv(path, index=False)
+    df = read_catalog_file(path)
+    assert df['Höhe_m'].isna().tolist() == [False, True, False]
+    with pytest.raises(ValueError, match="sites.csv ungültig: 1 fehlende/ungültige Werte in 'Höhe_m'"):
+        load_comprehensive_locations(str(path))
+
+
+def test_read_rejects_missing_columns(tmp_path):
+    path = tmp_path / 'sites.csv'
+    catalog().drop(columns=['Latitude', 'Bortle_Skala']).to_csv(path, index=False)
+    with pytest.raises(ValueError, match='fehlende Spalten Latitude, Bortle_Skala'):
+        read_catalog_file(path)
+
+
+def test_read_rejects_unknown_formats(tmp_path):
+    path = tmp_path / 'sites.xlsx'
+    path.write_bytes(b'')
+    with pytest.raises(ValueError, match='Nicht unterstütztes Katalogformat: .xlsx'):
+        read_catalog_file(path)
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.parquet', '.feather'])
+def test_load_from_each_format(tmp_path, suffix):
+    path = tmp_path / f'sites{suffix}'
+    df = catalog().drop(columns='Klimazone') if suffix == '.feather' else catalog()
+    if suffix == '.csv':
+        df.to_csv(path, index=False)
+    elif suffix == '.parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_feather(path)
+
+    result = load_comprehensive_locations(str(path))
+    assert result['Name'].tolist() == ROWS['Name']
+    assert result['Bortle_Skala'].dtype == 'int8'
+    assert result['Höhe_m'].dtype == 'int16'
+    assert result['Kontinent'].tolist() == ['Südamerika', 'Nordamerika', 'Afrika']
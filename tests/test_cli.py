@@ -0,0 +1,86 @@
+"""Kommandozeile main(): Exit-Codes und geschriebener Snapshot (ohne Netzwerk)"""
+import numpy as np
+import pytest
+
+import astro_core
+from astro_core import ClimateStore, catalog_fingerprint, empty_climate_table, load_comprehensive_locations, main
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ClimateStore(tmp_path / 'store')
+    monkeypatch.setattr(astro_core, 'get_climate_store', lambda: store)
+    return store
+
+
+@pytest.fixture
+def fetch(monkeypatch):
+    """Klimaabruf ohne Netzwerk; nasa: ob die Gitterzellen NASA-Daten liefern"""
+    state = {'nasa': True, 'calls': []}
+
+    def fetch_climate_table(df, **kwargs):
+        state['calls'].append(kwargs)
+        climate = empty_climate_table(df.index)
+        if state['nasa']:
+            climate['nasa_success'] = np.arange(len(df)) % 2 == 0
+            climate.loc[climate['nasa_success'], ['clear_nights', 'humidity', 'temperature', 'wind_speed']] = [250, 30.0, 12.0, 3.0]
+        kwargs['warning_callback']('NASA POWER: Zeitüberschreitung')
+        return climate
+
+    monkeypatch.setattr(astro_core, 'fetch_climate_table', fetch_climate_table)
+    return state
+
+
+def test_success_writes_a_cli_snapshot(store, fetch, capsys):
+    assert main(['--workers', '3']) == 0
+
+    info = store.snapshot_info()
+    catalog = load_comprehensive_locations()
+    assert info['source'] == 'cli'
+    assert info['catalog'] == catalog_fingerprint(catalog)
+    assert info['rows'] == len(catalog)
+    assert info['nasa_rows'] == (len(catalog) + 1) // 2
+    assert fetch['calls'][0]['max_in_flight'] == 3
+    assert fetch['calls'][0]['revalidate'] is True
+
+    out, err = capsys.readouterr()
+    assert out.startswith(info['file'])
+    assert '1 API-Warnungen' in err
+
+
+def test_list_shows_snapshots(store, fetch, capsys):
+    assert main(['--list']) == 0
+    assert capsys.readouterr().out == ''
+
+    assert main([]) == 0
+    capsys.readouterr()
+    assert main(['--list']) == 0
+    assert capsys.readouterr().out.startswith(f"* {store.snapshot_info()['file']}")
+    assert len(fetch['calls']) == 1
+
+
+def test_bad_catalog_exits_with_2(store, fetch, tmp_path, capsys):
+    missing = tmp_path / 'fehlt.csv'
+    assert main(['--catalog', str(missing)]) == 2
+
+    invalid = tmp_path / 'kaputt.csv'
+    invalid.write_text('Name,Land,Latitude,Longitude,Höhe_m,Bortle_Skala\nA,Chile,95,0,100,1\n')
+    assert main(['--catalog', str(invalid)]) == 2
+    assert "kaputt.csv ungültig" in capsys.readouterr().err
+
+    assert main(['--catalog', str(tmp_path / 'welt.xlsx')]) == 2
+    assert fetch['calls'] == []
+    assert store.snapshot_info() is None
+
+
+def test_no_nasa_data_exits_with_1(store, fetch, capsys):
+    fetch['nasa'] = False
+    assert main([]) == 1
+    assert 'Keine NASA-Daten' in capsys.readouterr().err
+    assert store.snapshot_info() is None
+
+
+def test_failed_save_exits_with_1(store, fetch, monkeypatch, capsys):
+    monkeypatch.setattr(store, 'save_locations', lambda *args, **kwargs: None)
+    assert main([]) == 1
+    assert 'konnte nicht' in capsys.readouterr().err
@@ -0,0 +1,79 @@
+"""Mehrere Prozesse (App und CLI) teilen die Antwortdatei des ClimateStore"""
+import time
+
+from astro_core import NASA_PARAMETERS, ClimateStore
+
+
+def payload(value):
+    return {'properties': {'parameter': {'T2M': {'JAN': value}}}}
+
+
+def stored(directory):
+    """Inhalt der Datei aus Sicht eines frisch gestarteten Prozesses"""
+    return ClimateStore(directory).responses
+
+
+def test_flush_keeps_entries_of_other_writers(tmp_path):
+    app, cli = ClimateStore(tmp_path), ClimateStore(tmp_path)
+
+    cli.put_response(10, 20, NASA_PARAMETERS, payload(1))
+    cli.flush()
+    app.put_response(30, 40, NASA_PARAMETERS, payload(2))
+    app.flush()
+
+    responses = stored(tmp_path)
+    assert responses[ClimateStore.make_key(10, 20, NASA_PARAMETERS)][0] == payload(1)
+    assert responses[ClimateStore.make_key(30, 40, NASA_PARAMETERS)][0] == payload(2)
+    # Der Schreiber übernimmt beim Einmischen auch die fremden Einträge
+    assert ClimateStore.make_key(10, 20, NASA_PARAMETERS) in app.responses
+
+
+def test_newest_fetch_wins(tmp_path):
+    app, cli = ClimateStore(tmp_path), ClimateStore(tmp_path)
+
+    app.put_response(10, 20, NASA_PARAMETERS, payload('alt'))
+    time.sleep(0.01)
+    cli.put_response(10, 20, NASA_PARAMETERS, payload('neu'))
+    cli.flush()
+    app.flush()
+
+    key = ClimateStore.make_key(10, 20, NASA_PARAMETERS)
+    assert stored(tmp_path)[key][0] == payload('neu')
+    assert app.responses[key][0] == payload('neu')
+
+
+def test_invalidate_keeps_entries_of_other_writers(tmp_path):
+    app, cli = ClimateStore(tmp_path), ClimateStore(tmp_path)
+    app.put_response(10, 20, NASA_PARAMETERS, payload(1))
+    app.flush()
+    cli.put_response(30, 40, NASA_PARAMETERS, payload(2))
+    cli.flush()
+
+    app.invalidate()
+
+    responses = stored(tmp_path)
+    assert set(responses) == {
+        ClimateStore.make_key(10, 20, NASA_PARAMETERS),
+        ClimateStore.make_key(30, 40, NASA_PARAMETERS)
+    }
+    assert all(fetched_at == 0.0 for _, fetched_at in responses.values())
+
+    # Der andere Prozess übernimmt die Invalidierung beim Neuladen und schreibt sie nicht zurück
+    assert cli.reload_if_changed()
+    assert cli.get_response(30, 40, NASA_PARAMETERS) == (payload(2), True)
+    cli.put_response(50, 60, NASA_PARAMETERS, payload(3))
+    cli.flush()
+    assert stored(tmp_path)[ClimateStore.make_key(30, 40, NASA_PARAMETERS)][1] == 0.0
+
+
+def test_reload_if_changed_ignores_own_writes(tmp_path):
+    app, cli = ClimateStore(tmp_path), ClimateStore(tmp_path)
+    app.put_response(10, 20, NASA_PARAMETERS, payload(1))
+    app.flush()
+    assert not app.reload_if_changed()
+
+    cli.put_response(30, 40, NASA_PARAMETERS, payload(2))
+    cli.flush()
+    assert app.reload_if_changed()
+    assert app.get_response(30, 40, NASA_PARAMETERS) == (payload(2), False)
+    assert not app.reload_if_changed()
@@ -0,0 +1,61 @@
+"""LocationDataService: abgebrochene Anreicherungen werden nicht als vollständige Tabelle übernommen"""
+import pytest
+
+import astro_core
+from astro_core import ClimateStore, LocationDataService, empty_climate_table, load_comprehensive_locations
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ClimateStore(tmp_path)
+    monkeypatch.setattr(astro_core, 'get_climate_store', lambda: store)
+    return store
+
+
+@pytest.fixture
+def fetch(monkeypatch):
+    """Klimaabruf ohne Netzwerk; fail_after: Zahl der Blöcke bis zum Abbruch (None: nie)"""
+    state = {'fail_after': None, 'chunks': 0}
+
+    def fetch_climate_table(chunk, **kwargs):
+        if state['fail_after'] is not None and state['chunks'] >= state['fail_after']:
+            raise RuntimeError('NASA nicht erreichbar')
+        state['chunks'] += 1
+        return empty_climate_table(chunk.index)
+
+    monkeypatch.setattr(astro_core, 'fetch_climate_table', fetch_climate_table)
+    return state
+
+
+def wait(service):
+    loader = service.loader
+    if loader is not None:
+        loader.thread.join(timeout=30)
+
+
+def test_failed_first_run_serves_estimates_without_snapshot(store, fetch):
+    fetch['fail_after'] = 1
+    service = LocationDataService(load_comprehensive_locations())
+    wait(service)
+
+    assert service.loader is None
+    assert not service.is_partial()
+    assert len(service.table) == len(service.base_df)
+    assert store.snapshot_info() is None
+    assert any('abgebrochen nach 16/' in warning for warning in service.warnings)
+
+
+def test_failed_refresh_keeps_the_previous_table(store, fetch):
+    service = LocationDataService(load_comprehensive_locations())
+    wait(service)
+    table, version = service.table, service.version
+    assert service.warnings == []
+
+    fetch['fail_after'] = fetch['chunks'] + 2
+    service.refresh(revalidate=True)
+    wait(service)
+
+    assert service.table is table
+    assert service.version == version
+    assert service.loader is None
+    assert any('NASA nicht erreichbar' in warning for warning in service.warnings)
@@ -0,0 +1,58 @@
+"""Array-Schätzung muss exakt der Skalar-Version entsprechen"""
+import itertools
+
+import numpy as np
+import pytest
+
+from astro_core import MultiSourceWeatherAPI
+
+ZONES = ['desert', 'polar', 'mediterranean', 'continental', 'oceanic', 'tropical', 'unbekannt', None, np.nan]
+
+
+def scalar_estimates(lat, lon, altitude, zones):
+    return np.array([
+        MultiSourceWeatherAPI.get_enhanced_geographic_estimation(la, lo, al, zone)
+        for la, lo, al, zone in zip(lat.tolist(), lon.tolist(), altitude.tolist(), zones)
+    ])
+
+
+def assert_matches(lat, lon, altitude, zones):
+    lat, lon, altitude = (np.asarray(values, dtype=float) for values in (lat, lon, altitude))
+    zone_array = np.empty(len(zones), dtype=object)
+    zone_array[:] = zones
+    expected = scalar_estimates(lat, lon, altitude, zones)
+    actual = MultiSourceWeatherAPI.get_enhanced_geographic_estimation_array(lat, lon, altitude, zone_array)
+    mismatches = np.flatnonzero(actual != expected)
+    assert len(mismatches) == 0, [
+        (lat[i], lon[i], altitude[i], zones[i], actual[i], expected[i]) for i in mismatches[:5]
+    ]
+
+
+def test_random_points():
+    rng = np.random.default_rng(42)
+    n = 50_000
+    lat = rng.uniform(-90, 90, n)
+    lon = rng.uniform(-180, 180, n)
+    altitude = rng.uniform(-100, 5500, n)
+    zones = [ZONES[i] for i in rng.integers(0, len(ZONES), n)]
+    assert_matches(lat, lon, altitude, zones)
+
+
+def test_threshold_edges():
+    # Grenzen der Breitenbänder, Höhenstufen, Kontinentalität sowie Monsun- und Westküsten-Boxen
+    lats = [-66.5, -50, -40, -35, -30, -23.5, -20, -15, 0, 10, 15, 20, 23.5, 30, 35, 40, 50, 66.5]
+    lons = [-130, -110, -80, -60, -20, 0, 10, 60, 70, 90, 100, 140, 180]
+    altitudes = [200, 500, 1000, 2000, 3000, 4000]
+    points = list(itertools.product(lats, lons, altitudes, [None, 'unbekannt', np.nan, 'desert']))
+    lat, lon, altitude, zones = zip(*points)
+    assert_matches(lat, lon, altitude, list(zones))
+
+
+@pytest.mark.parametrize('zone', ZONES)
+def test_scalar_zone_broadcast(zone):
+    lat = np.array([-45.0, 0.0, 28.0, 60.0])
+    lon = np.array([-120.0, 95.0, 75.0, 0.0])
+    altitude = np.array([100.0, 600.0, 2500.0, 4100.0])
+    expected = scalar_estimates(lat, lon, altitude, [zone] * len(lat))
+    actual = MultiSourceWeatherAPI.get_enhanced_geographic_estimation_array(lat, lon, altitude, zone)
+    np.testing.assert_array_equal(actual, expected)
@@ -0,0 +1,107 @@
+"""write_export: Rundreise über CSV, JSON, Parquet und XLSX, blockweise und leer"""
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from astro_core import empty_climate_table, enrich_columns, json_ready, load_comprehensive_locations, write_export
+
+FORMATS = ['csv', 'json', 'parquet', 'xlsx']
+
+
+@pytest.fixture(scope='module')
+def table():
+    df = load_comprehensive_locations().iloc[:57]
+    return enrich_columns(df, empty_climate_table(df.index)).reset_index(drop=True)
+
+
+def export(df, file_format, chunk_rows):
+    target = io.BytesIO()
+    write_export(df, file_format, target, chunk_rows=chunk_rows)
+    return target.getvalue()
+
+
+def read_back(data, file_format):
+    if file_format == 'csv':
+        return pd.read_csv(io.BytesIO(data))
+    if file_format == 'json':
+        return pd.DataFrame(json.loads(data.decode('utf-8')))
+    if file_format == 'parquet':
+        return pd.read_parquet(io.BytesIO(data))
+    return pd.read_excel(io.BytesIO(data), sheet_name='Standorte')
+
+
+def comparable(df):
+    """Gemeinsame Form aller Formate: Texte als str, Zahlen als float64 mit einer Nachkommastelle"""
+    df = json_ready(df)
+    result = {}
+    for column in df.columns:
+        values = df[column]
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            result[column] = values.astype('float64').round(1).to_numpy()
+        else:
+            result[column] = values.astype(str).to_numpy()
+    return pd.DataFrame(result)
+
+
+@pytest.mark.parametrize('file_format', FORMATS)
+@pytest.mark.parametrize('chunk_rows', [7, 20_000])
+def test_round_trip(table, file_format, chunk_rows):
+    result = read_back(export(table, file_format, chunk_rows), file_format)
+
+    assert list(result.columns) == list(table.columns)
+    assert len(result) == len(table)
+    pd.testing.assert_frame_equal(comparable(result), comparable(table))
+
+
+@pytest.mark.parametrize('file_format', FORMATS)
+def test_chunking_does_not_change_the_file(table, file_format):
+    if file_format == 'parquet':
+        # Row Groups unterscheiden sich, der Inhalt nicht
+        small, large = (pd.read_parquet(io.BytesIO(export(table, 'parquet', rows))) for rows in (7, 20_000))
+        pd.testing.assert_frame_equal(small, large)
+    elif file_format == 'xlsx':
+        small, large = (read_back(export(table, 'xlsx', rows), 'xlsx') for rows in (7, 20_000))
+        pd.testing.assert_frame_equal(small, large)
+    else:
+        assert export(table, file_format, 7) == export(table, file_format, 20_000)
+
+
+def test_json_matches_pandas_records(table):
+    expected = json.loads(json_ready(table).to_json(orient='records', force_ascii=False))
+    assert json.loads(export(table, 'json', 7).decode('utf-8')) == expected
+
+
+@pytest.mark.parametrize('file_format', ['csv', 'parquet', 'xlsx'])
+def test_empty_table_keeps_the_columns(table, file_format):
+    result = read_back(export(table.iloc[:0], file_format, 7), file_format)
+    assert list(result.columns) == list(table.columns)
+    assert len(result) == 0
+
+
+def test_empty_table_is_an_empty_json_array(table):
+    # Ein Array von Datensätzen hat ohne Zeilen keine Spalten (wie pandas' orient='records')
+    data = export(table.iloc[:0], 'json', 7)
+    assert json.loads(data.decode('utf-8')) == []
+
+
+def test_empty_parquet_keeps_the_dtypes(table):
+    result = pd.read_parquet(io.BytesIO(export(table.iloc[:0], 'parquet', 7)))
+    expected = pd.read_parquet(io.BytesIO(export(table, 'parquet', 7)))
+    # Kategorien ohne Werte, aber derselbe Spaltentyp
+    assert result.dtypes.astype(str).tolist() == expected.dtypes.astype(str).tolist()
+
+
+def test_missing_values_survive(table):
+    df = table.iloc[:3].copy()
+    df['Luftfeuchtigkeit_%'] = np.array([np.nan, 50.0, np.nan], dtype=np.float32)
+    for file_format in FORMATS:
+        result = read_back(export(df, file_format, 2), file_format)
+        assert result['Luftfeuchtigkeit_%'].isna().tolist() == [True, False, True], file_format
+
+
+def test_unknown_format(table):
+    with pytest.raises(ValueError, match='Unbekanntes Exportformat'):
+        write_export(table, 'xml', io.BytesIO())
@@ -0,0 +1,102 @@
+"""FilterEngine muss dieselben Zeilen liefern wie boolesche pandas-Masken"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from astro_core import FILTER_CATEGORICAL_COLUMNS, FILTER_RANGE_COLUMNS, FilterEngine
+
+COUNTRIES = ['Chile', 'USA', 'Namibia', 'Spanien', 'Australien', 'Mongolei']
+TYPES = ['Observatorium', 'Wüste', 'Dark Sky Reserve', 'Hochgebirge', 'Insel', 'Naturgebiet']
+SOURCES = ['NASA POWER', 'Enhanced Geographic', 'OpenWeather + Geographic']
+
+
+@pytest.fixture(scope='module')
+def table():
+    rng = np.random.default_rng(7)
+    n = 5000
+    country = rng.choice(COUNTRIES, n)
+    return pd.DataFrame({
+        'Land': pd.Categorical(country),
+        'Kontinent': pd.Categorical(np.where(np.isin(country, ['Chile']), 'Südamerika', 'Andere')),
+        'Typ': pd.Categorical(rng.choice(TYPES, n)),
+        'Datenquelle': pd.Categorical(rng.choice(SOURCES, n)),
+        'Bortle_Skala': rng.integers(1, 5, n).astype(np.int8),
+        # Gerundet: viele gleiche Werte prüfen die Grenzen der Bereichsfilter
+        'Qualitätsscore': np.round(rng.uniform(20, 100, n), 1).astype(np.float32),
+        'Klare_Nächte_Jahr': rng.integers(50, 330, n).astype(np.int16)
+    }, index=pd.RangeIndex(100, 100 + n))
+
+
+def pandas_mask(df, ranges, values):
+    mask = np.ones(len(df), dtype=bool)
+    for column, minimum, maximum in ranges:
+        if minimum is not None:
+            mask &= (df[column] >= minimum).to_numpy()
+        if maximum is not None:
+            mask &= (df[column] <= maximum).to_numpy()
+    for column, selected in values:
+        if selected is not None:
+            mask &= df[column].isin(list(selected)).to_numpy()
+    return mask
+
+
+def random_filters(rng, df):
+    ranges = []
+    for column in FILTER_RANGE_COLUMNS:
+        values = df[column].to_numpy()
+        # Schwellen auf vorhandenen Werten, dazu offene und leere Bereiche
+        minimum = rng.choice([None, values[rng.integers(len(values))], values.min() - 1])
+        maximum = rng.choice([None, values[rng.integers(len(values))], values.max() + 1])
+        ranges.append((column, minimum, maximum))
+
+    values = []
+    for column, options in (('Land', COUNTRIES), ('Typ', TYPES), ('Datenquelle', SOURCES), ('Bortle_Skala', [1, 2, 3, 4])):
+        kind = rng.integers(4)
+        if kind == 0:
+            selected = None
+        elif kind == 1:
+            selected = []
+        else:
+            selected = list(rng.choice(options, rng.integers(1, len(options) + 1), replace=False))
+        values.append((column, selected))
+    return ranges, values
+
+
+def test_random_filter_combinations(table):
+    engine = FilterEngine(table, FILTER_CATEGORICAL_COLUMNS, FILTER_RANGE_COLUMNS)
+    rng = np.random.default_rng(11)
+    for _ in range(300):
+        ranges, values = random_filters(rng, table)
+        expected = np.flatnonzero(pandas_mask(table, ranges, values))
+        np.testing.assert_array_equal(engine.indices(ranges, values), expected, err_msg=str((ranges, values)))
+
+
+def test_slider_drag_reuses_cached_masks(table):
+    # Schrittweise Schwellen treffen die Wiederverwendung benachbarter Masken
+    engine = FilterEngine(table, FILTER_CATEGORICAL_COLUMNS, FILTER_RANGE_COLUMNS)
+    thresholds = list(np.arange(20, 100, 2.5)) + list(np.arange(100, 20, -3.7)) + [55.0, 55.1, 54.9]
+    for minimum in thresholds:
+        ranges = (('Qualitätsscore', minimum, None), ('Klare_Nächte_Jahr', 120, 300))
+        expected = np.flatnonzero(pandas_mask(table, ranges, ()))
+        np.testing.assert_array_equal(engine.indices(ranges), expected, err_msg=str(minimum))
+
+
+def test_filter_returns_the_masked_frame(table):
+    engine = FilterEngine(table, FILTER_CATEGORICAL_COLUMNS, FILTER_RANGE_COLUMNS)
+    ranges = (('Qualitätsscore', 60.0, None),)
+    values = (('Land', ['Chile', 'Namibia']), ('Typ', None))
+    expected = table[pandas_mask(table, ranges, values)]
+
+    result = engine.filter(ranges, values)
+    pd.testing.assert_frame_equal(result, expected)
+    assert engine.filter(ranges, values) is result  # Gleiches Tupel: zwischengespeicherte Tabelle
+
+
+def test_counts_and_value_range(table):
+    engine = FilterEngine(table, FILTER_CATEGORICAL_COLUMNS, FILTER_RANGE_COLUMNS)
+    for column in FILTER_CATEGORICAL_COLUMNS:
+        expected = table[column].value_counts()
+        for value, count in expected.items():
+            assert engine.count(column, value) == count
+    assert engine.count('Land', 'Atlantis') == 0
+    assert engine.value_range('Klare_Nächte_Jahr') == (table['Klare_Nächte_Jahr'].min(), table['Klare_Nächte_Jahr'].max())
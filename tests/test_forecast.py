@@ -0,0 +1,152 @@
+"""ForecastCache und FixtureForecastProvider (ohne Netzwerk)"""
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import astro_core
+from astro_core import FORECAST_MISSING, ApiQuota, FixtureForecastProvider, ForecastCache
+
+# a und b: gleicher Ephemeriden-Rasterpunkt, verschiedene Wetterzellen; c ohne Vorhersage
+SITES = pd.DataFrame({
+    'Name': ['a', 'b', 'c'],
+    'Latitude': [30.0, 30.2, -40.0],
+    'Longitude': [10.0, 10.1, 150.0],
+    'Qualitätsscore': [50.0, 90.0, 70.0]
+}, index=[10, 11, 12])
+
+
+def forecast_payload(start, clouds, step=3):
+    return {'list': [
+        {'dt': start + i * step * 3600, 'clouds': {'all': value}, 'main': {'humidity': 50}, 'wind': {'speed': 2.0}}
+        for i, value in enumerate(clouds)
+    ]}
+
+
+class StubProvider:
+    """Klarer Himmel in Zelle a, bedeckt in Zelle b, keine Vorhersage für c"""
+
+    def fetch(self, lat, lon):
+        if lat < 0:
+            return None
+        start = int(time.time()) // 3600 * 3600
+        clouds = [0 if lat < 30.1 else 100] * 40
+        return astro_core.parse_forecast(forecast_payload(start, clouds))
+
+
+def wait(cache):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        with cache.lock:
+            if not cache.running:
+                return
+        time.sleep(0.01)
+    raise TimeoutError('Durchlauf nicht beendet')
+
+
+def cell_of(cache, label):
+    return cache.site_cell[SITES.index.get_loc(label)]
+
+
+def test_store_resamples_to_hours():
+    cache = ForecastCache(SITES, StubProvider())
+    cell = cell_of(cache, 10)
+    with cache.lock:
+        start = cache.origin - 3600  # Erster Schritt vor der laufenden Stunde
+        cache._store(np.array([cell]), [astro_core.parse_forecast(forecast_payload(start, [10, 50, 120]))], time.time())
+
+    np.testing.assert_array_equal(cache.clouds[cell, :9], [10, 10, 50, 50, 50, 100, 100, 100, FORECAST_MISSING])
+    assert (cache.clouds[cell, 9:] == FORECAST_MISSING).all()
+    assert (cache.humidity[cell, :8] == 50).all()
+    assert np.isnan(cache.wind[cell, 8])
+    # Andere Zellen bleiben unberührt
+    assert (cache.clouds[cell_of(cache, 11)] == FORECAST_MISSING).all()
+
+
+def test_advance_shifts_instead_of_refetching():
+    cache = ForecastCache(SITES, StubProvider())
+    cell = cell_of(cache, 10)
+    cache.clouds[cell] = np.arange(cache.hours) % 100
+    current = cache.origin
+
+    with cache.lock:
+        cache.origin -= 2 * 3600
+        cache._advance()
+
+    assert cache.origin == current
+    np.testing.assert_array_equal(cache.clouds[cell, :cache.hours - 2], np.arange(2, cache.hours) % 100)
+    assert (cache.clouds[cell, cache.hours - 2:] == FORECAST_MISSING).all()
+
+    with cache.lock:
+        cache.origin -= 10 * cache.hours * 3600
+        cache._advance()
+    assert (cache.clouds == FORECAST_MISSING).all()
+
+
+def test_rank_prefers_clear_dark_hours():
+    cache = ForecastCache(SITES, StubProvider())
+    assert cache.request(list(SITES.index)) == 3
+    wait(cache)
+    assert cache.covered_sites() == 2
+
+    ranking = cache.rank(SITES, 72)
+    assert ranking.index.tolist() == [10, 11]  # Ohne Vorhersage (12) nicht gelistet
+    assert ranking.loc[10, 'Beobachtungsstunden'] > 0
+    assert ranking.loc[11, 'Beobachtungsstunden'] == 0
+    assert ranking.loc[11, 'Bewölkung_Nacht'] == 100
+    assert (ranking['Dunkelstunden_Vorhersage'] > 0).all()
+
+    assert cache.rank(SITES, 72, limit=1).index.tolist() == [10]
+    assert cache.rank(SITES, 72, allowed=np.array([False, True, True])).index.tolist() == [11]
+
+
+def test_forecast_books_its_own_share(tmp_path, monkeypatch):
+    monkeypatch.setattr(astro_core, 'QUOTA_PACING_HEADROOM', 86400)
+    quota = ApiQuota(tmp_path / 'quota.json', limit=5, shares={'live': 0.6, 'forecast': 0.4})
+    cache = ForecastCache(SITES, StubProvider(), quota=quota)
+
+    assert cache.request(list(SITES.index)) == 2
+    wait(cache)
+    assert quota.consumer_calls() == {'forecast': 2}
+
+
+@pytest.fixture
+def fixture_file(tmp_path):
+    path = tmp_path / 'forecast.json'
+    path.write_text(json.dumps({
+        '30,10': forecast_payload(1_000_000, [10, 20]),
+        'default': forecast_payload(2_000_000, [90])
+    }))
+    return path
+
+
+def test_fixture_looks_up_cells_and_default(fixture_file):
+    provider = FixtureForecastProvider(fixture_file)
+    hour = int(time.time()) // 3600 * 3600
+
+    times, clouds, humidity, wind = provider.fetch(30.0, 10.0)
+    np.testing.assert_array_equal(times, [hour, hour + 3 * 3600])  # Auf die laufende Stunde verschoben
+    np.testing.assert_array_equal(clouds, [10, 20])
+
+    _, clouds, _, _ = provider.fetch(-40.0, 150.0)
+    np.testing.assert_array_equal(clouds, [90])
+
+
+def test_fixture_without_default(tmp_path):
+    path = tmp_path / 'forecast.json'
+    path.write_text(json.dumps({'30.2,10.1': forecast_payload(0, [40])}))
+    provider = FixtureForecastProvider(path)
+
+    assert provider.fetch(30.2, 10.1)[1].tolist() == [40]
+    assert provider.fetch(30.0, 10.0) is None
+
+
+def test_fixture_single_forecast_for_all_cells(tmp_path):
+    path = tmp_path / 'forecast.json'
+    path.write_text(json.dumps(forecast_payload(0, [5, 6, 7])))
+    provider = FixtureForecastProvider(path)
+
+    assert provider.fetch(1.0, 2.0)[1].tolist() == [5, 6, 7]
+    assert provider.fetch(-50.0, -70.0)[1].tolist() == [5, 6, 7]
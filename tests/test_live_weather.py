@@ -0,0 +1,53 @@
+"""LiveWeather.overlay: Live-Beobachtungen über der angereicherten Tabelle"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from astro_core import LiveWeather
+
+SITES = pd.DataFrame({
+    'Latitude': [10.0, 20.0, 30.0],
+    'Longitude': [20.0, 30.0, 40.0],
+    'Datenquelle': pd.Categorical(['NASA POWER', 'Enhanced Geographic', 'Enhanced Geographic']),
+    'Status': pd.Categorical(['🛰️ NASA', '🌍 Erweiterte Schätzung', '🌍 Erweiterte Schätzung']),
+    'Aktuelle_Bedingungen': pd.Categorical(['Keine Live-Daten', 'Geschätzt', 'Geschätzt']),
+    'Luftfeuchtigkeit_%': np.array([40.0, 55.0, 60.0], dtype=np.float32),
+    'Temperatur_°C': np.array([12.0, 8.0, 5.0], dtype=np.float32)
+}, index=['nasa', 'geo', 'ohne'])
+
+
+def observed(live, label, clouds, humidity, temperature):
+    cell = live.site_cell[SITES.index.get_loc(label)]
+    live.observed_at[cell] = time.time()
+    live.clouds[cell], live.humidity[cell], live.temperature[cell] = clouds, humidity, temperature
+
+
+def test_without_observations_the_table_is_unchanged():
+    live = LiveWeather(SITES, 'key')
+    assert live.overlay(SITES) is SITES
+
+
+def test_overlay_fills_live_values_for_sites_without_nasa():
+    live = LiveWeather(SITES, 'key')
+    observed(live, 'nasa', 20, 80.0, 3.14)
+    observed(live, 'geo', 35, 71.26, 17.04)
+
+    result = live.overlay(SITES)
+
+    assert result['Status'].tolist() == ['🛰️ NASA + 🌤️ Live', '🌤️ Live + 🌍 Geo', '🌍 Erweiterte Schätzung']
+    assert result['Aktuelle_Bedingungen'].tolist() == ['Live: 20% Bewölkung', 'Live: 35% Bewölkung', 'Geschätzt']
+    assert result['Datenquelle'].tolist() == ['NASA POWER', 'OpenWeather + Geographic', 'Enhanced Geographic']
+    # NASA-Klimatologie bleibt, die Schätzung wird durch Live-Werte ersetzt
+    np.testing.assert_allclose(result['Luftfeuchtigkeit_%'], [40.0, 71.3, 60.0], rtol=1e-6)
+    np.testing.assert_allclose(result['Temperatur_°C'], [12.0, 17.0, 5.0], rtol=1e-6)
+    assert result['Temperatur_°C'].dtype == np.float32
+    # Die geteilte Tabelle selbst bleibt unverändert
+    assert SITES['Datenquelle'].tolist() == ['NASA POWER', 'Enhanced Geographic', 'Enhanced Geographic']
+
+
+def test_stale_observations_are_not_shown():
+    live = LiveWeather(SITES, 'key')
+    observed(live, 'geo', 35, 70.0, 17.0)
+    live.observed_at[:] -= 7 * 3600
+    assert live.overlay(SITES) is SITES
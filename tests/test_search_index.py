@@ -0,0 +1,101 @@
+"""SearchIndex: Aliase, Umlaute, Präfixe, Wortteile und Tippfehler"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from astro_core import SearchIndex, load_comprehensive_locations, search_tokens
+
+SITES = pd.DataFrame({
+    'Name': ['Sternwarte Sonneberg', 'Paranal Observatory', 'Atacama-Wüste', 'Namib Desert Lodge',
+             'Müritz-Nationalpark', 'Schwarzwald Hochfirst', 'Bodensee Ufer', 'Lake Tekapo', 'Königssee'],
+    'Land': ['Deutschland', 'Chile', 'Chile', 'Namibia', 'Deutschland', 'Deutschland', 'Deutschland',
+             'Neuseeland', 'Deutschland'],
+    'Typ': pd.Categorical(['Observatorium', 'Observatorium', 'Wüste', 'Wüste', 'Naturgebiet',
+                           'Hochgebirge', 'Naturgebiet', 'Dark Sky Reserve', 'Naturgebiet']),
+    'Qualitätsscore': [60.0, 95.0, 92.0, 88.0, 70.0, 65.0, 40.0, 85.0, 55.0]
+}, index=[f's{i}' for i in range(9)])
+
+
+@pytest.fixture(scope='module')
+def index():
+    return SearchIndex(SITES)
+
+
+def names(result):
+    return set(result['Name'])
+
+
+def test_aliases_match_across_languages(index):
+    observatories = {'Sternwarte Sonneberg', 'Paranal Observatory'}
+    for query in ['Sternwarte', 'observatory', 'Observatorium', 'observatoire']:
+        assert names(index.search(query, columns=['Name'])) == observatories, query
+
+    deserts = {'Atacama-Wüste', 'Namib Desert Lodge'}
+    for query in ['Wüste', 'wueste', 'desert', 'desierto']:
+        assert names(index.search(query, columns=['Name'])) == deserts, query
+
+
+def test_umlauts_and_sharp_s_fold(index):
+    assert names(index.search('Muritz')) == {'Müritz-Nationalpark'}
+    assert names(index.search('Mueritz')) == {'Müritz-Nationalpark'}
+    assert names(index.search('KÖNIGSSEE')) == {'Königssee'}
+    assert search_tokens('Große Straße') == ['grosse', 'strasse']
+
+
+def test_prefix_matches_rank_below_exact(index):
+    result = index.search('Deutsch', columns=['Land'])
+    assert len(result) == 5
+    assert (result['Relevanz'] == 2.0).all()
+    # Gleiche Relevanz: nach Qualitätsscore absteigend
+    assert result['Qualitätsscore'].is_monotonic_decreasing
+
+    assert index.search('chile', columns=['Land'])['Relevanz'].tolist() == [3.0, 3.0]
+
+
+def test_infix_finds_parts_of_compound_words(index):
+    assert names(index.search('park', columns=['Name'])) == {'Müritz-Nationalpark'}
+    assert names(index.search('wald', columns=['Name'])) == {'Schwarzwald Hochfirst'}
+    # "see": Alias von "lake" (exakt) und Wortteil von Bodensee/Königssee
+    result = index.search('see', columns=['Name'])
+    assert names(result) == {'Bodensee Ufer', 'Königssee', 'Lake Tekapo'}
+    assert result.iloc[0]['Name'] == 'Lake Tekapo'
+    assert set(result['Relevanz'].iloc[1:]) == {1.5}
+
+
+def test_fuzzy_matches_typos(index):
+    assert 'Paranal Observatory' in names(index.search('Paranl'))
+    assert 'Atacama-Wüste' in names(index.search('Atakama'))
+    assert 'Namib Desert Lodge' in names(index.search('Nambia'))
+    assert index.search('Paranl').iloc[0]['Relevanz'] < 1.0
+    assert index.search('xyzzy').empty
+
+
+def test_all_words_must_match(index):
+    assert names(index.search('Observatorium Chile')) == {'Paranal Observatory'}
+    assert names(index.search('Deutschland Naturgebiet')) == {'Müritz-Nationalpark', 'Bodensee Ufer', 'Königssee'}
+    assert index.search('Chile Naturgebiet').empty
+
+
+def test_allowed_limit_and_empty_query(index):
+    allowed = np.array([name != 'Paranal Observatory' for name in SITES['Name']])
+    assert names(index.search('Observatorium', allowed=allowed)) == {'Sternwarte Sonneberg'}
+    assert len(index.search('Deutschland', limit=2)) == 2
+    result = index.search('  --  ')
+    assert result.empty and 'Relevanz' in result.columns
+
+
+def test_catalog_substrings_are_found():
+    """Jedes Wortteil aus dem Katalog findet mindestens alle Namen, die es enthalten"""
+    catalog = load_comprehensive_locations().assign(Qualitätsscore=0.0)
+    index = SearchIndex(catalog, columns=['Name'])
+    tokens = sorted({token for name in catalog['Name'] for token in search_tokens(name) if len(token) >= 6})
+    rng = np.random.default_rng(5)
+    for token in rng.choice(tokens, 40, replace=False):
+        start = rng.integers(0, len(token) - 3)
+        part = token[start:start + 4]
+        expected = {
+            label for label, name in catalog['Name'].items()
+            if any(part in word for word in search_tokens(name))
+        }
+        found = set(index.search(part, columns=['Name']).index)
+        assert expected <= found, part
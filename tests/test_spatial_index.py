@@ -0,0 +1,95 @@
+"""SpatialIndex: Umkreis- und Bestenabfragen gegen eine vollständige Haversine-Suche"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from astro_core import EARTH_RADIUS_KM, SpatialIndex, best_per_region
+
+# Abfragen nahe der Pole, über die Datumsgrenze und mit Radien bis zur ganzen Erde
+QUERIES = [
+    (0.0, 0.0, 500), (-24.6, -70.4, 1500), (89.5, 10.0, 300), (-89.9, -120.0, 2500),
+    (65.0, 179.8, 800), (-10.0, -179.9, 3000), (45.0, 90.0, 9000), (0.0, 180.0, 40), 
+    (30.0, -60.0, 20040), (12.0, 34.0, 25000), (50.0, 8.0, 0)
+]
+
+
+@pytest.fixture(scope='module')
+def sites():
+    rng = np.random.default_rng(3)
+    n = 4000
+    lat = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+    lon = rng.uniform(-180, 180, n)
+    # Randfälle: Pole, Datumsgrenze und ein exakter Abfragepunkt
+    lat[:6] = [90.0, -90.0, 0.0, 0.0, 65.0, 50.0]
+    lon[:6] = [0.0, 45.0, 180.0, -180.0, -179.99, 8.0]
+    return pd.DataFrame({
+        'Name': [f'S{i}' for i in range(n)],
+        'Latitude': lat,
+        'Longitude': lon,
+        'Kontinent': rng.choice(['Europa', 'Afrika', 'Asien'], n),
+        'Qualitätsscore': np.round(rng.uniform(20, 100, n), 0)
+    }, index=pd.RangeIndex(500, 500 + n))
+
+
+def haversine(df, lat, lon):
+    phi1, phi2 = np.radians(lat), np.radians(df['Latitude'].to_numpy())
+    d_phi = phi2 - phi1
+    d_lambda = np.radians(df['Longitude'].to_numpy() - lon)
+    a = np.sin(d_phi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+@pytest.mark.parametrize('cell_deg', [1.0, 5.0, 0.25])
+def test_within_matches_brute_force(sites, cell_deg):
+    index = SpatialIndex(sites, cell_deg=cell_deg)
+    for lat, lon, radius in QUERIES:
+        positions, distances = index.within(lat, lon, radius)
+        brute = haversine(sites, lat, lon)
+        found = set(positions.tolist())
+
+        # Standorte genau auf der Kreisgrenze dürfen durch Rundung auf beide Seiten fallen
+        assert set(np.flatnonzero(brute <= radius - 1e-6).tolist()) <= found, (lat, lon, radius)
+        assert found <= set(np.flatnonzero(brute <= radius + 1e-6).tolist()), (lat, lon, radius)
+        assert len(found) == len(positions)
+        np.testing.assert_allclose(distances, brute[positions], atol=1e-3)
+
+
+def test_within_finds_the_exact_point(sites):
+    positions, distances = SpatialIndex(sites).within(50.0, 8.0, 0)
+    assert 5 in positions.tolist()
+    assert distances.max() < 1e-3
+
+
+def test_best_within_ranks_like_brute_force(sites):
+    index = SpatialIndex(sites)
+    for lat, lon, radius in QUERIES:
+        brute = haversine(sites, lat, lon)
+        inside = sites.assign(Entfernung_km=brute)[brute <= radius]
+        expected = inside.sort_values(['Qualitätsscore', 'Entfernung_km'], ascending=[False, True]).head(10)
+
+        result = index.best_within(lat, lon, radius, k=10)
+        assert result.index.tolist() == expected.index.tolist(), (lat, lon, radius)
+        np.testing.assert_allclose(result['Entfernung_km'], expected['Entfernung_km'], atol=0.051)
+
+
+def test_best_within_respects_the_allowed_mask(sites):
+    index = SpatialIndex(sites)
+    allowed = (sites['Kontinent'] == 'Afrika').to_numpy()
+    brute = haversine(sites, -24.6, -70.4)
+    inside = sites.assign(Entfernung_km=brute)[(brute <= 5000) & allowed]
+    expected = inside.sort_values(['Qualitätsscore', 'Entfernung_km'], ascending=[False, True]).head(5)
+
+    result = index.best_within(-24.6, -70.4, 5000, k=5, allowed=allowed)
+    assert result.index.tolist() == expected.index.tolist()
+    assert (result['Kontinent'] == 'Afrika').all()
+
+    assert index.best_within(-24.6, -70.4, 5000, allowed=np.zeros(len(sites), dtype=bool)).empty
+
+
+def test_best_per_region(sites):
+    result = best_per_region(sites, 'Kontinent')
+    assert sorted(result['Kontinent']) == ['Afrika', 'Asien', 'Europa']
+    for _, row in result.iterrows():
+        assert row['Qualitätsscore'] == sites.loc[sites['Kontinent'] == row['Kontinent'], 'Qualitätsscore'].max()
+    assert result['Qualitätsscore'].is_monotonic_decreasing
+    assert best_per_region(sites.iloc[:0], 'Kontinent').empty
@@ -0,0 +1,98 @@
+"""WeatherCellRefresher: Frische pro Zelle, Stapelgröße und Kontingent (ohne Netzwerk)"""
+import time
+
+import pandas as pd
+import pytest
+
+import astro_core
+from astro_core import ApiQuota, WeatherCellRefresher
+
+# a und b liegen in derselben LIVE_GRID_DEG-Zelle
+SITES = pd.DataFrame(
+    {'Latitude': [10.0, 10.02, 20.0, 30.0, 40.0], 'Longitude': [20.0, 20.01, 30.0, 40.0, 50.0]},
+    index=['a', 'b', 'c', 'd', 'e']
+)
+
+
+class StubRefresher(WeatherCellRefresher):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fetched = []
+        self.stored = []
+
+    def _fetch(self, lat, lon):
+        self.fetched.append((float(lat), float(lon)))
+        return lat, lon
+
+    def _store(self, cells, results, now):
+        self.stored.extend(tuple(map(float, result)) for result in results)
+
+
+def wait(refresher):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        with refresher.lock:
+            if not refresher.running:
+                return
+        time.sleep(0.01)
+    raise TimeoutError('Durchlauf nicht beendet')
+
+
+@pytest.fixture
+def unpaced(monkeypatch):
+    monkeypatch.setattr(astro_core, 'QUOTA_PACING_HEADROOM', 86400)
+
+
+def test_batches_follow_priority_and_share_cells():
+    refresher = StubRefresher(SITES, batch_size=2, ttl=3600)
+
+    assert refresher.request(['e', 'd', 'c', 'b', 'a']) == 2
+    wait(refresher)
+    assert refresher.stored == [(40.0, 50.0), (30.0, 40.0)]
+
+    assert refresher.request(['e', 'd', 'c', 'b', 'a']) == 2
+    wait(refresher)
+    assert refresher.stored[2:] == [(20.0, 30.0), (10.0, 20.0)]
+    assert refresher.version == 2
+
+
+def test_fresh_cells_wait_for_the_ttl():
+    refresher = StubRefresher(SITES, ttl=3600)
+    assert refresher.request(list(SITES.index)) == 4
+    wait(refresher)
+    assert refresher.request(list(SITES.index)) == 0
+
+    # Nach Ablauf der ttl ist die Zelle wieder fällig
+    refresher.checked_at[refresher.site_cell[SITES.index.get_loc('c')]] -= 3600
+    assert refresher.request(list(SITES.index)) == 1
+    wait(refresher)
+    assert refresher.fetched[-1] == (20.0, 30.0)
+
+
+def test_unknown_labels_are_ignored():
+    refresher = StubRefresher(SITES)
+    assert refresher.request(['x', 'c']) == 1
+    wait(refresher)
+    assert refresher.fetched == [(20.0, 30.0)]
+
+
+def test_quota_bounds_the_batch(tmp_path, unpaced):
+    quota = ApiQuota(tmp_path / 'quota.json', limit=3)
+    refresher = StubRefresher(SITES, quota=quota, batch_size=10)
+
+    assert refresher.request(list(SITES.index)) == 3
+    wait(refresher)
+    assert refresher.checked_at[refresher.site_cell[-1]] == 0  # Vierte Zelle bleibt fällig
+    assert refresher.request(list(SITES.index)) == 0
+    assert len(refresher.fetched) == 3
+    assert quota.calls_today() == 3
+
+
+def test_consumer_share_bounds_the_batch(tmp_path, unpaced):
+    quota = ApiQuota(tmp_path / 'quota.json', limit=5, shares={'live': 0.6, 'forecast': 0.4})
+    refresher = StubRefresher(SITES, quota=quota, batch_size=10)
+    refresher.quota_consumer = 'live'
+
+    assert refresher.request(list(SITES.index)) == 3
+    wait(refresher)
+    assert quota.consumer_calls() == {'live': 3}